@@ -1,12 +1,13 @@
 # app/api/deps.py
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
-from jose import JWTError, jwt
-from typing import Optional, Annotated
+from jose import JWTError
+from typing import Optional, Annotated, AsyncGenerator
 from app.core.config import settings
-from app.core.security import verify_password
-from app.db.session import get_db
+from app.core.security import decode_access_token
+from app.db.session import get_db, ReplicaSessionLocal
+from app.db.routing import READ_YOUR_WRITES_COOKIE, use_replica
 from app.db.models.user import User
 from app.services.user_service import UserService
 
@@ -30,7 +31,7 @@ async def get_current_user(
     try:
         # Extract token from "Bearer <token>"
         token = credentials.credentials
-        payload = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[settings.ALGORITHM])
+        payload = decode_access_token(token)
         username: str = payload.get("sub")
         if username is None:
             raise credentials_exception
@@ -81,4 +82,24 @@ async def get_current_admin(
     return current_user
 
 
-AdminUser = Annotated[User, Depends(get_current_admin)]
\ No newline at end of file
+AdminUser = Annotated[User, Depends(get_current_admin)]
+
+
+async def get_read_only_db(
+    request: Request,
+    current_user: Annotated[User, Depends(get_current_user)],
+    db: Annotated[AsyncSession, Depends(get_db)]
+) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Session for read-only routes: the replica when it is configured, healthy and
+    the client has not written recently; otherwise the request's primary session.
+    """
+    if not await use_replica(request.cookies.get(READ_YOUR_WRITES_COOKIE)):
+        yield db
+        return
+
+    async with ReplicaSessionLocal() as session:
+        yield session
+
+
+ReadOnlyDatabaseSession = Annotated[AsyncSession, Depends(get_read_only_db)]
\ No newline at end of file
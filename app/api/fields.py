@@ -0,0 +1,61 @@
+# app/api/fields.py
+# Sparse fieldsets for list endpoints: `?fields=username,status` selects only
+# those columns (plus id) and serializes the rows with a response model cut
+# down from the endpoint's full one, skipping ORM hydration and unused columns.
+from functools import lru_cache
+from typing import List, Optional, Sequence, Tuple, Type
+
+from fastapi import HTTPException, Response, status
+from pydantic import BaseModel, ConfigDict, EmailStr, TypeAdapter, create_model
+
+# Values read back from our own columns were validated on the way in; full
+# email validation (IDNA and all) would otherwise dominate serialization
+_TRUSTED_ON_OUTPUT = {EmailStr: str}
+
+
+@lru_cache(maxsize=256)
+def _page_adapter(schema: Type[BaseModel], names: Tuple[str, ...]) -> TypeAdapter:
+    fields = {}
+    for name in names:
+        field = schema.model_fields[name]
+        annotation = _TRUSTED_ON_OUTPUT.get(field.annotation, field.annotation)
+        fields[name] = (annotation, field)
+    partial = create_model(
+        f"{schema.__name__}Fields",
+        __config__=ConfigDict(from_attributes=True),
+        **fields
+    )
+    return TypeAdapter(List[partial])
+
+
+class SparseFields:
+    """The requested subset of a schema's fields that map to columns of `model`."""
+
+    def __init__(self, model, schema: Type[BaseModel], names: Tuple[str, ...]):
+        self.names = names
+        self.columns = [getattr(model, name) for name in names]
+        self._adapter = _page_adapter(schema, names)
+
+    def render(self, rows: Sequence, response: Response) -> Response:
+        """Serialize column rows straight to JSON, keeping headers already set on `response`."""
+        body = self._adapter.dump_json(self._adapter.validate_python(rows, from_attributes=True))
+        headers = {key: value for key, value in response.headers.items() if key != "content-length"}
+        return Response(content=body, media_type="application/json", headers=headers)
+
+
+def sparse_fields(fields: Optional[str], model, schema: Type[BaseModel]) -> Optional[SparseFields]:
+    """Parse a comma-separated `fields` parameter; None means the full representation."""
+    if not fields:
+        return None
+    columns = model.__table__.columns
+    allowed = [name for name in schema.model_fields if name in columns]
+    requested = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [name for name in requested if name not in allowed]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(unknown)}. Allowed: {', '.join(allowed)}"
+        )
+    # id always comes first so rows stay addressable
+    names = tuple(dict.fromkeys(["id", *requested]))
+    return SparseFields(model, schema, names)
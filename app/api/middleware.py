@@ -0,0 +1,89 @@
+# app/api/middleware.py
+import logging
+import math
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.db.query_stats import start_stats, stop_stats
+from app.db.routing import READ_YOUR_WRITES_COOKIE, start_write_tracking, stop_write_tracking
+
+logger = logging.getLogger("app.db.queries")
+
+
+class QueryStatsMiddleware:
+    """
+    Count SQL statements and DB time per request, flag repeated statement shapes
+    (N+1 patterns) and optionally expose the numbers as response headers.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats, token = start_stats()
+
+        async def send_with_stats(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                if settings.SQL_SERVER_TIMING:
+                    headers.append(
+                        "Server-Timing",
+                        f'db;dur={stats.total_ms:.1f};desc="{stats.count} queries"'
+                    )
+                if settings.SQL_STATS_HEADERS:
+                    headers["X-DB-Query-Count"] = str(stats.count)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_stats)
+        finally:
+            stop_stats(token)
+            repeated = stats.repeated(settings.SQL_N_PLUS_ONE_THRESHOLD)
+            for shape, n in repeated:
+                logger.warning(
+                    "Possible N+1 on %s %s: %dx %s",
+                    scope["method"], scope["path"], n, " ".join(shape.split())
+                )
+            logger.debug(
+                "%s %s: %d queries, %.1f ms in DB",
+                scope["method"], scope["path"], stats.count, stats.total_ms
+            )
+
+
+class ReadYourWritesMiddleware:
+    """
+    Hand clients that committed a write during the request a short-lived cookie
+    with the time of that write; while it is fresh their read-only requests stay
+    on the primary (see app/db/routing.py).
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        writes, token = start_write_tracking()
+
+        async def send_with_marker(message: Message) -> None:
+            if message["type"] == "http.response.start" and writes.last_write_at is not None:
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "Set-Cookie",
+                    f"{READ_YOUR_WRITES_COOKIE}={writes.last_write_at:.3f}; "
+                    f"Max-Age={math.ceil(settings.READ_YOUR_WRITES_SECONDS)}; Path=/; HttpOnly; SameSite=lax"
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_marker)
+        finally:
+            stop_write_tracking(token)
@@ -1,62 +1,118 @@
 # app/api/routes/admin.py
-from fastapi import APIRouter, Depends, HTTPException, status ,Body
+from fastapi import APIRouter, Depends, HTTPException, status ,Body, UploadFile, File, Form, Query, Header, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
 from typing import List, Optional
+from datetime import date, datetime, timezone
 import uuid
 
-from app.api.deps import DatabaseSession, AdminUser
+from app.api.deps import DatabaseSession, ReadOnlyDatabaseSession, AdminUser
+from app.api.etag import conditional, list_etag, row_etag
+from app.api.fields import sparse_fields
+from app.api.totals import CountMode, set_total_count
+from app.core.events import event_stream_response, publish_event
+from app.core.resilience import PROVIDERS
+from app.db.queries import newest_first
 from app.db.models.user import User
 from app.db.models.transaction import Transaction
 from app.db.models.kyc_request import KycRequest
 from app.db.models.withdrawal_request import WithdrawalRequest
 from app.schemas.user import UserResponse
-from app.schemas.kyc_request import KycRequestResponse, KycRequestUpdate
+from app.schemas.kyc_request import KycRequestResponse, KycRequestUpdate, KycClaimResponse, KycClaimRelease
 from app.schemas.withdrawal_request import WithdrawalRequestResponse
+from app.schemas.bulk_import import BulkImportResult
+from app.schemas.rollup import DailyRollupResponse
+from app.schemas.moderation import (
+    BulkUserStatusUpdate, BulkWithdrawalStatusUpdate, BulkKycReview, BulkModerationResult
+)
+from app.services.bulk_import_service import BulkImportService
+from app.services.rollup_service import RollupService
+from app.services.moderation_service import ModerationService
+from app.services.kyc_review_service import KycReviewService
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
 
 @router.get("/users/", response_model=List[UserResponse])
 async def list_users(
-    db: DatabaseSession,
+    db: ReadOnlyDatabaseSession,
     admin: AdminUser,
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
     status_filter: Optional[str] = None,
-    search: Optional[str] = None
+    search: Optional[str] = None,
+    fields: Optional[str] = Query(None, description="Comma-separated columns to return, e.g. username,status"),
+    count: Optional[CountMode] = Query(None, description="Add X-Total-Count: exact, estimated or auto")
 ):
-    """Get list of all users with optional filtering."""
-    query = select(User)
+    """
+    Get list of all users with optional filtering. Supports If-None-Match.
+    With `fields`, only those columns (plus id) are loaded and returned; with
+    `count`, the total number of matching rows is sent in X-Total-Count.
+    """
+    sparse = sparse_fields(fields, User, UserResponse)
+    criteria = []
     
     if status_filter:
-        query = query.where(User.status == status_filter)
+        criteria.append(User.status == status_filter)
     
     if search:
-        query = query.where(
+        criteria.append(
             (User.username.ilike(f"%{search}%")) |
             (User.email.ilike(f"%{search}%")) |
             (User.first_name.ilike(f"%{search}%")) |
             (User.last_name.ilike(f"%{search}%"))
         )
     
-    result = await db.execute(
-        query.order_by(User.created_at.desc())
-        .offset(skip)
-        .limit(limit)
-    )
+    page = newest_first(User, *criteria, columns=sparse.columns if sparse else None, skip=skip, limit=limit)
+    etag = await list_etag(db, User, page, params=(skip, limit, status_filter, search, fields))
+    not_modified = conditional(request, response, etag)
+    if not_modified:
+        return not_modified
+    
+    await set_total_count(db, response, User, *criteria, mode=count)
+    result = await db.execute(page)
+    if sparse:
+        return sparse.render(result.all(), response)
     
     users = result.scalars().all()
     return users
 
 
+@router.post("/users/import", response_model=BulkImportResult)
+async def bulk_import_users(
+    db: DatabaseSession,
+    admin: AdminUser,
+    file: UploadFile = File(...),
+    file_format: str = Form("csv", alias="format"),
+    post_commissions: bool = Form(True)
+):
+    """
+    Bulk-load users with existing referral relationships from CSV or NDJSON.
+    Columns: email, username, password_hash, first_name, last_name,
+    referral_code, referred_by. All-or-nothing: any invalid row rejects the file.
+    """
+    rows = BulkImportService.parse(await file.read(), file_format)
+    return await BulkImportService.import_users(db, rows, post_commissions=post_commissions)
+
+
 @router.get("/users/{user_id}", response_model=UserResponse)
 async def get_user_details(
     user_id: uuid.UUID,
     db: DatabaseSession,
-    admin: AdminUser
+    admin: AdminUser,
+    request: Request,
+    response: Response
 ):
-    """Get detailed information about a specific user."""
+    """Get detailed information about a specific user. Supports If-None-Match."""
+    etag = await row_etag(db, User, User.id == user_id)
+    if etag:
+        not_modified = conditional(request, response, etag)
+        if not_modified:
+            return not_modified
+    
     user = await db.get(User, user_id)
     if not user:
         raise HTTPException(
@@ -94,25 +150,58 @@ async def update_user_status(
     return {"detail": f"User status updated to {status}"}
 
 
+@router.post("/users/bulk/status", response_model=BulkModerationResult)
+async def bulk_update_user_status(
+    update_data: BulkUserStatusUpdate,
+    db: DatabaseSession,
+    admin: AdminUser
+):
+    """Freeze or unfreeze many accounts in one statement, with a result per id."""
+    return await ModerationService.set_user_status(db, update_data.user_ids, update_data.status)
+
+
+@router.post("/users/bulk/withdrawal-status", response_model=BulkModerationResult)
+async def bulk_update_withdrawal_status(
+    update_data: BulkWithdrawalStatusUpdate,
+    db: DatabaseSession,
+    admin: AdminUser
+):
+    """Pause or resume withdrawals for many accounts in one statement, with a result per id."""
+    return await ModerationService.set_withdrawal_status(
+        db, update_data.user_ids, update_data.withdrawal_status
+    )
+
+
 @router.get("/withdrawals/", response_model=List[WithdrawalRequestResponse])
 async def list_withdrawals(
-    db: DatabaseSession,
+    db: ReadOnlyDatabaseSession,
     admin: AdminUser,
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
-    status_filter: Optional[str] = None
+    status_filter: Optional[str] = None,
+    fields: Optional[str] = Query(None, description="Comma-separated columns to return, e.g. username,status"),
+    count: Optional[CountMode] = Query(None, description="Add X-Total-Count: exact, estimated or auto")
 ):
-    """Get list of all withdrawal requests for monitoring."""
-    query = select(WithdrawalRequest)
+    """
+    Get list of all withdrawal requests for monitoring. Supports If-None-Match.
+    With `fields`, only those columns (plus id) are loaded and returned; with
+    `count`, the total number of matching rows is sent in X-Total-Count.
+    """
+    sparse = sparse_fields(fields, WithdrawalRequest, WithdrawalRequestResponse)
+    criteria = [WithdrawalRequest.status == status_filter] if status_filter else []
     
-    if status_filter:
-        query = query.where(WithdrawalRequest.status == status_filter)
+    page = newest_first(WithdrawalRequest, *criteria, columns=sparse.columns if sparse else None, skip=skip, limit=limit)
+    etag = await list_etag(db, WithdrawalRequest, page, params=(skip, limit, status_filter, fields))
+    not_modified = conditional(request, response, etag)
+    if not_modified:
+        return not_modified
     
-    result = await db.execute(
-        query.order_by(WithdrawalRequest.created_at.desc())
-        .offset(skip)
-        .limit(limit)
-    )
+    await set_total_count(db, response, WithdrawalRequest, *criteria, mode=count)
+    result = await db.execute(page)
+    if sparse:
+        return sparse.render(result.all(), response)
     
     withdrawals = result.scalars().all()
     return withdrawals
@@ -120,23 +209,34 @@ async def list_withdrawals(
 
 @router.get("/kyc-requests/", response_model=List[KycRequestResponse])
 async def list_kyc_requests(
-    db: DatabaseSession,
+    db: ReadOnlyDatabaseSession,
     admin: AdminUser,
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
-    status_filter: Optional[str] = None
+    status_filter: Optional[str] = None,
+    fields: Optional[str] = Query(None, description="Comma-separated columns to return, e.g. username,status"),
+    count: Optional[CountMode] = Query(None, description="Add X-Total-Count: exact, estimated or auto")
 ):
-    """Get list of all KYC requests for review."""
-    query = select(KycRequest)
+    """
+    Get list of all KYC requests for review. Supports If-None-Match.
+    With `fields`, only those columns (plus id) are loaded and returned; with
+    `count`, the total number of matching rows is sent in X-Total-Count.
+    """
+    sparse = sparse_fields(fields, KycRequest, KycRequestResponse)
+    criteria = [KycRequest.status == status_filter] if status_filter else []
     
-    if status_filter:
-        query = query.where(KycRequest.status == status_filter)
+    page = newest_first(KycRequest, *criteria, columns=sparse.columns if sparse else None, skip=skip, limit=limit)
+    etag = await list_etag(db, KycRequest, page, params=(skip, limit, status_filter, fields))
+    not_modified = conditional(request, response, etag)
+    if not_modified:
+        return not_modified
     
-    result = await db.execute(
-        query.order_by(KycRequest.created_at.desc())
-        .offset(skip)
-        .limit(limit)
-    )
+    await set_total_count(db, response, KycRequest, *criteria, mode=count)
+    result = await db.execute(page)
+    if sparse:
+        return sparse.render(result.all(), response)
     
     kyc_requests = result.scalars().all()
     return kyc_requests
@@ -163,6 +263,12 @@ async def review_kyc_request(
             detail="KYC request has already been reviewed"
         )
     
+    if KycReviewService.claimed_by_other(kyc_request, admin.id, datetime.now(timezone.utc)):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="KYC request is claimed by another reviewer"
+        )
+    
     # Update status
     kyc_request.status = kyc_update.status
     
@@ -176,15 +282,59 @@ async def review_kyc_request(
         if user:
             user.is_kyc_verified = True
     
+    await publish_event(
+        db, "kyc.reviewed", kyc_request.user_id,
+        kyc_request_id=kyc_request.id, status=kyc_request.status
+    )
     await db.commit()
     await db.refresh(kyc_request)
     
     return kyc_request
 
 
+@router.post("/kyc-requests/bulk/review", response_model=BulkModerationResult)
+async def bulk_review_kyc_requests(
+    review: BulkKycReview,
+    db: DatabaseSession,
+    admin: AdminUser
+):
+    """
+    Approve or reject many pending KYC requests at once (one reason for the batch).
+    Approval marks the owners KYC verified in the same transaction.
+    """
+    return await ModerationService.review_kyc_requests(
+        db, review.request_ids, review.status, admin.id, review.rejection_reason
+    )
+
+
+@router.post("/kyc-requests/claim", response_model=List[KycClaimResponse])
+async def claim_kyc_requests(
+    db: DatabaseSession,
+    admin: AdminUser,
+    limit: int = Query(10, ge=1)
+):
+    """
+    Take the next pending KYC requests for review, oldest first.
+    Concurrent reviewers never receive the same request; claims lapse after
+    KYC_CLAIM_LEASE_SECONDS, and calling again renews the caller's own claims.
+    """
+    return await KycReviewService.claim(db, admin.id, limit)
+
+
+@router.post("/kyc-requests/release")
+async def release_kyc_requests(
+    release: KycClaimRelease,
+    db: DatabaseSession,
+    admin: AdminUser
+):
+    """Return claimed KYC requests to the queue without reviewing them."""
+    released = await KycReviewService.release(db, admin.id, release.request_ids)
+    return {"released": released}
+
+
 @router.get("/dashboard/stats")
 async def get_dashboard_stats(
-    db: DatabaseSession,
+    db: ReadOnlyDatabaseSession,
     admin: AdminUser
 ):
     """Get admin dashboard statistics."""
@@ -204,10 +354,10 @@ async def get_dashboard_stats(
     )
     total_volume = total_volume_result.scalar()
     
-    # Pending withdrawals
+    # Pending withdrawals (reserved but not yet sent to Stripe, or in flight)
     pending_withdrawals_result = await db.execute(
         select(func.count(WithdrawalRequest.id)).where(
-            WithdrawalRequest.status == 'processing'
+            WithdrawalRequest.status.in_(('pending_payout', 'processing'))
         )
     )
     pending_withdrawals = pending_withdrawals_result.scalar()
@@ -224,4 +374,56 @@ async def get_dashboard_stats(
         "total_volume": float(total_volume),
         "pending_withdrawals": pending_withdrawals,
         "pending_kyc_requests": pending_kyc
-    }
\ No newline at end of file
+    }
+
+
+@router.get("/dashboard/providers")
+async def get_provider_health(admin: AdminUser):
+    """
+    Circuit breaker state, in-flight calls and rejection counts for each external
+    provider. Counts are per worker process and reset on restart.
+    """
+    return {"providers": [provider.snapshot() for provider in PROVIDERS]}
+
+
+@router.get("/dashboard/daily/", response_model=List[DailyRollupResponse])
+async def get_daily_stats(
+    db: ReadOnlyDatabaseSession,
+    admin: AdminUser,
+    start: date,
+    end: date,
+    metric: Optional[List[str]] = Query(None, description="signups, commission, withdrawals; all when omitted")
+):
+    """
+    Daily trend rows between two dates (inclusive) from the pre-aggregated rollups.
+    Withdrawal failure rate is the 'failed' count over the sum of all withdrawal counts for a day.
+    """
+    if end < start:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="end must not be before start"
+        )
+    if (end - start).days > 366 * 3:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Date range is limited to three years"
+        )
+
+    return await RollupService.series(db, start, end, metric)
+
+
+@router.get("/events/", response_class=StreamingResponse)
+async def stream_admin_events(
+    db: DatabaseSession,
+    admin: AdminUser,
+    last_event_id: Optional[int] = Header(None, alias="Last-Event-ID")
+):
+    """
+    Server-sent events for every KYC and withdrawal status change.
+    Replaces polling /withdrawals/ and /kyc-requests/; resume with Last-Event-ID.
+    Authenticated by the Bearer header only; the browser EventSource cannot set
+    headers, so the dashboard must consume it with a fetch-based SSE reader.
+    """
+    # Hand the pooled connection back before the long-lived stream starts
+    await db.close()
+    return event_stream_response(None, last_event_id)
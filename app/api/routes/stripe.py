@@ -5,6 +5,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.api.deps import DatabaseSession
 from app.services.stripe_service import StripeService
 from app.services.withdrawal_service import WithdrawalService
+from app.services.payment_intent_service import PaymentIntentService
 
 router = APIRouter(prefix="/stripe", tags=["stripe"])
 
@@ -16,7 +17,7 @@ async def handle_stripe_webhook(
     db: DatabaseSession
 ):
     """
-    Handle Stripe webhook events for payout status updates.
+    Handle Stripe webhook events for payout status updates and registration payments.
     """
     # Get raw body and signature
     payload = await request.body()
@@ -41,18 +42,26 @@ async def handle_stripe_webhook(
     
     # Handle different event types
     if event["type"] == "payout.paid":
-        payout_id = event["data"]["object"]["id"]
+        payout = event["data"]["object"]
         background_tasks.add_task(
             WithdrawalService.handle_successful_payout,
-            db, payout_id
+            db, payout["id"], (payout.get("metadata") or {}).get("withdrawal_id")
         )
     
     elif event["type"] == "payout.failed":
-        payout_id = event["data"]["object"]["id"]
+        payout = event["data"]["object"]
         background_tasks.add_task(
             WithdrawalService.handle_failed_payout,
-            db, payout_id
+            db, payout["id"], (payout.get("metadata") or {}).get("withdrawal_id")
         )
     
+    elif event["type"] == "payment_intent.succeeded":
+        intent = event["data"]["object"]
+        # Recorded before acknowledging, so registration confirms can skip the Stripe lookup
+        if (intent.get("metadata") or {}).get("purpose") == "user_registration":
+            await PaymentIntentService.record_succeeded(
+                db, intent["id"], intent["amount"], intent["currency"]
+            )
+    
     # Always return 200 to acknowledge receipt
     return {"status": "success"}
\ No newline at end of file
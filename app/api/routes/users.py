@@ -1,10 +1,12 @@
 # app/api/routes/users.py
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks, Body  # Added Body import
+from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks, Body, Header, Query, Request, Response  # Added Body import
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
 import uuid
 
 from app.api.deps import DatabaseSession, CurrentUser
+from app.api.etag import conditional, resource_etag
 from app.schemas.user import (
     UserCreate, UserUpdate, UserResponse, UserRegisterInitiate, 
     UserRegisterConfirm, UserWithTokens
@@ -12,11 +14,34 @@ from app.schemas.user import (
 from app.services.user_service import UserService
 from app.services.commission_service import CommissionService
 from app.services.stripe_service import StripeService
-from app.core.security import create_access_token
+from app.services.payment_intent_service import PaymentIntentService
+from app.services.auth_service import AuthService
+from app.services.availability_service import AvailabilityService
+from app.core.security import create_access_token, verify_password
+from app.core.events import event_stream_response
 
 router = APIRouter(prefix="/users", tags=["users"])
 
 
+@router.get("/availability/")
+async def check_availability(
+    db: DatabaseSession,
+    username: Optional[str] = Query(None, min_length=3, max_length=50),
+    email: Optional[str] = Query(None, min_length=3, max_length=254)
+):
+    """
+    Whether a username and/or email can still be registered, for checking as the
+    user types. Most answers come from an in-memory filter without a query; the
+    registration endpoints remain the authority.
+    """
+    if username is None and email is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Provide a username or an email"
+        )
+    return await AvailabilityService.check(db, username=username, email=email)
+
+
 @router.post("/register/", status_code=status.HTTP_200_OK)
 async def initiate_registration(
     user_data: UserRegisterInitiate,
@@ -27,13 +52,13 @@ async def initiate_registration(
     Returns client_secret for frontend to complete payment.
     """
     # Validate user data doesn't already exist
-    if await UserService.get_by_email(db, user_data.email):
+    if await UserService.email_exists(db, user_data.email):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="User with this email already exists"
         )
     
-    if await UserService.get_by_username(db, user_data.username):
+    if await UserService.username_exists(db, user_data.username):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="User with this username already exists"
@@ -67,17 +92,12 @@ async def confirm_registration(
     Step 2: Confirm user registration after successful payment.
     Creates user record and distributes referral commissions.
     """
-    # Verify Payment Intent was successful
-    is_payment_valid = await StripeService.verify_payment_intent(
-        user_data.payment_intent_id,
+    # Claim the payment (recorded by the webhook, or checked with Stripe on a miss);
+    # committed together with the new user below
+    await PaymentIntentService.consume(
+        db, user_data.payment_intent_id,
         expected_amount=5000  # £50 in pence
     )
-    
-    if not is_payment_valid:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid or unsuccessful payment"
-        )
 
     # Find referrer if referral code was provided
     referrer_id = None
@@ -126,18 +146,60 @@ async def login(
         )
     
     access_token = create_access_token(subject=user.username)
+    refresh_token = await AuthService.issue_refresh_token(db, user.id)
+    await db.commit()
     
     return UserWithTokens(
         **user.__dict__,
-        access_token=access_token
+        access_token=access_token,
+        refresh_token=refresh_token
+    )
+
+
+@router.post("/token/refresh/", response_model=UserWithTokens)
+async def refresh_tokens(
+    db: DatabaseSession,
+    refresh_token: str = Body(..., embed=True)
+):
+    """
+    Exchange a refresh token for a new access token and a new refresh token.
+    The presented token is spent; presenting it again revokes the whole login.
+    """
+    user, new_refresh_token = await AuthService.rotate(db, refresh_token)
+    
+    return UserWithTokens(
+        **user.__dict__,
+        access_token=create_access_token(subject=user.username),
+        refresh_token=new_refresh_token
     )
 
 @router.get("/me/", response_model=UserResponse)
-async def read_current_user(current_user: CurrentUser):
-    """Get current user information."""
+async def read_current_user(current_user: CurrentUser, request: Request, response: Response):
+    """Get current user information. Send If-None-Match to get 304 when unchanged."""
+    not_modified = conditional(request, response, resource_etag(current_user.id, current_user.updated_at))
+    if not_modified:
+        return not_modified
     return current_user
 
 
+@router.get("/me/events/", response_class=StreamingResponse)
+async def stream_current_user_events(
+    db: DatabaseSession,
+    current_user: CurrentUser,
+    last_event_id: Optional[int] = Header(None, alias="Last-Event-ID")
+):
+    """
+    Server-sent events for the current user's withdrawals and KYC requests,
+    instead of polling /withdrawals/{id}. Resume with Last-Event-ID.
+    Needs the Authorization: Bearer header, which the browser EventSource cannot
+    send, so clients read the stream with a fetch-based SSE reader.
+    """
+    user_id = str(current_user.id)
+    # Hand the pooled connection back before the long-lived stream starts
+    await db.close()
+    return event_stream_response(user_id, last_event_id)
+
+
 @router.put("/me/", response_model=UserResponse)
 async def update_current_user(
     user_data: UserUpdate,
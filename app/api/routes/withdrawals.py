@@ -1,12 +1,16 @@
 # app/api/routes/withdrawals.py
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 import uuid
 
 from app.api.deps import DatabaseSession, CurrentUser
+from app.api.etag import conditional, list_etag, row_etag
+from app.db.queries import newest_first
 from app.schemas.withdrawal_request import WithdrawalRequestCreate, WithdrawalRequestResponse
+from app.schemas.payout_destination import PayoutDestinationCreate, PayoutDestinationResponse
 from app.services.withdrawal_service import WithdrawalService
+from app.services.payout_destination_service import PayoutDestinationService
 
 router = APIRouter(prefix="/withdrawals", tags=["withdrawals"])
 
@@ -19,7 +23,9 @@ async def create_withdrawal(
 ):
     """
     Create a new withdrawal request.
-    Immediately deducts balance and initiates Stripe payout.
+    Immediately deducts balance and initiates Stripe payout. If Stripe cannot
+    confirm the payout, the request is returned as 'pending_payout' and retried
+    in the background.
     """
     # The service handles all validation and Stripe integration
     withdrawal_request = await WithdrawalService.create_withdrawal(
@@ -33,42 +39,85 @@ async def create_withdrawal(
 async def get_user_withdrawals(
     db: DatabaseSession,
     current_user: CurrentUser,
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100
 ):
-    """Get current user's withdrawal history."""
-    from sqlalchemy import select
+    """Get current user's withdrawal history. Send If-None-Match to get 304 when unchanged."""
     from app.db.models.withdrawal_request import WithdrawalRequest
     
-    result = await db.execute(
-        select(WithdrawalRequest)
-        .where(WithdrawalRequest.user_id == current_user.id)
-        .order_by(WithdrawalRequest.created_at.desc())
-        .offset(skip)
-        .limit(limit)
-    )
+    page = newest_first(WithdrawalRequest, WithdrawalRequest.user_id == current_user.id, skip=skip, limit=limit)
+    etag = await list_etag(db, WithdrawalRequest, page, params=(skip, limit))
+    not_modified = conditional(request, response, etag)
+    if not_modified:
+        return not_modified
+    
+    result = await db.execute(page)
     
     withdrawals = result.scalars().all()
     return withdrawals
 
 
+@router.get("/destinations/", response_model=List[PayoutDestinationResponse])
+async def list_payout_destinations(
+    db: DatabaseSession,
+    current_user: CurrentUser
+):
+    """List the current user's saved payout destinations."""
+    return await PayoutDestinationService.list_for_user(db, current_user.id)
+
+
+@router.post("/destinations/", response_model=PayoutDestinationResponse, status_code=status.HTTP_201_CREATED)
+async def create_payout_destination(
+    destination_data: PayoutDestinationCreate,
+    db: DatabaseSession,
+    current_user: CurrentUser
+):
+    """
+    Save a bank account for withdrawals. It is tokenized with Stripe once;
+    saving the same account again returns the existing destination.
+    """
+    if not current_user.is_kyc_verified:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="KYC verification required for withdrawals"
+        )
+    destination = await PayoutDestinationService.get_or_create(db, current_user.id, destination_data)
+    await db.commit()
+    return destination
+
+
+@router.delete("/destinations/{destination_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_payout_destination(
+    destination_id: uuid.UUID,
+    db: DatabaseSession,
+    current_user: CurrentUser
+):
+    """Remove a saved payout destination."""
+    await PayoutDestinationService.deactivate(db, current_user.id, destination_id)
+
+
 @router.get("/{withdrawal_id}", response_model=WithdrawalRequestResponse)
 async def get_withdrawal(
     withdrawal_id: uuid.UUID,
     db: DatabaseSession,
-    current_user: CurrentUser
+    current_user: CurrentUser,
+    request: Request,
+    response: Response
 ):
-    """Get specific withdrawal details."""
+    """Get specific withdrawal details. Send If-None-Match to get 304 when unchanged."""
     from sqlalchemy import select
     from app.db.models.withdrawal_request import WithdrawalRequest
     
-    result = await db.execute(
-        select(WithdrawalRequest)
-        .where(
-            (WithdrawalRequest.id == withdrawal_id) &
-            (WithdrawalRequest.user_id == current_user.id)
-        )
-    )
+    criteria = [WithdrawalRequest.id == withdrawal_id, WithdrawalRequest.user_id == current_user.id]
+    etag = await row_etag(db, WithdrawalRequest, *criteria)
+    if etag:
+        not_modified = conditional(request, response, etag)
+        if not_modified:
+            return not_modified
+    
+    result = await db.execute(select(WithdrawalRequest).where(*criteria))
     
     withdrawal = result.scalar_one_or_none()
     if not withdrawal:
@@ -0,0 +1,83 @@
+# app/api/totals.py
+# Totals for "showing X of N" in admin lists, sent in X-Total-Count with
+# X-Total-Count-Estimated saying whether the number is exact:
+# - exact: count the matching rows, but stop at ADMIN_COUNT_EXACT_LIMIT and
+#   report the planner estimate beyond that
+# - estimated: the planner's row estimate only (pg_class.reltuples scaled to the
+#   table's current size, times the filter selectivity), no scan
+# - auto: estimate first, count exactly when the estimate is small
+# Results are cached per worker and filter for ADMIN_COUNT_CACHE_SECONDS.
+import time
+from collections import OrderedDict
+from typing import Literal, Optional, Tuple
+
+from fastapi import Response
+from sqlalchemy import bindparam, func, literal_column, select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.explain import explain_plan
+
+CountMode = Literal["exact", "estimated", "auto"]
+
+_CACHE_SIZE = 1024
+_cached_totals: "OrderedDict[tuple, Tuple[int, bool, float]]" = OrderedDict()
+
+
+async def _estimate(db: AsyncSession, matching) -> int:
+    plan = await explain_plan(db, matching)
+    return int(plan["Plan Rows"])
+
+
+async def _bounded_count(db: AsyncSession, matching, limit: int) -> int:
+    """Exact count, reading at most limit + 1 rows."""
+    # Rendered into the SQL, so the bound shows in query logs despite parameter redaction
+    bound = bindparam("count_limit", limit + 1, literal_execute=True)
+    return (await db.execute(
+        select(func.count()).select_from(matching.limit(bound).subquery())
+    )).scalar_one()
+
+
+async def total_count(db: AsyncSession, model, *criteria, mode: CountMode) -> Tuple[int, bool]:
+    """(total, estimated) for the rows of `model` matching `criteria`."""
+    matching = select(literal_column("1")).select_from(model).where(*criteria)
+    compiled = matching.compile(dialect=postgresql.dialect())
+    key = (mode, str(compiled), repr(sorted(compiled.params.items())))
+    cached = _cached_totals.get(key)
+    if cached and cached[2] > time.monotonic():
+        return cached[0], cached[1]
+
+    limit = settings.ADMIN_COUNT_EXACT_LIMIT
+    if mode == "estimated":
+        total, estimated = await _estimate(db, matching), True
+    else:
+        estimate = await _estimate(db, matching) if mode == "auto" else None
+        if estimate is not None and estimate > limit:
+            total, estimated = estimate, True
+        else:
+            total, estimated = await _bounded_count(db, matching, limit), False
+            if total > limit:
+                # Stale statistics can estimate below what was just counted
+                total, estimated = max(estimate or await _estimate(db, matching), total), True
+
+    _cached_totals[key] = (total, estimated, time.monotonic() + settings.ADMIN_COUNT_CACHE_SECONDS)
+    _cached_totals.move_to_end(key)
+    if len(_cached_totals) > _CACHE_SIZE:
+        _cached_totals.popitem(last=False)
+    return total, estimated
+
+
+async def set_total_count(
+    db: AsyncSession,
+    response: Response,
+    model,
+    *criteria,
+    mode: Optional[CountMode]
+) -> None:
+    """Add X-Total-Count headers when the client asked for a total."""
+    if mode is None:
+        return
+    total, estimated = await total_count(db, model, *criteria, mode=mode)
+    response.headers["X-Total-Count"] = str(total)
+    response.headers["X-Total-Count-Estimated"] = "true" if estimated else "false"
@@ -0,0 +1,2 @@
+# app/commands/__init__.py
+# Operational commands, run as `python -m app.commands.<name>`
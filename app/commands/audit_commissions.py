@@ -0,0 +1,47 @@
+# app/commands/audit_commissions.py
+"""
+Replay registration commissions over the whole referral tree and diff them
+against the posted commission transactions.
+
+    python -m app.commands.audit_commissions
+    python -m app.commands.audit_commissions --what-if 0.4,0.2,0.1,0.05,0.03,0.02
+
+Runs read-only in a single repeatable-read snapshot. Exit status is 1 when any
+user's posted commissions differ from the replay.
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+
+from app.db.session import engine
+from app.services.commission_audit_service import CommissionAuditService
+
+
+def parse_rates(value: str):
+    rates = [float(rate) for rate in value.split(",") if rate.strip()]
+    if not rates or any(rate < 0 for rate in rates):
+        raise argparse.ArgumentTypeError("rates must be a comma-separated list of non-negative fractions")
+    return rates
+
+
+async def main(args) -> int:
+    started = time.perf_counter()
+    try:
+        async with engine.connect() as connection:
+            raw_connection = (await connection.get_raw_connection()).driver_connection
+            report = await CommissionAuditService.audit(raw_connection, what_if_rates=args.what_if, top=args.top)
+    finally:
+        await engine.dispose()
+
+    report["seconds"] = round(time.perf_counter() - started, 2)
+    print(json.dumps(report, indent=2))
+    return 1 if report["mismatched_users"] else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--what-if", type=parse_rates, help="alternative per-level rates, e.g. 0.4,0.2,0.1")
+    parser.add_argument("--top", type=int, default=20, help="number of largest mismatches to list")
+    sys.exit(asyncio.run(main(parser.parse_args())))
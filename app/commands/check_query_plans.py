@@ -0,0 +1,173 @@
+# app/commands/check_query_plans.py
+"""
+EXPLAIN the hot list and lookup queries and check each one is served by the
+index meant for it (see migration 0010_query_indexes).
+
+    python -m app.commands.check_query_plans
+    python -m app.commands.check_query_plans --analyze
+
+The statements are the ones the app executes, taken from the services and the
+shared list builders rather than copied, so the check follows the queries as
+they change; tests/test_query_plans.py runs it against Postgres.
+
+Sequential scans are disabled for the check, so the result does not depend on
+how much data the database holds: a query that still plans a Seq Scan has no
+usable index. Exit status is 1 when any query misses its index. --analyze also
+runs the statements (the queue claims and the token purge write) in a
+transaction that is rolled back.
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+import uuid
+from typing import Any, Dict, List
+
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import with_parent
+
+from app.core.config import settings
+from app.db.explain import explain_plan
+from app.db.models.kyc_request import KycRequest
+from app.db.models.transaction import Transaction
+from app.db.models.user import User
+from app.db.models.withdrawal_request import WithdrawalRequest
+from app.db.queries import newest_first
+from app.db.session import AsyncSessionLocal, engine
+from app.services import auth_service, kyc_review_service, user_service, withdrawal_service
+
+PAGE = 100
+ANY_ID = uuid.uuid4()
+# Parent for the relationship loads below; never added to a session
+ANY_USER = User(id=ANY_ID)
+
+# name -> (statement, parameters, table, expected index; None accepts any index,
+# e.g. per-partition indexes). The expected index must serve one of the table's
+# scans: the queue claims also join back to their rows by primary key.
+HOT_QUERIES = {
+    "user_withdrawals": (
+        newest_first(WithdrawalRequest, WithdrawalRequest.user_id == ANY_ID, limit=PAGE), {},
+        "withdrawal_requests", "ix_withdrawal_requests_user_id_created_at",
+    ),
+    "admin_withdrawals_by_status": (
+        newest_first(WithdrawalRequest, WithdrawalRequest.status == "processing", limit=PAGE), {},
+        "withdrawal_requests", "ix_withdrawal_requests_status_created_at",
+    ),
+    "admin_withdrawals": (
+        newest_first(WithdrawalRequest, limit=PAGE), {},
+        "withdrawal_requests", "ix_withdrawal_requests_created_at",
+    ),
+    "stuck_payouts": (
+        withdrawal_service._CLAIM_STUCK_PAYOUTS,
+        {"age_seconds": settings.WITHDRAWAL_RECOVERY_AGE_SECONDS, "limit": settings.WITHDRAWAL_RECOVERY_BATCH},
+        "withdrawal_requests", "ix_withdrawal_requests_status_created_at",
+    ),
+    "kyc_queue": (
+        kyc_review_service._CLAIM,
+        {"reviewer_id": ANY_ID, "limit": settings.KYC_CLAIM_MAX_BATCH, "lease_seconds": settings.KYC_CLAIM_LEASE_SECONDS},
+        "kyc_requests", "ix_kyc_requests_pending_created_at",
+    ),
+    "admin_kyc_by_status": (
+        newest_first(KycRequest, KycRequest.status == "approved", limit=PAGE), {},
+        "kyc_requests", "ix_kyc_requests_status_created_at",
+    ),
+    "admin_kyc": (
+        newest_first(KycRequest, limit=PAGE), {},
+        "kyc_requests", "ix_kyc_requests_created_at",
+    ),
+    "admin_users": (
+        newest_first(User, limit=PAGE), {},
+        "users", "ix_users_created_at",
+    ),
+    "user_transactions": (
+        select(Transaction).where(with_parent(ANY_USER, User.transactions)), {},
+        "transactions", None,
+    ),
+    "direct_referrals": (
+        select(User).where(with_parent(ANY_USER, User.referred_users)), {},
+        "users", "ix_users_referrer_id",
+    ),
+    "login_by_username": (
+        user_service._USER_BY_USERNAME, {"username": "someone"},
+        "users", "ix_users_username",
+    ),
+    "login_by_email": (
+        user_service._USER_BY_EMAIL, {"email": "someone@example.com"},
+        "users", "ix_users_email",
+    ),
+    "expired_refresh_tokens": (
+        auth_service._PURGE_EXPIRED, {},
+        "refresh_tokens", "ix_refresh_tokens_expires_at",
+    ),
+}
+
+
+def _scans(plan: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Every node of the plan that reads a relation, including partitions (not the write of an UPDATE or DELETE)."""
+    nodes = [plan] if "Relation Name" in plan and plan["Node Type"] != "ModifyTable" else []
+    for child in plan.get("Plans", []):
+        nodes.extend(_scans(child))
+    return nodes
+
+
+def _index_names(node: Dict[str, Any]) -> List[str]:
+    """Indexes a scan node reads; a Bitmap Heap Scan names them on its Bitmap Index Scan children."""
+    if "Index Name" in node:
+        return [node["Index Name"]]
+    return [name for child in node.get("Plans", []) for name in _index_names(child)]
+
+
+def _check(plan: Dict[str, Any], table: str, expected_index) -> Dict[str, Any]:
+    scans = [
+        node for node in _scans(plan)
+        if node["Relation Name"] == table or node["Relation Name"].startswith(f"{table}_")
+    ]
+    problems = [f"Seq Scan on {node['Relation Name']}" for node in scans if node["Node Type"] == "Seq Scan"]
+    used = sorted({name for node in scans for name in _index_names(node)})
+    if not scans:
+        problems.append(f"no scan of {table} in the plan")
+    elif expected_index and expected_index not in used:
+        problems.append(f"uses {', '.join(used) or 'no index'}, expected {expected_index}")
+    return {
+        "ok": not problems,
+        "problems": problems,
+        "scans": sorted({f"{node['Node Type']} {' '.join(_index_names(node))}".strip() for node in scans}),
+        "cost": plan["Total Cost"],
+        **({"ms": plan["Actual Total Time"]} if "Actual Total Time" in plan else {}),
+    }
+
+
+async def check_plans(session: AsyncSession, analyze: bool = False) -> Dict[str, Dict[str, Any]]:
+    """EXPLAIN every HOT_QUERIES statement with sequential scans disabled, then roll back."""
+    report = {}
+    await session.execute(text("SET LOCAL enable_seqscan = off"))
+    for name, (statement, params, table, expected_index) in HOT_QUERIES.items():
+        plan = await explain_plan(session, statement, analyze=analyze, params=params)
+        report[name] = _check(plan, table, expected_index)
+    await session.rollback()
+    return report
+
+
+async def main(args) -> int:
+    started = time.perf_counter()
+    try:
+        async with AsyncSessionLocal() as session:
+            report = await check_plans(session, analyze=args.analyze)
+    finally:
+        await engine.dispose()
+
+    failed = [name for name, result in report.items() if not result["ok"]]
+    print(json.dumps({
+        "queries": report,
+        "failed": failed,
+        "seconds": round(time.perf_counter() - started, 2),
+    }, indent=2))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--analyze", action="store_true", help="also run each query (EXPLAIN ANALYZE) for timings")
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,50 @@
+# app/commands/import_users.py
+"""
+Bulk-import users with existing referral relationships.
+
+    python -m app.commands.import_users partners.csv
+    python -m app.commands.import_users partners.ndjson --format ndjson --skip-commissions
+
+Same rules as POST /api/admin/users/import: the whole file is loaded in one
+transaction or rejected with the list of bad rows.
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+
+from fastapi import HTTPException
+
+from app.db.session import AsyncSessionLocal, engine
+from app.services.bulk_import_service import BulkImportService
+
+
+async def main(args) -> int:
+    with open(args.path, "rb") as fh:
+        content = fh.read()
+    fmt = args.format or ("ndjson" if args.path.endswith((".ndjson", ".jsonl")) else "csv")
+
+    started = time.perf_counter()
+    try:
+        rows = BulkImportService.parse(content, fmt)
+        async with AsyncSessionLocal() as session:
+            result = await BulkImportService.import_users(
+                session, rows, post_commissions=not args.skip_commissions
+            )
+    except HTTPException as e:
+        print(json.dumps(e.detail, indent=2), file=sys.stderr)
+        return 1
+    finally:
+        await engine.dispose()
+
+    print(json.dumps({**result.model_dump(), "seconds": round(time.perf_counter() - started, 2)}, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=["csv", "ndjson"])
+    parser.add_argument("--skip-commissions", action="store_true", help="load users without posting commissions")
+    sys.exit(asyncio.run(main(parser.parse_args())))
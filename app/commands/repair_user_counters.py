@@ -0,0 +1,40 @@
+# app/commands/repair_user_counters.py
+"""
+Recompute the denormalized counters on users (total_earned, total_withdrawn,
+pending_withdrawals, direct_referral_count, downline_count) from the source tables.
+
+    python -m app.commands.repair_user_counters --dry-run
+    python -m app.commands.repair_user_counters
+
+Only drifted rows are rewritten. User writes wait while the repair runs; reads do not.
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+
+from app.db.session import AsyncSessionLocal, engine
+from app.services.user_service import UserService
+
+
+async def main(args) -> int:
+    started = time.perf_counter()
+    try:
+        async with AsyncSessionLocal() as session:
+            drifted = await UserService.repair_counters(session, dry_run=args.dry_run)
+    finally:
+        await engine.dispose()
+
+    print(json.dumps({
+        "drifted_users": drifted,
+        "repaired": not args.dry_run,
+        "seconds": round(time.perf_counter() - started, 2),
+    }, indent=2))
+    return 1 if args.dry_run and drifted else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dry-run", action="store_true", help="only count users whose counters have drifted")
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,19 @@
+# app/core/background.py
+# Long-running jobs started from the app lifespan (see app/main.py).
+import asyncio
+import logging
+from typing import Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+
+async def run_periodically(job: Callable[[], Awaitable[None]], interval_seconds: float, name: str) -> None:
+    """Run `job` every `interval_seconds` until cancelled. Failures are logged and retried next round."""
+    while True:
+        try:
+            await job()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Periodic job %s failed", name)
+        await asyncio.sleep(interval_seconds)
@@ -0,0 +1,53 @@
+# app/core/bloom.py
+# Fixed-size Bloom filter: "no" answers are exact, "maybe" answers are wrong at
+# about the configured false-positive rate once `capacity` items are stored.
+import hashlib
+import math
+
+
+class BloomFilter:
+
+    def __init__(self, capacity: int, false_positive_rate: float = 0.01):
+        self.capacity = max(1, capacity)
+        self.false_positive_rate = false_positive_rate
+        self.num_bits = max(8, math.ceil(-self.capacity * math.log(false_positive_rate) / math.log(2) ** 2))
+        self.num_hashes = max(1, round(self.num_bits / self.capacity * math.log(2)))
+        self.count = 0  # approximate number of distinct items added
+        self._bits = bytearray((self.num_bits + 7) // 8)
+
+    def _positions(self, item: str):
+        # Double hashing: k positions from the two halves of one 128-bit digest
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def add(self, item: str) -> bool:
+        """Add an item; returns False if it was (probably) present already."""
+        added = False
+        bits = self._bits
+        for position in self._positions(item):
+            byte, mask = position >> 3, 1 << (position & 7)
+            if not bits[byte] & mask:
+                bits[byte] |= mask
+                added = True
+        if added:
+            self.count += 1
+        return added
+
+    def __contains__(self, item: str) -> bool:
+        bits = self._bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+    @property
+    def is_saturated(self) -> bool:
+        return self.count > self.capacity
+
+    def snapshot(self) -> dict:
+        return {
+            "capacity": self.capacity,
+            "count": self.count,
+            "bits": self.num_bits,
+            "hashes": self.num_hashes,
+            "size_bytes": len(self._bits),
+        }
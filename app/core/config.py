@@ -2,6 +2,7 @@
 from pydantic_settings import BaseSettings
 from pydantic import PostgresDsn, validator, AnyHttpUrl
 from typing import Optional, List, Union
+from cryptography.fernet import Fernet
 import json
 
 
@@ -15,18 +16,127 @@ class Settings(BaseSettings):
     SUPABASE_URL: AnyHttpUrl
     SUPABASE_KEY: str
 
+    # Optional read replica for admin/reporting reads (see app/db/routing.py)
+    DATABASE_REPLICA_URL: Optional[PostgresDsn] = None
+    REPLICA_MAX_LAG_SECONDS: float = 5.0
+    REPLICA_LAG_CHECK_INTERVAL_SECONDS: float = 2.0
+    # After a client's own write, its reads stay on the primary for this long (carried in a cookie)
+    READ_YOUR_WRITES_SECONDS: float = 10.0
+
+    # Connection pool
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    # Connections opened (and hot statements prepared) during startup
+    DB_PREWARM_CONNECTIONS: int = 5
+    # How long startup waits for pre-warming before serving (readiness stays false until done)
+    STARTUP_WARMUP_TIMEOUT_SECONDS: float = 10.0
+
     # JWT
     JWT_SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    REFRESH_TOKEN_PURGE_INTERVAL_SECONDS: int = 3600
+    # Verified access tokens kept per worker (until their exp) so requests skip jwt.decode; 0 disables
+    JWT_CACHE_SIZE: int = 10000
 
     # Stripe
     STRIPE_SECRET_KEY: str
     STRIPE_PUBLIC_KEY: str
     STRIPE_WEBHOOK_SECRET: str
 
-   
+    # Fernet keys for saved bank details (see PayoutDestination), comma separated: the
+    # first encrypts and every one decrypts, so rotating means prepending a new key.
+    # Generate one with
+    # `python -c "from cryptography.fernet import Fernet; print(Fernet.generate_key().decode())"`
+    PAYOUT_ENCRYPTION_KEY: str
+    # HMAC key for PayoutDestination.fingerprint, independent of the Fernet keys. Never
+    # rotate it: saved destinations would stop matching. Deployments that saved
+    # destinations before this setting existed set it to their original PAYOUT_ENCRYPTION_KEY.
+    PAYOUT_FINGERPRINT_KEY: str
+
+    # External provider guards (see app/core/resilience.py)
+    STRIPE_MAX_CONCURRENT_CALLS: int = 20
+    STRIPE_TIMEOUT_SECONDS: float = 10.0
+    STORAGE_MAX_CONCURRENT_CALLS: int = 10
+    STORAGE_TIMEOUT_SECONDS: float = 15.0
+    PROVIDER_BULKHEAD_WAIT_SECONDS: float = 1.0  # wait for a free slot before answering 503
+    PROVIDER_MAX_RETRIES: int = 2  # idempotent calls only
+    PROVIDER_RETRY_BASE_SECONDS: float = 0.2
+    CIRCUIT_FAILURE_THRESHOLD: int = 5  # consecutive failures that open the circuit
+    CIRCUIT_RESET_SECONDS: float = 30.0  # open time before a trial call is let through
+
+    # Transactions are range-partitioned by month (see app/db/partitions.py)
+    TRANSACTION_PARTITION_MONTHS_AHEAD: int = 3
+    PARTITION_MAINTENANCE_INTERVAL_SECONDS: int = 86400
+
+    # Daily admin rollups (see app/services/rollup_service.py)
+    ROLLUP_INTERVAL_SECONDS: int = 300
+    ROLLUP_LOOKBACK_SECONDS: int = 900  # rescan window for rows committed after the watermark moved
+
+    # Server-sent events fed by Postgres LISTEN/NOTIFY (see app/core/events.py)
+    EVENTS_ENABLED: bool = True
+    # LISTEN needs a session-level connection: point this at the direct database
+    # host when DATABASE_URL goes through a transaction-mode pooler
+    EVENTS_LISTEN_URL: Optional[PostgresDsn] = None
+    EVENTS_REPLAY_BUFFER: int = 1000  # recent events kept per worker for Last-Event-ID
+    EVENTS_HEARTBEAT_SECONDS: float = 15.0
+    EVENTS_SUBSCRIBER_QUEUE: int = 100  # a slower client is disconnected and resumes via Last-Event-ID
+
+    # Withdrawal payouts (see WithdrawalService.recover_pending_payouts)
+    WITHDRAWAL_RECOVERY_INTERVAL_SECONDS: int = 60
+    WITHDRAWAL_RECOVERY_AGE_SECONDS: int = 120  # a 'pending_payout' request untouched this long is retried
+    WITHDRAWAL_RECOVERY_BATCH: int = 20
+
+    # Username/email availability filter (see app/services/availability_service.py)
+    AVAILABILITY_FILTER_FALSE_POSITIVE_RATE: float = 0.01
+    AVAILABILITY_FILTER_MIN_CAPACITY: int = 1_000_000  # keys (two per user)
+    AVAILABILITY_FILTER_REFRESH_SECONDS: int = 30  # picks up users created by other workers
+    AVAILABILITY_FILTER_LOOKBACK_SECONDS: int = 120  # rescan margin; open transactions already hold the watermark back
+    AVAILABILITY_FILTER_REBUILD_SECONDS: int = 86400  # full rebuild, also picks up renamed users
+
+    # X-Total-Count on admin lists (see app/api/totals.py)
+    ADMIN_COUNT_EXACT_LIMIT: int = 10000  # larger totals are reported as planner estimates
+    ADMIN_COUNT_CACHE_SECONDS: float = 5.0
+
+    # KYC review queue (see app/services/kyc_review_service.py)
+    KYC_CLAIM_LEASE_SECONDS: int = 900  # claimed requests return to the queue after this
+    KYC_CLAIM_MAX_BATCH: int = 50
+
+    # Production server (see app/server.py). Every worker has its own DB pool,
+    # so keep WEB_CONCURRENCY * (DB_POOL_SIZE + DB_MAX_OVERFLOW) within the database limit.
+    WEB_CONCURRENCY: Optional[int] = None  # defaults to the CPU count
+    SERVER_HOST: str = "0.0.0.0"
+    SERVER_PORT: int = 8000
+    SERVER_BACKLOG: int = 2048
+    SERVER_KEEPALIVE_SECONDS: int = 5
+    SERVER_LIMIT_CONCURRENCY: Optional[int] = None  # per worker; excess requests get 503
+    SERVER_MAX_REQUESTS: int = 10000  # recycle a worker after this many requests (0 disables)
+    SERVER_MAX_REQUESTS_JITTER: int = 1000
+    SERVER_GRACEFUL_TIMEOUT_SECONDS: int = 30
+
+    # SQL accounting (see app/db/query_stats.py)
+    SQL_STATS_ENABLED: bool = True
+    SQL_SLOW_QUERY_MS: float = 200.0
+    SQL_N_PLUS_ONE_THRESHOLD: int = 5
+    SQL_SERVER_TIMING: bool = False
+    SQL_STATS_HEADERS: bool = False
+
+    @validator("PAYOUT_ENCRYPTION_KEY")
+    def check_payout_encryption_keys(cls, v: str) -> str:
+        # Fail at startup rather than on the first withdrawal
+        for key in v.split(","):
+            try:
+                Fernet(key.strip())
+            except ValueError:
+                raise ValueError("each key must be a urlsafe base64-encoded 32-byte Fernet key")
+        return v
+
+    @validator("PAYOUT_FINGERPRINT_KEY")
+    def check_payout_fingerprint_key(cls, v: str) -> str:
+        if len(v) < 32:
+            raise ValueError("use at least 32 random characters")
+        return v
 
     class Config:
         case_sensitive = True
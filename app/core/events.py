@@ -0,0 +1,214 @@
+# app/core/events.py
+# Push notifications for status changes. Writers call publish_event() inside their
+# transaction, so Postgres delivers the NOTIFY on commit and drops it on rollback.
+# Each worker process holds one LISTEN connection and fans events out to its
+# server-sent event streams, keeping a short ring buffer for Last-Event-ID resumes.
+import asyncio
+import json
+import logging
+from collections import deque
+from dataclasses import dataclass
+from typing import AsyncIterator, Deque, List, Optional, Set, Tuple
+
+import asyncpg
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Sequence, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.base_class import Base
+
+logger = logging.getLogger(__name__)
+
+EVENT_CHANNEL = "app_events"
+# Event ids are global across workers, so a client can resume on any of them
+event_ids = Sequence("app_event_ids", metadata=Base.metadata)
+
+# Keep the payload small (NOTIFY is limited to 8000 bytes): ids and statuses only
+_PUBLISH = text("""
+    SELECT pg_notify(:channel, json_build_object(
+        'id', nextval('app_event_ids'),
+        'type', CAST(:type AS text),
+        'user_id', CAST(:user_id AS text),
+        'data', CAST(:data AS json)
+    )::text)
+""")
+
+# Same payload, one NOTIFY per row of the unnested arrays
+_PUBLISH_MANY = text("""
+    SELECT pg_notify(:channel, json_build_object(
+        'id', nextval('app_event_ids'),
+        'type', CAST(:type AS text),
+        'user_id', event.user_id,
+        'data', event.data
+    )::text)
+    FROM unnest(CAST(:user_ids AS text[]), CAST(:data AS json[])) AS event(user_id, data)
+""")
+
+RECONNECT_DELAY_SECONDS = 2.0
+
+
+async def publish_event(db: AsyncSession, event_type: str, user_id, **data) -> None:
+    """Queue an event for delivery when the caller's transaction commits. Does not commit."""
+    await db.execute(_PUBLISH, {
+        "channel": EVENT_CHANNEL,
+        "type": event_type,
+        "user_id": str(user_id) if user_id else None,
+        "data": json.dumps(data, default=str),
+    })
+
+
+async def publish_events(db: AsyncSession, event_type: str, events: List[Tuple[object, dict]]) -> None:
+    """Queue one event per (user_id, data) pair in a single statement. Does not commit."""
+    if not events:
+        return
+    await db.execute(_PUBLISH_MANY, {
+        "channel": EVENT_CHANNEL,
+        "type": event_type,
+        "user_ids": [str(user_id) if user_id else None for user_id, _ in events],
+        "data": [json.dumps(data, default=str) for _, data in events],
+    })
+
+
+@dataclass
+class Event:
+    id: int
+    type: str
+    user_id: Optional[str]
+    payload: str
+
+    def frame(self) -> str:
+        return f"id: {self.id}\nevent: {self.type}\ndata: {self.payload}\n\n"
+
+
+# Sent when the client may have missed events: it should refetch current state
+RESYNC_FRAME = "event: resync\ndata: {}\n\n"
+
+
+class Subscription:
+    def __init__(self, user_id: Optional[str]):
+        self.user_id = user_id  # None: admin stream, sees every event
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=settings.EVENTS_SUBSCRIBER_QUEUE)
+        self.overflowed = False
+
+    def wants(self, event: Event) -> bool:
+        return self.user_id is None or event.user_id == self.user_id
+
+
+class EventBroker:
+    """One LISTEN connection per worker, fanned out to in-process subscribers."""
+
+    def __init__(self, buffer_size: int):
+        self._buffer: Deque[Event] = deque(maxlen=buffer_size)
+        self._subscribers: Set[Subscription] = set()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._listen_forever())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _listen_forever(self) -> None:
+        url = make_url(str(settings.EVENTS_LISTEN_URL or settings.DATABASE_URL)).set(drivername="postgresql")
+        dsn = url.render_as_string(hide_password=False)
+        first = True
+        while True:
+            connection = None
+            try:
+                connection = await asyncpg.connect(dsn)
+                lost = asyncio.Event()
+                connection.add_termination_listener(lambda _: lost.set())
+                await connection.add_listener(EVENT_CHANNEL, self._on_notify)
+                if not first:
+                    # Anything published while disconnected never reached this worker
+                    self._buffer.clear()
+                    self._broadcast_resync()
+                first = False
+                await lost.wait()
+                logger.warning("Event listener connection lost, reconnecting")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Event listener failed, retrying: %s", e)
+            finally:
+                if connection is not None and not connection.is_closed():
+                    await connection.close()
+            await asyncio.sleep(RECONNECT_DELAY_SECONDS)
+
+    def _on_notify(self, connection, pid: int, channel: str, payload: str) -> None:
+        message = json.loads(payload)
+        event = Event(id=message["id"], type=message["type"], user_id=message["user_id"], payload=payload)
+        self._buffer.append(event)
+        for subscription in list(self._subscribers):
+            if subscription.wants(event):
+                self._deliver(subscription, event)
+
+    def _deliver(self, subscription: Subscription, event: Optional[Event]) -> None:
+        try:
+            subscription.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            subscription.overflowed = True
+
+    def _broadcast_resync(self) -> None:
+        for subscription in list(self._subscribers):
+            self._deliver(subscription, None)
+
+    def subscribe(self, user_id: Optional[str], last_event_id: Optional[int]):
+        """
+        Register a subscriber and collect what it missed since `last_event_id`.
+        Returns (subscription, replay); replay is None when the id is no longer buffered.
+        """
+        subscription = Subscription(user_id)
+        # No await between registering and snapshotting the buffer, so nothing falls in between
+        self._subscribers.add(subscription)
+        replay: Optional[List[Event]] = []
+        if last_event_id is not None:
+            buffered = list(self._buffer)
+            # Delivery order is commit order, not id order, so resume by position
+            position = next((i for i, event in enumerate(buffered) if event.id == last_event_id), None)
+            if position is None:
+                replay = None
+            else:
+                replay = [event for event in buffered[position + 1:] if subscription.wants(event)]
+        return subscription, replay
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self._subscribers.discard(subscription)
+
+    async def stream(self, subscription: Subscription, replay: Optional[List[Event]]) -> AsyncIterator[str]:
+        try:
+            yield f"retry: {int(RECONNECT_DELAY_SECONDS * 1000)}\n\n"
+            if replay is None:
+                yield RESYNC_FRAME
+            else:
+                for event in replay:
+                    yield event.frame()
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscription.queue.get(), settings.EVENTS_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                if subscription.overflowed:
+                    # Too far behind: end the stream; the client resumes with Last-Event-ID
+                    return
+                yield RESYNC_FRAME if event is None else event.frame()
+        finally:
+            self.unsubscribe(subscription)
+
+
+event_broker = EventBroker(settings.EVENTS_REPLAY_BUFFER)
+
+
+def event_stream_response(user_id: Optional[str], last_event_id: Optional[int]) -> StreamingResponse:
+    subscription, replay = event_broker.subscribe(user_id, last_event_id)
+    return StreamingResponse(
+        event_broker.stream(subscription, replay),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
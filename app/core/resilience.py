@@ -0,0 +1,249 @@
+# app/core/resilience.py
+# Guard rails for calls to external providers (Stripe, Supabase Storage). Their
+# SDKs are synchronous, so every call runs on a small per-provider thread pool:
+# - bulkhead: at most `max_concurrent` calls in flight; callers wait briefly for
+#   a slot, then get 503 instead of queueing behind a slow provider
+# - deadline: the caller stops waiting after `timeout` seconds (504)
+# - retries: only for calls marked idempotent, with jittered exponential backoff
+# - circuit breaker: after consecutive failures the provider is skipped (503 with
+#   Retry-After) until a single trial call succeeds
+import asyncio
+import logging
+import math
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional
+
+from fastapi import HTTPException, status
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ProviderUnavailable(HTTPException):
+    """The call was not made: the circuit is open or the bulkhead is full."""
+
+    def __init__(self, provider: str, retry_after: float, reason: str):
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"{provider} is temporarily unavailable ({reason})",
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))}
+        )
+        self.provider = provider
+        self.reason = reason
+
+
+class ProviderTimeout(HTTPException):
+    """The call was made but did not finish within its deadline; its outcome is unknown."""
+
+    def __init__(self, provider: str, timeout: float):
+        super().__init__(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail=f"{provider} did not respond within {timeout:g}s"
+        )
+        self.provider = provider
+
+
+class CircuitBreaker:
+    """Consecutive-failure breaker: closed -> open -> half_open (one trial call) -> closed."""
+
+    def __init__(self, name: str, failure_threshold: int, reset_seconds: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self._trial_in_flight = False
+
+    def retry_after(self) -> float:
+        if self.state == "closed":
+            return 0.0
+        return max(0.0, self.opened_at + self.reset_seconds - time.monotonic())
+
+    def allow(self) -> bool:
+        if self.state == "closed":
+            return True
+        if self.state == "open" and self.retry_after() <= 0:
+            self.state = "half_open"
+        if self.state == "half_open" and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self.consecutive_failures += 1
+        self._trial_in_flight = False
+        if self.state == "open":
+            # Calls already in flight when the circuit opened; they must not extend the open window
+            return
+        if self.state == "half_open" or self.consecutive_failures >= self.failure_threshold:
+            logger.warning("%s circuit opened after %d consecutive failures", self.name, self.consecutive_failures)
+            self.state = "open"
+            self.opened_at = time.monotonic()
+
+    def release_trial(self) -> None:
+        """A trial call that ended without a verdict (bulkhead full, caller cancelled) frees the slot."""
+        self._trial_in_flight = False
+
+
+class Provider:
+    """One external dependency with its own bulkhead, deadline, retry policy and breaker."""
+
+    def __init__(
+        self,
+        name: str,
+        max_concurrent: int,
+        timeout: float,
+        is_transient: Callable[[BaseException], bool] = lambda exc: True
+    ):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.timeout = timeout
+        self.is_transient = is_transient
+        self.breaker = CircuitBreaker(name, settings.CIRCUIT_FAILURE_THRESHOLD, settings.CIRCUIT_RESET_SECONDS)
+        self._slots = asyncio.Semaphore(max_concurrent)
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrent, thread_name_prefix=f"{name}-calls")
+        self.in_flight = 0
+        self.counters: Dict[str, int] = {
+            "calls": 0, "successes": 0, "failures": 0, "timeouts": 0, "retries": 0,
+            "rejected_open": 0, "rejected_bulkhead": 0,
+        }
+
+    def ensure_available(self) -> None:
+        """Fail fast before starting work that needs this provider (does not consume the trial call)."""
+        if self.breaker.state == "open" and self.breaker.retry_after() > 0:
+            self.counters["rejected_open"] += 1
+            raise ProviderUnavailable(self.name, self.breaker.retry_after(), "circuit open")
+
+    async def call(
+        self,
+        fn: Callable[..., Any],
+        *args,
+        idempotent: bool = False,
+        timeout: Optional[float] = None,
+        **kwargs
+    ) -> Any:
+        """
+        Run the synchronous `fn(*args, **kwargs)` under this provider's guards.
+        Exceptions from `fn` are re-raised unchanged once retries are exhausted.
+        """
+        attempts = 1 + (settings.PROVIDER_MAX_RETRIES if idempotent else 0)
+        for attempt in range(attempts):
+            try:
+                return await self._attempt(partial(fn, *args, **kwargs), timeout or self.timeout)
+            except ProviderUnavailable:
+                raise
+            except Exception as exc:
+                transient = isinstance(exc, ProviderTimeout) or self.is_transient(exc)
+                if not transient or attempt == attempts - 1:
+                    raise
+                self.counters["retries"] += 1
+                # Full jitter keeps retrying clients from synchronising
+                await asyncio.sleep(random.uniform(0, settings.PROVIDER_RETRY_BASE_SECONDS * 2 ** attempt))
+
+    async def _attempt(self, call: Callable[[], Any], timeout: float) -> Any:
+        if not self.breaker.allow():
+            self.counters["rejected_open"] += 1
+            raise ProviderUnavailable(self.name, self.breaker.retry_after(), "circuit open")
+        try:
+            return await self._guarded(call, timeout)
+        except asyncio.CancelledError:
+            # A cancelled caller gives no verdict; let another request make the trial call
+            self.breaker.release_trial()
+            raise
+
+    async def _guarded(self, call: Callable[[], Any], timeout: float) -> Any:
+        try:
+            await asyncio.wait_for(self._slots.acquire(), settings.PROVIDER_BULKHEAD_WAIT_SECONDS)
+        except asyncio.TimeoutError:
+            self.breaker.release_trial()
+            self.counters["rejected_bulkhead"] += 1
+            raise ProviderUnavailable(self.name, settings.PROVIDER_BULKHEAD_WAIT_SECONDS, "too many concurrent calls")
+
+        self.counters["calls"] += 1
+        self.in_flight += 1
+        future = asyncio.get_running_loop().run_in_executor(self._executor, call)
+
+        def _free_slot(_) -> None:
+            # The slot is held until the thread really finishes, even after a
+            # timeout, so a hung provider can never take more than its bulkhead
+            self.in_flight -= 1
+            self._slots.release()
+
+        future.add_done_callback(_free_slot)
+        try:
+            result = await asyncio.wait_for(asyncio.shield(future), timeout)
+        except asyncio.TimeoutError:
+            self.counters["timeouts"] += 1
+            self.counters["failures"] += 1
+            self.breaker.record_failure()
+            raise ProviderTimeout(self.name, timeout)
+        except Exception as exc:
+            if self.is_transient(exc):
+                self.counters["failures"] += 1
+                self.breaker.record_failure()
+            else:
+                # The provider answered (e.g. a declined card): it is healthy
+                self.breaker.record_success()
+            raise
+        self.counters["successes"] += 1
+        self.breaker.record_success()
+        return result
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "state": self.breaker.state,
+            "consecutive_failures": self.breaker.consecutive_failures,
+            "retry_after_seconds": round(self.breaker.retry_after(), 1),
+            "in_flight": self.in_flight,
+            "max_concurrent": self.max_concurrent,
+            "timeout_seconds": self.timeout,
+            **self.counters,
+        }
+
+
+def _stripe_transient(exc: BaseException) -> bool:
+    """Network, 5xx and rate-limit errors mean Stripe is struggling; other errors are answers."""
+    from app.core.stripe_client import get_stripe
+
+    error = get_stripe().error
+    return isinstance(exc, (error.APIConnectionError, error.APIError, error.RateLimitError))
+
+
+def _storage_transient(exc: BaseException) -> bool:
+    """
+    Network errors, timeouts and 5xx mean storage is struggling; 4xx answers
+    (a missing object, an upload conflict) say nothing about its health.
+    """
+    import httpx
+    from storage3.utils import StorageException
+
+    if isinstance(exc, httpx.TransportError):
+        return True
+    if isinstance(exc, StorageException):
+        # storage3 raises StorageException({...response body, "statusCode": <int>})
+        details = exc.args[0] if exc.args and isinstance(exc.args[0], dict) else {}
+        try:
+            return int(details.get("statusCode")) >= 500
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+stripe_provider = Provider(
+    "stripe", settings.STRIPE_MAX_CONCURRENT_CALLS, settings.STRIPE_TIMEOUT_SECONDS, _stripe_transient
+)
+storage_provider = Provider(
+    "storage", settings.STORAGE_MAX_CONCURRENT_CALLS, settings.STORAGE_TIMEOUT_SECONDS, _storage_transient
+)
+PROVIDERS: List[Provider] = [stripe_provider, storage_provider]
@@ -1,9 +1,14 @@
 # app/core/security.py
 from passlib.context import CryptContext
 from jose import JWTError, jwt
+from cryptography.fernet import Fernet, MultiFernet
 from datetime import datetime, timedelta, timezone
 from app.core.config import settings
-from typing import Optional
+from typing import Optional, Tuple
+from collections import OrderedDict
+import hashlib
+import hmac
+import time
 
 # Password hashing context
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -24,4 +29,44 @@ def create_access_token(subject: str, expires_delta: Optional[timedelta] = None)
     encoded_jwt = jwt.encode(to_encode, settings.JWT_SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
-# We will add a function to verify and decode tokens later when we need it in dependencies.
\ No newline at end of file
+def _bank_details_cipher() -> MultiFernet:
+    # Encrypts with the first key; tokens from the older keys after it still decrypt
+    return MultiFernet([Fernet(key.strip()) for key in settings.PAYOUT_ENCRYPTION_KEY.split(",")])
+
+def encrypt_bank_detail(value: str) -> str:
+    return _bank_details_cipher().encrypt(value.encode()).decode()
+
+def decrypt_bank_detail(token: str) -> str:
+    return _bank_details_cipher().decrypt(token.encode()).decode()
+
+def bank_account_fingerprint(account_number: str, account_name: str) -> str:
+    """
+    Deterministic keyed hash for finding an already saved account without decrypting.
+    Keyed separately from the encryption, so rotating the Fernet keys keeps it stable.
+    """
+    message = f"{account_number.strip()}\x00{account_name.strip().lower()}".encode()
+    return hmac.new(settings.PAYOUT_FINGERPRINT_KEY.encode(), message, hashlib.sha256).hexdigest()
+
+# Verified access tokens -> (payload, exp). Entries are dropped once expired, so a
+# hit is exactly as valid as a fresh jwt.decode.
+_verified_tokens: "OrderedDict[str, Tuple[dict, float]]" = OrderedDict()
+
+def decode_access_token(token: str) -> dict:
+    """
+    jwt.decode behind a small LRU of already verified tokens. Raises JWTError.
+    Returns a copy, so callers cannot change what later hits are served.
+    """
+    cached = _verified_tokens.get(token)
+    if cached is not None:
+        payload, expires = cached
+        if expires > time.time():
+            _verified_tokens.move_to_end(token)
+            return dict(payload)
+        del _verified_tokens[token]
+
+    payload = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[settings.ALGORITHM])
+    if settings.JWT_CACHE_SIZE > 0 and "exp" in payload:
+        _verified_tokens[token] = (payload, float(payload["exp"]))
+        if len(_verified_tokens) > settings.JWT_CACHE_SIZE:
+            _verified_tokens.popitem(last=False)
+    return dict(payload)
\ No newline at end of file
@@ -1,8 +1,31 @@
 # app/core/stripe_client.py
-import stripe
+# The Stripe SDK is imported and configured lazily: importing it costs a large
+# share of application import time, and the app lifespan constructs it before
+# the first request anyway (see app/main.py).
+from typing import Any, Optional
 from app.core.config import settings
 
-# Configure the Stripe SDK with the secret key
-stripe.api_key = settings.STRIPE_SECRET_KEY
-# Optional: For better error handling, you can set the API version
-# stripe.api_version = "2023-10-16"
\ No newline at end of file
+_stripe: Optional[Any] = None
+
+
+def get_stripe() -> Any:
+    """Return the configured Stripe SDK module, importing it on first use."""
+    global _stripe
+    if _stripe is None:
+        import stripe
+
+        # Configure the Stripe SDK with the secret key
+        stripe.api_key = settings.STRIPE_SECRET_KEY
+        # Optional: For better error handling, you can set the API version
+        # stripe.api_version = "2023-10-16"
+        # Bound the HTTP call itself too, so a worker thread is never stuck for
+        # the SDK's 80s default after app/core/resilience.py stops waiting
+        stripe.default_http_client = stripe.http_client.RequestsClient(timeout=settings.STRIPE_TIMEOUT_SECONDS)
+        _stripe = stripe
+    return _stripe
+
+
+def set_stripe_client(client: Any) -> None:
+    """Replace the Stripe SDK, e.g. with the in-process stand-in used by benchmarks."""
+    global _stripe
+    _stripe = client
@@ -6,4 +6,8 @@
 from app.db.models.user import User
 from app.db.models.transaction import Transaction
 from app.db.models.kyc_request import KycRequest
-from app.db.models.withdrawal_request import WithdrawalRequest
\ No newline at end of file
+from app.db.models.withdrawal_request import WithdrawalRequest
+from app.db.models.payout_destination import PayoutDestination
+from app.db.models.daily_rollup import DailyRollup, RollupWatermark
+from app.db.models.verified_payment_intent import VerifiedPaymentIntent
+from app.db.models.refresh_token import RefreshToken
\ No newline at end of file
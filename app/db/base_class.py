@@ -13,14 +13,12 @@ Base = declarative_base()
 class BaseModel(Base):
     __abstract__ = True  # This class won't form its own table
 
-    # Generate a UUID primary key by default
+    # Generate a UUID primary key by default (the primary key is already a unique index)
     id = Column(
         UUID(as_uuid=True),
         primary_key=True,
         default=uuid.uuid4,
-        unique=True,
-        nullable=False,
-        index=True
+        nullable=False
     )
     
     # Automatic timestamps
@@ -0,0 +1,34 @@
+# app/db/explain.py
+# EXPLAIN for SQLAlchemy statements, with bound parameters passed as parameters
+# rather than rendered into the SQL text.
+import json
+from typing import Any, Dict, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.base import Executable
+from sqlalchemy.sql.elements import ClauseElement
+
+
+class Explain(Executable, ClauseElement):
+    inherit_cache = False
+
+    def __init__(self, statement, analyze: bool = False):
+        self.statement = statement
+        self.analyze = analyze
+
+
+@compiles(Explain, "postgresql")
+def _compile_explain(element: Explain, compiler, **kw) -> str:
+    options = "ANALYZE, BUFFERS, FORMAT JSON" if element.analyze else "FORMAT JSON"
+    return f"EXPLAIN ({options}) " + compiler.process(element.statement, **kw)
+
+
+async def explain_plan(
+    db: AsyncSession, statement, analyze: bool = False, params: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """The top plan node of `statement`, run with `params` (ANALYZE runs it)."""
+    document = (await db.execute(Explain(statement, analyze), params)).scalar_one()
+    if isinstance(document, str):
+        document = json.loads(document)
+    return document[0]["Plan"]
@@ -4,5 +4,9 @@ from app.db.models.user import User
 from app.db.models.transaction import Transaction
 from app.db.models.kyc_request import KycRequest
 from app.db.models.withdrawal_request import WithdrawalRequest
+from app.db.models.payout_destination import PayoutDestination
+from app.db.models.daily_rollup import DailyRollup, RollupWatermark
+from app.db.models.verified_payment_intent import VerifiedPaymentIntent
+from app.db.models.refresh_token import RefreshToken
 
-__all__ = ["User", "Transaction", "KycRequest", "WithdrawalRequest"]
+__all__ = ["User", "Transaction", "KycRequest", "WithdrawalRequest", "PayoutDestination", "DailyRollup", "RollupWatermark", "VerifiedPaymentIntent", "RefreshToken"]
@@ -0,0 +1,26 @@
+# app/db/models/daily_rollup.py
+from sqlalchemy import Column, String, Numeric, BigInteger, Date, DateTime
+
+from app.db.base_class import Base
+
+
+class DailyRollup(Base):
+    """
+    Pre-aggregated admin trend data, one row per (day, metric, dimension).
+    Rebuilt a whole day at a time by RollupService, so rows are never incremented in place.
+    """
+    __tablename__ = "daily_rollups"
+
+    day = Column(Date, primary_key=True)
+    metric = Column(String, primary_key=True)     # 'signups', 'commission', 'withdrawals'
+    dimension = Column(String, primary_key=True)  # 'all'/'referred', 'level_N', withdrawal status
+    count = Column(BigInteger, nullable=False, default=0)
+    amount = Column(Numeric(14, 2), nullable=False, default=0)
+
+
+class RollupWatermark(Base):
+    """How far the incremental rollup job has processed source rows."""
+    __tablename__ = "rollup_watermarks"
+
+    name = Column(String, primary_key=True)
+    watermark = Column(DateTime(timezone=True), nullable=False)
@@ -1,5 +1,5 @@
 # app/db/models/kyc_request.py
-from sqlalchemy import Column, String, ForeignKey
+from sqlalchemy import Column, String, DateTime, ForeignKey, Index, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 
@@ -20,5 +20,25 @@ class KycRequest(BaseModel):
     document_back_url = Column(String, nullable=True)
     selfie_url = Column(String, nullable=False)
 
+    # Review queue lease (see KycReviewService.claim): the reviewer holding the
+    # request and when the claim lapses back to the queue
+    claimed_by = Column(
+        UUID(as_uuid=True),
+        ForeignKey("users.id", ondelete="SET NULL"),
+        nullable=True
+    )
+    claim_expires_at = Column(DateTime(timezone=True), nullable=True)
+
     # Relationship to User
-    user = relationship("User", back_populates="kyc_requests")
\ No newline at end of file
+    user = relationship("User", back_populates="kyc_requests", foreign_keys=[user_id])
+
+    # The queue only ever scans pending requests, oldest first; the admin list
+    # pages by created_at, optionally filtered by status
+    __table_args__ = (
+        Index(
+            'ix_kyc_requests_pending_created_at', 'created_at',
+            postgresql_where=text("status = 'pending'")
+        ),
+        Index('ix_kyc_requests_status_created_at', 'status', 'created_at'),
+        Index('ix_kyc_requests_created_at', 'created_at'),
+    )
\ No newline at end of file
@@ -0,0 +1,34 @@
+# app/db/models/payout_destination.py
+from sqlalchemy import Column, String, Boolean, ForeignKey, UniqueConstraint
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import relationship
+
+from app.db.base_class import BaseModel
+
+class PayoutDestination(BaseModel):
+    __tablename__ = "payout_destinations"
+
+    user_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("users.id", ondelete="CASCADE"),
+        nullable=False
+    )
+    bank_name = Column(String, nullable=False)
+    account_name = Column(String, nullable=False)
+    account_last4 = Column(String(4), nullable=False)
+    # Fernet ciphertext (see app/core/security.py); the plain number is never stored
+    account_number_encrypted = Column(String, nullable=False)
+    # Keyed hash of the account details, so the same account is saved (and tokenized) once per user
+    fingerprint = Column(String(64), nullable=False)
+    # Tokenized once when the destination is saved; withdrawals pay out to it directly
+    stripe_bank_account_id = Column(String, nullable=False)
+    # Removed destinations are deactivated, not deleted: withdrawals keep referencing them
+    is_active = Column(Boolean, nullable=False, default=True, server_default="true")
+
+    # Relationships
+    user = relationship("User", back_populates="payout_destinations")
+
+    # The unique constraint's index also serves lookups by user_id
+    __table_args__ = (
+        UniqueConstraint('user_id', 'fingerprint', name='uq_payout_destinations_user_fingerprint'),
+    )
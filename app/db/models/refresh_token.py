@@ -0,0 +1,31 @@
+# app/db/models/refresh_token.py
+from sqlalchemy import Column, String, DateTime, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import relationship
+
+from app.db.base_class import BaseModel
+
+class RefreshToken(BaseModel):
+    __tablename__ = "refresh_tokens"
+
+    user_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("users.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True
+    )
+    # SHA-256 of the opaque token; the token itself is only ever held by the client
+    token_hash = Column(String(64), nullable=False, unique=True)
+    # Every rotation of one login shares a family; reusing a rotated token revokes the family
+    family_id = Column(UUID(as_uuid=True), nullable=False, index=True)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+    used_at = Column(DateTime(timezone=True), nullable=True)  # set when rotated
+    revoked_at = Column(DateTime(timezone=True), nullable=True)
+
+    # Relationships
+    user = relationship("User")
+
+    # Served to the periodic purge of expired tokens
+    __table_args__ = (
+        Index('ix_refresh_tokens_expires_at', 'expires_at'),
+    )
@@ -1,18 +1,35 @@
 # app/db/models/transaction.py
-from sqlalchemy import Column, String, Numeric, ForeignKey
+import uuid
+from sqlalchemy import Column, String, Numeric, ForeignKey, DateTime, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
 
 from app.db.base_class import BaseModel
 
 class Transaction(BaseModel):
     __tablename__ = "transactions"
 
+    # The table is range-partitioned by created_at (monthly partitions, see
+    # app/db/partitions.py). Postgres requires the partition key in every unique
+    # constraint, so the primary key is (id, created_at) and id alone is not unique-indexed.
+    id = Column(
+        UUID(as_uuid=True),
+        primary_key=True,
+        default=uuid.uuid4,
+        nullable=False
+    )
+    created_at = Column(
+        DateTime(timezone=True),
+        primary_key=True,
+        server_default=func.now(),
+        nullable=False
+    )
+
     user_id = Column(
         UUID(as_uuid=True),
         ForeignKey("users.id", ondelete="CASCADE"),
-        nullable=False,
-        index=True
+        nullable=False
     )
     tx_type = Column(String, nullable=False) # 'commission', 'withdrawal', 'bonus'
     reference = Column(String, nullable=True)
@@ -21,5 +38,20 @@ class Transaction(BaseModel):
 
     # Relationship to User
     user = relationship("User", back_populates="transactions", foreign_keys=[user_id])
-    # Relationship to WithdrawalRequest (one-to-one)
-    withdrawal_request = relationship("WithdrawalRequest", back_populates="transaction", uselist=False)
\ No newline at end of file
+    # Relationship to WithdrawalRequest (one-to-one). There is no database-level foreign key:
+    # a foreign key cannot reference a partitioned table without including created_at.
+    withdrawal_request = relationship(
+        "WithdrawalRequest",
+        primaryjoin="Transaction.id == foreign(WithdrawalRequest.transaction_id)",
+        back_populates="transaction",
+        uselist=False
+    )
+
+    __table_args__ = (
+        # BRIN stays tiny on append-only, time-ordered data and lets date-range
+        # scans skip whole block ranges inside each partition
+        Index('ix_transactions_created_at_brin', 'created_at', postgresql_using='brin'),
+        # A user's history, newest first; also serves lookups by user_id alone
+        Index('ix_transactions_user_id_created_at', 'user_id', 'created_at'),
+        {'postgresql_partition_by': 'RANGE (created_at)'},
+    )
@@ -1,6 +1,6 @@
 # app/db/models/user.py
 import uuid
-from sqlalchemy import Column, String, Numeric, Boolean, ForeignKey, Index
+from sqlalchemy import Column, String, Numeric, Boolean, Integer, ForeignKey, Index, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 
@@ -31,14 +31,27 @@ class User(BaseModel):
     is_kyc_verified = Column(Boolean, nullable=False, default=False)
     pin_hash = Column(String, nullable=True)
 
+    # Denormalized counters so profile reads stay O(1); maintained in the same
+    # statement/transaction as the ledger change (see UserService.increment_counters)
+    # and rebuilt from the source tables by `python -m app.commands.repair_user_counters`
+    total_earned = Column(Numeric(12, 2), nullable=False, default=0, server_default="0")
+    total_withdrawn = Column(Numeric(12, 2), nullable=False, default=0, server_default="0")
+    pending_withdrawals = Column(Numeric(12, 2), nullable=False, default=0, server_default="0")
+    direct_referral_count = Column(Integer, nullable=False, default=0, server_default="0")
+    downline_count = Column(Integer, nullable=False, default=0, server_default="0") # every level below, not just commission levels
+
     # Define the relationship for referrer (the user who referred this user)
     referrer = relationship("User", remote_side="User.id", backref="referred_users", post_update=True)
     # Define relationships to other tables (will be used from the other side)
     transactions = relationship("Transaction", back_populates="user", foreign_keys="Transaction.user_id")
-    kyc_requests = relationship("KycRequest", back_populates="user")
+    kyc_requests = relationship("KycRequest", back_populates="user", foreign_keys="KycRequest.user_id")
     withdrawal_requests = relationship("WithdrawalRequest", back_populates="user")
+    payout_destinations = relationship("PayoutDestination", back_populates="user")
 
     # Add a composite index if we often query by both status and withdrawal_status, for example
     __table_args__ = (
         Index('ix_users_status_withdrawal', 'status', 'withdrawal_status'),
+        Index('ix_users_created_at', 'created_at'),
+        # Direct referrals, and the ON DELETE SET NULL check when a user is deleted
+        Index('ix_users_referrer_id', 'referrer_id', postgresql_where=text("referrer_id IS NOT NULL")),
     )
\ No newline at end of file
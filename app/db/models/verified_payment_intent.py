@@ -0,0 +1,21 @@
+# app/db/models/verified_payment_intent.py
+from sqlalchemy import Column, String, Integer, DateTime
+from sqlalchemy.sql import func
+
+from app.db.base_class import Base
+
+
+class VerifiedPaymentIntent(Base):
+    """
+    A registration PaymentIntent known to have succeeded, recorded from the
+    payment_intent.succeeded webhook (or from Stripe on a confirm that beat it).
+    consumed_at is set in the same transaction that creates the account, so an
+    intent can pay for one registration only.
+    """
+    __tablename__ = "verified_payment_intents"
+
+    id = Column(String, primary_key=True)  # Stripe id, "pi_..."
+    amount = Column(Integer, nullable=False)  # smallest currency unit (pence)
+    currency = Column(String(3), nullable=False)
+    verified_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    consumed_at = Column(DateTime(timezone=True), nullable=True)
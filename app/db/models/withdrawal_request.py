@@ -11,27 +11,42 @@ class WithdrawalRequest(BaseModel):
     user_id = Column(
         UUID(as_uuid=True),
         ForeignKey("users.id", ondelete="CASCADE"),
-        nullable=False,
-        index=True
+        nullable=False
     )
+    # No foreign key: transactions is partitioned (see Transaction.withdrawal_request)
     transaction_id = Column(
         UUID(as_uuid=True),
-        ForeignKey("transactions.id", ondelete="CASCADE"),
         nullable=False,
         unique=True # Enforces one-to-one relationship with Transaction
     )
     amount = Column(Numeric(10, 2), nullable=False)
-    status = Column(String, nullable=False, default='processing') # 'processing', 'paid', 'failed', 'requires_action'
-    bank_name = Column(String, nullable=False)
-    account_number = Column(String, nullable=False)
-    account_name = Column(String, nullable=False)
+    status = Column(String, nullable=False, default='processing') # 'pending_payout', 'processing', 'paid', 'failed', 'requires_action'
+    # Saved, tokenized bank account (see PayoutDestination). Requests made before
+    # destinations existed carry the bank details inline instead.
+    payout_destination_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("payout_destinations.id", ondelete="RESTRICT"),
+        nullable=True
+    )
+    bank_name = Column(String, nullable=True)
+    account_number = Column(String, nullable=True)
+    account_name = Column(String, nullable=True)
     stripe_payout_id = Column(String, nullable=True, index=True)
 
     # Relationships
     user = relationship("User", back_populates="withdrawal_requests")
-    transaction = relationship("Transaction", back_populates="withdrawal_request")
+    payout_destination = relationship("PayoutDestination")
+    transaction = relationship(
+        "Transaction",
+        primaryjoin="foreign(WithdrawalRequest.transaction_id) == Transaction.id",
+        back_populates="withdrawal_request"
+    )
 
-    # Index on status for filtering in admin panel
+    # Lists filter on the first column and page by created_at: a user's history,
+    # the admin panel by status (and the payout recovery scan), and everything by date
     __table_args__ = (
-        Index('ix_withdrawal_requests_status', 'status'),
+        Index('ix_withdrawal_requests_user_id_created_at', 'user_id', 'created_at'),
+        Index('ix_withdrawal_requests_status_created_at', 'status', 'created_at'),
+        Index('ix_withdrawal_requests_created_at', 'created_at'),
+        Index('ix_withdrawal_requests_updated_at', 'updated_at'),
     )
\ No newline at end of file
@@ -0,0 +1,58 @@
+# app/db/partitions.py
+# Monthly range partitions for the `transactions` table.
+# Rows outside every monthly partition land in transactions_default, which is
+# kept empty in practice by creating partitions TRANSACTION_PARTITION_MONTHS_AHEAD
+# months in advance (at startup, daily from the app, and in migrations).
+from datetime import date, datetime, timezone
+from typing import List
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.core.config import settings
+
+PARENT_TABLE = "transactions"
+
+
+def month_start(value: date) -> date:
+    return date(value.year, value.month, 1)
+
+
+def add_months(value: date, months: int) -> date:
+    index = value.year * 12 + value.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date, parent: str = PARENT_TABLE) -> str:
+    return f"{parent}_p{month.year:04d}_{month.month:02d}"
+
+
+def partition_statements(first_month: date, last_month: date, parent: str = PARENT_TABLE) -> List[str]:
+    """DDL creating the default partition and every monthly partition in [first_month, last_month]."""
+    statements = [f"CREATE TABLE IF NOT EXISTS {parent}_default PARTITION OF {parent} DEFAULT"]
+    month = month_start(first_month)
+    while month <= last_month:
+        statements.append(
+            f"CREATE TABLE IF NOT EXISTS {partition_name(month, parent)} PARTITION OF {parent} "
+            f"FOR VALUES FROM ('{month.isoformat()} 00:00:00+00') "
+            f"TO ('{add_months(month, 1).isoformat()} 00:00:00+00')"
+        )
+        month = add_months(month, 1)
+    return statements
+
+
+async def ensure_transaction_partitions(conn: AsyncConnection, months_ahead: int = None) -> None:
+    """Create the partitions for the current month and the next `months_ahead` months."""
+    if months_ahead is None:
+        months_ahead = settings.TRANSACTION_PARTITION_MONTHS_AHEAD
+    this_month = month_start(datetime.now(timezone.utc).date())
+    for statement in partition_statements(this_month, add_months(this_month, months_ahead)):
+        await conn.execute(text(statement))
+
+
+async def maintain_transaction_partitions() -> None:
+    """Periodic job: keep future monthly partitions in place."""
+    from app.db.session import engine
+
+    async with engine.begin() as conn:
+        await ensure_transaction_partitions(conn)
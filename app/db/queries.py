@@ -0,0 +1,17 @@
+# app/db/queries.py
+# Page statements for the newest-first lists (a user's withdrawals and the admin
+# lists). The routes run them and app/commands/check_query_plans.py EXPLAINs the
+# same builders, so a change to a list's shape is checked against its index.
+from typing import Optional, Sequence
+
+from sqlalchemy import Select, select
+
+
+def newest_first(model, *criteria, columns: Optional[Sequence] = None, skip: int = 0, limit: int = 100) -> Select:
+    """A page of `model` rows (or just `columns`) matching `criteria`, newest first."""
+    return (
+        select(*(columns or [model])).where(*criteria)
+        .order_by(model.created_at.desc())
+        .offset(skip)
+        .limit(limit)
+    )
@@ -0,0 +1,142 @@
+# app/db/query_stats.py
+# Per-request SQL accounting built on SQLAlchemy cursor events.
+# Statements and their timings are collected into a QueryStats object bound to
+# the current context, so every query issued while handling a request (including
+# its background tasks) is attributed to that request.
+import logging
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Iterator, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger("app.db.queries")
+
+_current_stats: ContextVar[Optional["QueryStats"]] = ContextVar("query_stats", default=None)
+
+
+@dataclass
+class QueryStats:
+    """Statement count, total DB time and statement shapes for one unit of work."""
+    count: int = 0
+    total_ms: float = 0.0
+    shapes: Counter = field(default_factory=Counter)
+    # The enclosing unit of work, e.g. a test's capture around the requests it makes
+    parent: Optional["QueryStats"] = field(default=None, repr=False)
+
+    def record(self, statement: str, elapsed_ms: float) -> None:
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.shapes[statement] += 1
+        if self.parent is not None:
+            self.parent.record(statement, elapsed_ms)
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        """Statement shapes executed at least `threshold` times (likely N+1 patterns)."""
+        return [(shape, n) for shape, n in self.shapes.most_common() if n >= threshold]
+
+
+def current_stats() -> Optional[QueryStats]:
+    return _current_stats.get()
+
+
+def start_stats() -> tuple[QueryStats, object]:
+    """
+    Bind a fresh QueryStats to the current context. Returns (stats, reset token).
+    Statements recorded in it also count toward the stats it replaces.
+    """
+    stats = QueryStats(parent=_current_stats.get())
+    return stats, _current_stats.set(stats)
+
+
+def stop_stats(token) -> None:
+    _current_stats.reset(token)
+
+
+def redact_parameters(parameters) -> str:
+    """Describe bound parameters by type only so values never reach the logs."""
+    if parameters is None:
+        return "()"
+    if isinstance(parameters, dict):
+        return "{" + ", ".join(f"{k}: {type(v).__name__}" for k, v in parameters.items()) + "}"
+    if isinstance(parameters, (list, tuple)):
+        if parameters and isinstance(parameters[0], (list, tuple, dict)):
+            return f"[{len(parameters)} parameter sets]"
+        return "(" + ", ".join(type(v).__name__ for v in parameters) + ")"
+    return type(parameters).__name__
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    from app.core.config import settings
+
+    starts = conn.info.get("query_start")
+    if not starts:
+        return
+    elapsed_ms = (time.perf_counter() - starts.pop()) * 1000
+
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.record(statement, elapsed_ms)
+
+    if elapsed_ms >= settings.SQL_SLOW_QUERY_MS:
+        logger.warning(
+            "Slow query (%.1f ms): %s params=%s",
+            elapsed_ms, " ".join(statement.split()), redact_parameters(parameters)
+        )
+
+
+def install_query_hooks(engine: Engine) -> None:
+    """Attach the accounting hooks to a (sync) engine. Safe to call more than once."""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+@contextmanager
+def capture_queries() -> Iterator[QueryStats]:
+    """
+    Collect the queries issued inside the block, e.g. around a service call in a test.
+    """
+    stats, token = start_stats()
+    try:
+        yield stats
+    finally:
+        stop_stats(token)
+
+
+@contextmanager
+def assert_max_queries(max_queries: int) -> Iterator[QueryStats]:
+    """
+    Fail with AssertionError if the block issues more than `max_queries` statements.
+    Use it to lock in query budgets for service calls.
+    """
+    with capture_queries() as stats:
+        yield stats
+    if stats.count > max_queries:
+        shapes = "\n".join(f"  {n}x {' '.join(s.split())}" for s, n in stats.shapes.most_common(5))
+        raise AssertionError(
+            f"Expected at most {max_queries} queries, got {stats.count}:\n{shapes}"
+        )
+
+
+def assert_query_budget(response, max_queries: int) -> None:
+    """
+    Check the query count an endpoint reported via the X-DB-Query-Count header.
+    Requires SQL_STATS_HEADERS to be enabled (as it should be in test settings).
+    """
+    header = response.headers.get("X-DB-Query-Count")
+    if header is None:
+        raise AssertionError("Response has no X-DB-Query-Count header; enable SQL_STATS_HEADERS")
+    if int(header) > max_queries:
+        raise AssertionError(
+            f"{response.request.method} {response.request.url.path} issued {header} queries, "
+            f"budget is {max_queries}"
+        )
@@ -0,0 +1,101 @@
+# app/db/routing.py
+# Decides whether a read-only request may be served by the replica.
+# Reads fall back to the primary when no replica is configured, when the replica
+# lags by more than REPLICA_MAX_LAG_SECONDS (or cannot be reached), and for
+# clients that committed a write within the last READ_YOUR_WRITES_SECONDS. That
+# write marker travels with the client as a cookie, so it holds whichever worker
+# (or host) serves the next request.
+import asyncio
+import logging
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy import event, text
+
+from app.core.config import settings
+from app.db.session import PrimarySession, replica_engine
+
+logger = logging.getLogger(__name__)
+
+# Unix time of the client's last committed write
+READ_YOUR_WRITES_COOKIE = "last_write_at"
+# Tolerated clock difference between workers before a marker counts as forged
+_CLOCK_SKEW_SECONDS = 1.0
+
+# Seconds since the last replayed transaction, or 0 when the replica has replayed
+# everything it received (an idle primary would otherwise look like lag).
+_LAG_QUERY = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+_replica_lag: Optional[float] = None
+_lag_checked_at = 0.0
+_lag_lock = asyncio.Lock()
+
+
+@dataclass
+class RequestWrites:
+    """Commits made on the primary while serving one request."""
+    last_write_at: Optional[float] = None
+
+
+_current_writes: ContextVar[Optional[RequestWrites]] = ContextVar("request_writes", default=None)
+
+
+def start_write_tracking() -> tuple[RequestWrites, object]:
+    """Bind a fresh RequestWrites to the current context. Returns (writes, reset token)."""
+    writes = RequestWrites()
+    return writes, _current_writes.set(writes)
+
+
+def stop_write_tracking(token) -> None:
+    _current_writes.reset(token)
+
+
+@event.listens_for(PrimarySession, "after_commit")
+def _record_write(session) -> None:
+    # Outside a request (background jobs) nothing is tracked
+    writes = _current_writes.get()
+    if writes is not None:
+        writes.last_write_at = time.time()
+
+
+def wrote_recently(last_write_at: Optional[str]) -> bool:
+    """Whether a client's write marker (see READ_YOUR_WRITES_COOKIE) is still in its window."""
+    try:
+        age = time.time() - float(last_write_at)
+    except (TypeError, ValueError):
+        return False
+    return -_CLOCK_SKEW_SECONDS <= age < settings.READ_YOUR_WRITES_SECONDS
+
+
+async def replica_lag() -> Optional[float]:
+    """Replica lag in seconds, refreshed at most every REPLICA_LAG_CHECK_INTERVAL_SECONDS. None if unreachable."""
+    global _replica_lag, _lag_checked_at
+    if time.monotonic() - _lag_checked_at < settings.REPLICA_LAG_CHECK_INTERVAL_SECONDS:
+        return _replica_lag
+    async with _lag_lock:
+        if time.monotonic() - _lag_checked_at >= settings.REPLICA_LAG_CHECK_INTERVAL_SECONDS:
+            try:
+                async with replica_engine.connect() as conn:
+                    _replica_lag = float((await conn.execute(_LAG_QUERY)).scalar())
+            except Exception as e:
+                logger.warning("Replica lag check failed, reading from primary: %s", e)
+                _replica_lag = None
+            _lag_checked_at = time.monotonic()
+    return _replica_lag
+
+
+async def use_replica(last_write_at: Optional[str] = None) -> bool:
+    if replica_engine is None:
+        return False
+    if wrote_recently(last_write_at):
+        return False
+    lag = await replica_lag()
+    return lag is not None and lag <= settings.REPLICA_MAX_LAG_SECONDS
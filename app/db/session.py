@@ -1,7 +1,9 @@
 # app/db/session.py
 # This file handles the async database session creation.
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session
 from app.core.config import settings
+from app.db.query_stats import install_query_hooks
 
 # Create an async engine for Supabase PostgreSQL
 # 'asyncpg' is the recommended driver for async operations with PostgreSQL
@@ -9,16 +11,50 @@ engine = create_async_engine(
     str(settings.DATABASE_URL),  # Convert PostgresDsn to string
     echo=False,  # Set to True for SQL query logging (useful for development)
     future=True,  # Use SQLAlchemy 2.0 style APIs
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
 )
 
+# Per-request statement counting, DB timing and slow-query logging
+if settings.SQL_STATS_ENABLED:
+    install_query_hooks(engine.sync_engine)
+
+# Optional read replica for admin and reporting reads (routed in app/db/routing.py)
+replica_engine = None
+if settings.DATABASE_REPLICA_URL:
+    replica_engine = create_async_engine(
+        str(settings.DATABASE_REPLICA_URL),
+        echo=False,
+        future=True,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+    )
+    if settings.SQL_STATS_ENABLED:
+        install_query_hooks(replica_engine.sync_engine)
+
+
+class PrimarySession(Session):
+    """Sync session class behind AsyncSessionLocal, so primary-only events can target it."""
+
+
 # Create a configured "Session" class
 AsyncSessionLocal = async_sessionmaker(
     bind=engine,
     class_=AsyncSession,
+    sync_session_class=PrimarySession,
     expire_on_commit=False,  # Important for async
     autoflush=False
 )
 
+ReplicaSessionLocal = None
+if replica_engine is not None:
+    ReplicaSessionLocal = async_sessionmaker(
+        bind=replica_engine,
+        class_=AsyncSession,
+        expire_on_commit=False,
+        autoflush=False
+    )
+
 # Dependency to get a database session
 async def get_db() -> AsyncSession:
     """
@@ -0,0 +1,29 @@
+# app/db/warmup.py
+# Startup pre-warming so the first requests after a deploy do not pay for
+# connection setup or for compiling and preparing the hot statements.
+import asyncio
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+
+
+async def _warm_connection() -> None:
+    from app.services.user_service import UserService
+
+    async with AsyncSessionLocal() as session:
+        # Each lookup fills SQLAlchemy's compiled cache and asyncpg's
+        # per-connection prepared statement cache. No rows match.
+        await UserService.get_by_username(session, "")
+        await UserService.get_by_email(session, "")
+        await UserService.get_by_referral_code(session, "")
+        await UserService.email_exists(session, "")
+        await UserService.username_exists(session, "")
+
+
+async def prewarm_database(connections: int = None) -> None:
+    """Open `connections` pooled connections concurrently and prepare the hot lookups on each."""
+    if connections is None:
+        connections = settings.DB_PREWARM_CONNECTIONS
+    # Connections beyond pool_size would be closed again as soon as they are returned
+    connections = min(connections, settings.DB_POOL_SIZE)
+    await asyncio.gather(*(_warm_connection() for _ in range(connections)))
@@ -1,12 +1,40 @@
 # app/main.py
-from fastapi import FastAPI
+from fastapi import FastAPI, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from contextlib import asynccontextmanager
 from typing import AsyncGenerator
+import asyncio
+import logging
 
 from app.core.config import settings
-from app.db.session import engine, AsyncSessionLocal
+from app.core.stripe_client import get_stripe
+from app.core.background import run_periodically
+from app.core.events import event_broker
+from app.db.session import engine, replica_engine, AsyncSessionLocal
+from app.db.warmup import prewarm_database
+from app.db.partitions import maintain_transaction_partitions
+from app.services.rollup_service import refresh_daily_rollups
+from app.services.withdrawal_service import recover_pending_payouts
+from app.services.auth_service import purge_expired_refresh_tokens
+from app.services.availability_service import refresh_availability_filter
+from app.api.middleware import QueryStatsMiddleware, ReadYourWritesMiddleware
 from app.api.routes import users_router, withdrawals_router, stripe_router, admin_router
+from app.utils.supabase_storage import get_supabase
+
+logger = logging.getLogger(__name__)
+
+
+async def warm_up(app: FastAPI) -> None:
+    """Pre-warm the DB pool and hot statements, retrying until the database is reachable."""
+    while True:
+        try:
+            await prewarm_database()
+            break
+        except Exception as e:
+            logger.warning("Database pre-warm failed, retrying: %s", e)
+            await asyncio.sleep(2)
+    app.state.ready = True
 
 
 @asynccontextmanager
@@ -14,12 +42,61 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     """Lifespan events for application startup and shutdown."""
     # Startup: You could run database migrations here if needed
     print("Starting up...")
+    app.state.ready = False
+
+    # Construct external clients here so neither imports nor first requests pay for it
+    get_stripe()
+    get_supabase()
+
+    # Readiness flips once the pool is warm; a failed first attempt keeps retrying
+    # in the background instead of blocking startup.
+    warm_task = asyncio.create_task(warm_up(app))
+    await asyncio.wait([warm_task], timeout=settings.STARTUP_WARMUP_TIMEOUT_SECONDS)
+
+    # One LISTEN connection per worker feeds every server-sent event stream
+    if settings.EVENTS_ENABLED:
+        event_broker.start()
+
+    # Periodic maintenance jobs, cancelled on shutdown
+    background_jobs = [
+        asyncio.create_task(run_periodically(
+            maintain_transaction_partitions,
+            settings.PARTITION_MAINTENANCE_INTERVAL_SECONDS,
+            "transaction partitions"
+        )),
+        asyncio.create_task(run_periodically(
+            refresh_daily_rollups,
+            settings.ROLLUP_INTERVAL_SECONDS,
+            "daily rollups"
+        )),
+        asyncio.create_task(run_periodically(
+            recover_pending_payouts,
+            settings.WITHDRAWAL_RECOVERY_INTERVAL_SECONDS,
+            "payout recovery"
+        )),
+        asyncio.create_task(run_periodically(
+            purge_expired_refresh_tokens,
+            settings.REFRESH_TOKEN_PURGE_INTERVAL_SECONDS,
+            "refresh token purge"
+        )),
+        asyncio.create_task(run_periodically(
+            refresh_availability_filter,
+            settings.AVAILABILITY_FILTER_REFRESH_SECONDS,
+            "availability filter"
+        )),
+    ]
     
     yield
     
     # Shutdown: Clean up resources
     print("Shutting down...")
+    for task in [warm_task, *background_jobs]:
+        task.cancel()
+    await asyncio.gather(warm_task, *background_jobs, return_exceptions=True)
+    await event_broker.stop()
     await engine.dispose()
+    if replica_engine is not None:
+        await replica_engine.dispose()
 
 
 # Create FastAPI application
@@ -36,8 +113,17 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Readable by the admin UI's scripts (pagination totals)
+    expose_headers=["X-Total-Count", "X-Total-Count-Estimated"],
 )
 
+if settings.SQL_STATS_ENABLED:
+    app.add_middleware(QueryStatsMiddleware)
+
+# Only needed when reads can be routed to a replica
+if replica_engine is not None:
+    app.add_middleware(ReadYourWritesMiddleware)
+
 # Include API routers
 app.include_router(users_router, prefix=settings.API_V1_STR)
 app.include_router(withdrawals_router, prefix=settings.API_V1_STR)
@@ -61,7 +147,19 @@ async def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/health/ready")
+async def readiness_check():
+    """Readiness probe: 503 until the DB pool and hot statements are warm."""
+    if not getattr(app.state, "ready", False):
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"status": "warming_up"}
+        )
+    return {"status": "ready"}
+
+
 if __name__ == "__main__":
+    # Development server with reload; use `python -m app.server` in production
     import uvicorn
     uvicorn.run(
         "app.main:app",
@@ -2,14 +2,26 @@
 # Import schemas for easier access later
 from app.schemas.user import UserCreate, UserUpdate, UserResponse, UserInDB, UserRegisterInitiate, UserRegisterConfirm
 from app.schemas.transaction import TransactionCreate, TransactionResponse, TransactionInDB
-from app.schemas.kyc_request import KycRequestCreate, KycRequestUpdate, KycRequestResponse, KycRequestInDB
+from app.schemas.kyc_request import (
+    KycRequestCreate, KycRequestUpdate, KycRequestResponse, KycRequestInDB, KycClaimResponse, KycClaimRelease
+)
 from app.schemas.withdrawal_request import WithdrawalRequestCreate, WithdrawalRequestResponse, WithdrawalRequestInDB
+from app.schemas.payout_destination import PayoutDestinationCreate, PayoutDestinationResponse
 from app.schemas.stripe import StripeWebhookEvent
+from app.schemas.bulk_import import BulkImportUser, BulkImportResult
+from app.schemas.rollup import DailyRollupResponse
+from app.schemas.moderation import (
+    BulkUserStatusUpdate, BulkWithdrawalStatusUpdate, BulkKycReview, BulkItemResult, BulkModerationResult
+)
 
 __all__ = [
     "UserCreate", "UserUpdate", "UserResponse", "UserInDB", "UserRegisterInitiate", "UserRegisterConfirm",
     "TransactionCreate", "TransactionResponse", "TransactionInDB",
-    "KycRequestCreate", "KycRequestUpdate", "KycRequestResponse", "KycRequestInDB",
+    "KycRequestCreate", "KycRequestUpdate", "KycRequestResponse", "KycRequestInDB", "KycClaimResponse", "KycClaimRelease",
     "WithdrawalRequestCreate", "WithdrawalRequestResponse", "WithdrawalRequestInDB",
-    "StripeWebhookEvent"
+    "PayoutDestinationCreate", "PayoutDestinationResponse",
+    "StripeWebhookEvent",
+    "BulkImportUser", "BulkImportResult",
+    "DailyRollupResponse",
+    "BulkUserStatusUpdate", "BulkWithdrawalStatusUpdate", "BulkKycReview", "BulkItemResult", "BulkModerationResult"
 ]
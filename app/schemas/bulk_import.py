@@ -0,0 +1,21 @@
+# app/schemas/bulk_import.py
+from pydantic import BaseModel, EmailStr, Field
+from typing import Optional
+
+
+class BulkImportUser(BaseModel):
+    """One row of a bulk import file (CSV header or NDJSON keys)."""
+    email: EmailStr
+    username: str = Field(..., min_length=3, max_length=50)
+    password_hash: str = Field(..., min_length=1, description="Existing bcrypt hash; passwords are not re-hashed")
+    first_name: Optional[str] = None
+    last_name: Optional[str] = None
+    referral_code: Optional[str] = Field(None, description="The user's own code; generated when empty")
+    referred_by: Optional[str] = Field(None, description="Referral code of the referrer, in the file or the database")
+
+
+class BulkImportResult(BaseModel):
+    imported_users: int
+    commission_transactions: int
+    total_commission: float
+    existing_users_credited: int
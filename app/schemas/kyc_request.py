@@ -1,6 +1,6 @@
 # app/schemas/kyc_request.py
-from pydantic import BaseModel, HttpUrl
-from typing import Optional
+from pydantic import BaseModel, HttpUrl, Field
+from typing import Optional, List
 from datetime import datetime
 from uuid import UUID
 
@@ -32,4 +32,16 @@ class KycRequestInDB(KycRequestBase):
 
 
 class KycRequestResponse(KycRequestInDB):
-    pass
\ No newline at end of file
+    pass
+
+
+# Review queue: a claimed request with its lease and pre-signed document links
+class KycClaimResponse(KycRequestResponse):
+    claim_expires_at: datetime
+    document_front_signed_url: Optional[str] = None
+    document_back_signed_url: Optional[str] = None
+    selfie_signed_url: Optional[str] = None
+
+
+class KycClaimRelease(BaseModel):
+    request_ids: Optional[List[UUID]] = Field(None, description="Claims to release; all of the reviewer's claims when omitted")
\ No newline at end of file
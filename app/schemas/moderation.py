@@ -0,0 +1,32 @@
+# app/schemas/moderation.py
+from pydantic import BaseModel, Field
+from typing import List, Literal, Optional
+from uuid import UUID
+
+MAX_BULK_IDS = 10000
+
+
+class BulkUserStatusUpdate(BaseModel):
+    user_ids: List[UUID] = Field(..., min_length=1, max_length=MAX_BULK_IDS)
+    status: Literal['active', 'frozen']
+
+
+class BulkWithdrawalStatusUpdate(BaseModel):
+    user_ids: List[UUID] = Field(..., min_length=1, max_length=MAX_BULK_IDS)
+    withdrawal_status: Literal['active', 'paused']
+
+
+class BulkKycReview(BaseModel):
+    request_ids: List[UUID] = Field(..., min_length=1, max_length=MAX_BULK_IDS)
+    status: Literal['approved', 'rejected']
+    rejection_reason: Optional[str] = None
+
+
+class BulkItemResult(BaseModel):
+    id: UUID
+    result: Literal['updated', 'unchanged', 'not_found']  # 'unchanged': already in that state / already reviewed
+
+
+class BulkModerationResult(BaseModel):
+    updated: int
+    results: List[BulkItemResult]
@@ -0,0 +1,21 @@
+# app/schemas/payout_destination.py
+from pydantic import BaseModel, Field
+from datetime import datetime
+from uuid import UUID
+
+
+class PayoutDestinationCreate(BaseModel):
+    bank_name: str
+    account_number: str = Field(..., min_length=4)
+    account_name: str
+
+
+class PayoutDestinationResponse(BaseModel):
+    id: UUID
+    bank_name: str
+    account_name: str
+    account_last4: str
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,14 @@
+# app/schemas/rollup.py
+from pydantic import BaseModel
+from datetime import date
+
+
+class DailyRollupResponse(BaseModel):
+    day: date
+    metric: str
+    dimension: str
+    count: int
+    amount: float
+
+    class Config:
+        from_attributes = True
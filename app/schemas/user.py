@@ -33,6 +33,8 @@ class UserRegisterInitiate(BaseModel):
     email: EmailStr
     username: str = Field(..., min_length=3, max_length=50)
     password: str = Field(..., min_length=8)
+    first_name: Optional[str] = None
+    last_name: Optional[str] = None
     referral_code: Optional[str] = Field(None, min_length=1)
 
 class UserRegisterConfirm(UserRegisterInitiate):
@@ -49,6 +51,11 @@ class UserInDB(UserBase):
     status: str
     withdrawal_status: str
     is_kyc_verified: bool
+    total_earned: float = 0.0
+    total_withdrawn: float = 0.0
+    pending_withdrawals: float = 0.0
+    direct_referral_count: int = 0
+    downline_count: int = 0
     created_at: datetime
     updated_at: datetime
 
@@ -64,4 +71,4 @@ class UserResponse(UserInDB):
 # Specialized response for login/refresh tokens
 class UserWithTokens(UserResponse):
     access_token: str
-    refresh_token: Optional[str] = None  # If implementing refresh tokens
\ No newline at end of file
+    refresh_token: Optional[str] = None  # Rotated on every /users/token/refresh/
\ No newline at end of file
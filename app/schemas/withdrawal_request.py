@@ -1,16 +1,20 @@
 # app/schemas/withdrawal_request.py
-from pydantic import BaseModel, Field, validator
-from typing import Optional
+from pydantic import BaseModel, BeforeValidator, Field, validator, model_validator
+from typing import Annotated, Optional
 from datetime import datetime
 from uuid import UUID
 from decimal import Decimal
 
 
+# Stored as Numeric: rows loaded from the database carry a Decimal
+DecimalString = Annotated[str, BeforeValidator(lambda v: str(v) if isinstance(v, Decimal) else v)]
+
+
 class WithdrawalRequestBase(BaseModel):
-    amount: str  # String representation of decimal to avoid floating point issues
-    bank_name: str
-    account_number: str
-    account_name: str
+    amount: DecimalString  # String representation of decimal to avoid floating point issues
+    bank_name: Optional[str] = None
+    account_number: Optional[str] = None
+    account_name: Optional[str] = None
 
     @validator('amount')
     def validate_amount(cls, v):
@@ -27,12 +31,22 @@ class WithdrawalRequestBase(BaseModel):
 class WithdrawalRequestCreate(WithdrawalRequestBase):
     user_id: UUID
     pin: str = Field(..., min_length=4, max_length=6, description="User's PIN to authorize withdrawal")
+    payout_destination_id: Optional[UUID] = Field(
+        None, description="Saved destination to pay out to; otherwise the bank details are saved as one"
+    )
+
+    @model_validator(mode='after')
+    def check_destination(self):
+        if self.payout_destination_id is None and not (self.bank_name and self.account_number and self.account_name):
+            raise ValueError('Provide payout_destination_id or bank_name, account_number and account_name')
+        return self
 
 
 class WithdrawalRequestInDB(WithdrawalRequestBase):
     id: UUID
     user_id: UUID
     transaction_id: UUID
+    payout_destination_id: Optional[UUID] = None
     status: str
     stripe_payout_id: Optional[str] = None
     created_at: datetime
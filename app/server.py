@@ -0,0 +1,95 @@
+# app/server.py
+"""
+Production entry point:
+
+    python -m app.server
+
+Runs app.main:app under gunicorn with uvicorn workers on uvloop and httptools.
+Worker count comes from WEB_CONCURRENCY (default: CPU count); backlog,
+keep-alive, per-worker concurrency, worker recycling and the graceful shutdown
+window come from the SERVER_* settings. On SIGTERM each worker stops accepting
+connections and waits up to SERVER_GRACEFUL_TIMEOUT_SECONDS for in-flight
+requests, including their background tasks, before running the lifespan
+shutdown.
+
+Where gunicorn is not available (e.g. Windows) it falls back to uvicorn's own
+multi-process mode, which does not recycle workers and picks uvloop and
+httptools only where they are installed (uvloop does not support Windows).
+
+`python app/main.py` remains the single-process development server with reload.
+"""
+import multiprocessing
+
+from app.core.config import settings
+
+
+def worker_count() -> int:
+    return settings.WEB_CONCURRENCY or multiprocessing.cpu_count()
+
+
+def run_gunicorn() -> None:
+    from gunicorn.app.base import BaseApplication
+
+    class ProductionApplication(BaseApplication):
+        def load_config(self) -> None:
+            options = {
+                "bind": f"{settings.SERVER_HOST}:{settings.SERVER_PORT}",
+                "workers": worker_count(),
+                "worker_class": "app.server.ProductionUvicornWorker",
+                "backlog": settings.SERVER_BACKLOG,
+                "keepalive": settings.SERVER_KEEPALIVE_SECONDS,
+                "max_requests": settings.SERVER_MAX_REQUESTS,
+                "max_requests_jitter": settings.SERVER_MAX_REQUESTS_JITTER,
+                "graceful_timeout": settings.SERVER_GRACEFUL_TIMEOUT_SECONDS,
+            }
+            for key, value in options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            from app.main import app
+            return app
+
+    ProductionApplication().run()
+
+
+def run_uvicorn() -> None:
+    import uvicorn
+
+    # loop/http stay "auto": uvicorn[standard] installs no uvloop on win32
+    uvicorn.run(
+        "app.main:app",
+        host=settings.SERVER_HOST,
+        port=settings.SERVER_PORT,
+        workers=worker_count(),
+        backlog=settings.SERVER_BACKLOG,
+        timeout_keep_alive=settings.SERVER_KEEPALIVE_SECONDS,
+        limit_concurrency=settings.SERVER_LIMIT_CONCURRENCY,
+        timeout_graceful_shutdown=settings.SERVER_GRACEFUL_TIMEOUT_SECONDS,
+    )
+
+
+try:
+    from uvicorn.workers import UvicornWorker
+except ImportError:  # gunicorn is not installed
+    UvicornWorker = None
+else:
+    class ProductionUvicornWorker(UvicornWorker):
+        """Uvicorn worker pinned to uvloop/httptools with per-worker limits from settings."""
+        CONFIG_KWARGS = {
+            "loop": "uvloop",
+            "http": "httptools",
+            "limit_concurrency": settings.SERVER_LIMIT_CONCURRENCY,
+            # Leave the arbiter a moment to reap the worker after draining
+            "timeout_graceful_shutdown": max(settings.SERVER_GRACEFUL_TIMEOUT_SECONDS - 1, 1),
+        }
+
+
+def main() -> None:
+    if UvicornWorker is not None:
+        run_gunicorn()
+    else:
+        run_uvicorn()
+
+
+if __name__ == "__main__":
+    main()
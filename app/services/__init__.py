@@ -5,11 +5,23 @@ from app.services.transaction_service import TransactionService
 from app.services.withdrawal_service import WithdrawalService
 from app.services.stripe_service import StripeService
 from app.services.commission_service import CommissionService
+from app.services.bulk_import_service import BulkImportService
+from app.services.moderation_service import ModerationService
+from app.services.payout_destination_service import PayoutDestinationService
+from app.services.payment_intent_service import PaymentIntentService
+from app.services.auth_service import AuthService
+from app.services.availability_service import AvailabilityService
 
 __all__ = [
     "UserService",
     "TransactionService",
     "WithdrawalService", 
     "StripeService",
-    "CommissionService"
+    "CommissionService",
+    "BulkImportService",
+    "ModerationService",
+    "PayoutDestinationService",
+    "PaymentIntentService",
+    "AuthService",
+    "AvailabilityService"
 ]
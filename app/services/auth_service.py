@@ -0,0 +1,116 @@
+# app/services/auth_service.py
+# Rotating refresh tokens. Each refresh spends the presented token and issues a
+# new one in the same family; presenting an already spent token means it was
+# copied, so the whole family is revoked and that login has to start over.
+import hashlib
+import logging
+import secrets
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.models.refresh_token import RefreshToken
+from app.db.models.user import User
+from app.db.session import AsyncSessionLocal
+from app.services.user_service import UserService
+
+logger = logging.getLogger(__name__)
+
+# Served by ix_refresh_tokens_expires_at
+_PURGE_EXPIRED = delete(RefreshToken).where(RefreshToken.expires_at < func.now())
+
+
+def _hash(raw_token: str) -> str:
+    return hashlib.sha256(raw_token.encode()).hexdigest()
+
+
+class AuthService:
+
+    @staticmethod
+    async def issue_refresh_token(
+        db: AsyncSession,
+        user_id: uuid.UUID,
+        family_id: Optional[uuid.UUID] = None
+    ) -> str:
+        """Store a new refresh token (a new family unless `family_id` is given). The caller commits."""
+        raw_token = secrets.token_urlsafe(32)
+        db.add(RefreshToken(
+            user_id=user_id,
+            token_hash=_hash(raw_token),
+            family_id=family_id or uuid.uuid4(),
+            expires_at=datetime.now(timezone.utc) + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+        ))
+        return raw_token
+
+    @staticmethod
+    async def rotate(db: AsyncSession, raw_token: str) -> Tuple[User, str]:
+        """Spend a refresh token and return its user with the replacement token. No password hashing."""
+        invalid = HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid refresh token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+        token_hash = _hash(raw_token)
+        result = await db.execute(
+            update(RefreshToken)
+            .where(
+                RefreshToken.token_hash == token_hash,
+                RefreshToken.used_at.is_(None),
+                RefreshToken.revoked_at.is_(None),
+                RefreshToken.expires_at > func.now()
+            )
+            .values(used_at=func.now())
+            .returning(RefreshToken.user_id, RefreshToken.family_id)
+        )
+        spent = result.one_or_none()
+
+        if spent is None:
+            reused = (await db.execute(
+                select(RefreshToken.family_id).where(
+                    RefreshToken.token_hash == token_hash,
+                    RefreshToken.used_at.is_not(None)
+                )
+            )).scalar_one_or_none()
+            if reused is not None:
+                await AuthService.revoke_family(db, reused)
+                await db.commit()
+                logger.warning("Refresh token reuse detected; revoked family %s", reused)
+            raise invalid
+
+        user = await UserService.get_by_id(db, spent.user_id)
+        if user is None or user.status != 'active':
+            await db.rollback()
+            raise invalid
+
+        new_token = await AuthService.issue_refresh_token(db, user.id, spent.family_id)
+        await db.commit()
+        return user, new_token
+
+    @staticmethod
+    async def revoke_family(db: AsyncSession, family_id: uuid.UUID) -> None:
+        await db.execute(
+            update(RefreshToken)
+            .where(RefreshToken.family_id == family_id, RefreshToken.revoked_at.is_(None))
+            .values(revoked_at=func.now())
+            .execution_options(synchronize_session=False)
+        )
+
+    @staticmethod
+    async def purge_expired(db: AsyncSession) -> int:
+        """Expired tokens are useless, including for reuse detection."""
+        result = await db.execute(_PURGE_EXPIRED)
+        await db.commit()
+        return result.rowcount
+
+
+async def purge_expired_refresh_tokens() -> None:
+    """Periodic job entry point (see app/main.py)."""
+    async with AsyncSessionLocal() as session:
+        purged = await AuthService.purge_expired(session)
+    if purged:
+        logger.info("Purged %d expired refresh token(s)", purged)
@@ -0,0 +1,138 @@
+# app/services/availability_service.py
+# Username/email availability for the signup form. Each worker keeps a Bloom
+# filter of every normalized username and email: a value the filter has never
+# seen is answered without a query, and only "maybe taken" goes to the database.
+#
+# The filter is built by a streaming pass over users at startup, updated by
+# UserService.create/update and bulk imports in this worker and topped up from
+# rows created by other workers every AVAILABILITY_FILTER_REFRESH_SECONDS. The
+# answer is advisory: registration still checks the database and the unique
+# constraints.
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from sqlalchemy import bindparam, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.bloom import BloomFilter
+from app.core.config import settings
+from app.db.models.user import User
+from app.db.session import AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
+
+_ALL_USERS = select(User.username, User.email).execution_options(yield_per=10000)
+# Served by ix_users_created_at
+_USERS_SINCE = select(User.username, User.email).where(User.created_at >= bindparam("since"))
+_USER_COUNT_ESTIMATE = text("SELECT greatest(reltuples, 0)::bigint FROM pg_class WHERE oid = 'users'::regclass")
+# created_at defaults to now(), the inserting transaction's start, so every row not
+# yet visible has created_at >= the start of the oldest transaction still open.
+# Taken before reading users, this is the point below which a pass has seen
+# everything; a long bulk import holds it back until it commits.
+_VISIBLE_HORIZON = text("""
+    SELECT least(clock_timestamp(), (
+        SELECT min(xact_start) FROM pg_stat_activity
+        WHERE datname = current_database() AND backend_type = 'client backend' AND pid <> pg_backend_pid()
+    ))
+""")
+
+_filter: Optional[BloomFilter] = None
+_built_at = 0.0
+_watermark: Optional[datetime] = None
+
+
+def _key(kind: str, value: str) -> str:
+    return f"{kind}:{AvailabilityService.normalize(value)}"
+
+
+class AvailabilityService:
+
+    @staticmethod
+    def normalize(value: str) -> str:
+        # Case-folded, so "maybe taken" also covers case variants; the database
+        # check that follows decides with the exact value
+        return value.strip().lower()
+
+    @staticmethod
+    def remember(username: str, email: str) -> None:
+        """Record a username/email that is now taken (no-op until the filter is built)."""
+        if _filter is not None:
+            _filter.add(_key("u", username))
+            _filter.add(_key("e", email))
+
+    @staticmethod
+    async def check(
+        db: AsyncSession,
+        username: Optional[str] = None,
+        email: Optional[str] = None
+    ) -> Dict[str, bool]:
+        """Availability of each given value; the database is only asked when the filter says "maybe"."""
+        from app.services.user_service import UserService
+
+        result = {}
+        if username is not None:
+            username = username.strip()
+            result["username_available"] = not (
+                (_filter is None or _key("u", username) in _filter)
+                and await UserService.username_exists(db, username)
+            )
+        if email is not None:
+            email = email.strip()
+            result["email_available"] = not (
+                (_filter is None or _key("e", email) in _filter)
+                and await UserService.email_exists(db, email)
+            )
+        return result
+
+
+def _add_rows(bloom: BloomFilter, rows) -> None:
+    for username, email in rows:
+        bloom.add(_key("u", username))
+        bloom.add(_key("e", email))
+
+
+async def _build() -> None:
+    global _filter, _built_at, _watermark
+
+    async with AsyncSessionLocal() as db:
+        estimate = (await db.execute(_USER_COUNT_ESTIMATE)).scalar() or 0
+        # Two keys per user, with room to grow before the false-positive rate degrades
+        bloom = BloomFilter(
+            max(settings.AVAILABILITY_FILTER_MIN_CAPACITY, estimate * 4),
+            settings.AVAILABILITY_FILTER_FALSE_POSITIVE_RATE
+        )
+        built_at = time.monotonic()
+        watermark = (await db.execute(_VISIBLE_HORIZON)).scalar_one()
+        result = await db.stream(_ALL_USERS)
+        async for rows in result.partitions():
+            # Hashing a batch takes tens of milliseconds; keep it off the event loop
+            await asyncio.to_thread(_add_rows, bloom, rows)
+
+    # Users created by this worker during the pass are caught by the next refresh
+    _filter, _built_at, _watermark = bloom, built_at, watermark
+    logger.info("Availability filter built: %s", bloom.snapshot())
+
+
+async def refresh_availability_filter() -> None:
+    """Build the filter, or add users created since the last pass (rebuilding when full or old)."""
+    global _watermark
+
+    if (
+        _filter is None
+        or _filter.is_saturated
+        or time.monotonic() - _built_at > settings.AVAILABILITY_FILTER_REBUILD_SECONDS
+    ):
+        await _build()
+        return
+
+    # The lookback is a margin for clock skew and rows stamped by the application
+    since = _watermark - timedelta(seconds=settings.AVAILABILITY_FILTER_LOOKBACK_SECONDS)
+    async with AsyncSessionLocal() as db:
+        horizon = (await db.execute(_VISIBLE_HORIZON)).scalar_one()
+        rows = (await db.execute(_USERS_SINCE, {"since": since})).all()
+    for username, email in rows:
+        AvailabilityService.remember(username, email)
+    _watermark = horizon
@@ -0,0 +1,299 @@
+# app/services/bulk_import_service.py
+import csv
+import io
+import json
+import uuid
+from collections import defaultdict, deque
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Union
+
+from fastapi import HTTPException, status
+from pydantic import ValidationError
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.security import pwd_context
+from app.schemas.bulk_import import BulkImportUser, BulkImportResult
+from app.services.availability_service import AvailabilityService
+from app.services.commission_service import CommissionService
+
+MAX_REPORTED_ERRORS = 20
+
+# Upline of the existing users new rows are attached to, deep enough for every commission level
+_EXISTING_UPLINE = text("""
+    WITH RECURSIVE chain(id, referrer_id, depth) AS (
+        SELECT id, referrer_id, 1 FROM users WHERE id = ANY(:ids)
+        UNION ALL
+        SELECT u.id, u.referrer_id, chain.depth + 1
+        FROM users u JOIN chain ON u.id = chain.referrer_id
+        WHERE chain.depth < :levels
+    )
+    SELECT DISTINCT id, referrer_id FROM chain
+""")
+
+_CREDIT_EXISTING = text("""
+    UPDATE users SET
+        balance = users.balance + credit.amount,
+        total_earned = users.total_earned + credit.amount,
+        direct_referral_count = users.direct_referral_count + credit.direct,
+        updated_at = now()
+    FROM unnest(CAST(:ids AS uuid[]), CAST(:amounts AS numeric[]), CAST(:directs AS int[])) AS credit(id, amount, direct)
+    WHERE users.id = credit.id
+""")
+
+# New subtrees hang off existing users; every ancestor of each attachment point gains their size
+_EXTEND_EXISTING_DOWNLINE = text("""
+    WITH RECURSIVE chain(id, added) AS (
+        SELECT id, added FROM unnest(CAST(:ids AS uuid[]), CAST(:added AS int[])) AS attached(id, added)
+        UNION ALL
+        SELECT u.referrer_id, chain.added FROM users u JOIN chain ON u.id = chain.id
+        WHERE u.referrer_id IS NOT NULL
+    )
+    UPDATE users SET downline_count = users.downline_count + totals.added, updated_at = now()
+    FROM (SELECT id, sum(added) AS added FROM chain GROUP BY id) AS totals
+    WHERE users.id = totals.id
+""")
+
+
+class BulkImportService:
+
+    @staticmethod
+    def parse(content: bytes, fmt: str) -> List[BulkImportUser]:
+        """Parse CSV (with header row) or NDJSON into validated rows. Raises 400 listing the bad rows."""
+        try:
+            text_content = content.decode("utf-8-sig")
+        except UnicodeDecodeError as e:
+            BulkImportService._raise_if_errors([f"unreadable input: not UTF-8 (byte {e.start})"])
+        if fmt == "csv":
+            raw_rows: Iterable[Union[dict, str]] = csv.DictReader(io.StringIO(text_content))
+        elif fmt == "ndjson":
+            raw_rows = BulkImportService._ndjson_objects(text_content)
+        else:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Format must be 'csv' or 'ndjson'"
+            )
+
+        rows, errors = [], []
+        try:
+            for line_number, raw in enumerate(raw_rows, start=1):
+                if isinstance(raw, str):
+                    errors.append(f"row {line_number}: {raw}")
+                    continue
+                cleaned = {key: (value or None) for key, value in raw.items() if key}
+                try:
+                    rows.append(BulkImportUser.model_validate(cleaned))
+                except ValidationError as e:
+                    errors.append(f"row {line_number}: {e.errors()[0]['loc'][0]}: {e.errors()[0]['msg']}")
+        except csv.Error as e:
+            errors.append(f"unreadable input: {str(e)}")
+        BulkImportService._raise_if_errors(errors)
+        return rows
+
+    @staticmethod
+    def _ndjson_objects(text_content: str) -> Iterable[Union[dict, str]]:
+        """Each non-blank line as a dict, or an error message for a line that is not a JSON object."""
+        for line in text_content.splitlines():
+            if not line.strip():
+                continue
+            try:
+                value = json.loads(line)
+            except json.JSONDecodeError as e:
+                yield f"invalid JSON: {e.msg} (column {e.colno})"
+                continue
+            yield value if isinstance(value, dict) else "expected a JSON object"
+
+    @staticmethod
+    def _raise_if_errors(errors: List[str]) -> None:
+        if errors:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail={"errors": errors[:MAX_REPORTED_ERRORS], "error_count": len(errors)}
+            )
+
+    @staticmethod
+    async def import_users(
+        db: AsyncSession,
+        rows: List[BulkImportUser],
+        post_commissions: bool = True
+    ) -> BulkImportResult:
+        """
+        Load users with their referral relationships in one transaction.
+        Referral codes are resolved in memory, users are inserted parents-first
+        with COPY, and the commissions every new user would have generated are
+        computed in a single pass and posted with COPY plus one balance update.
+        """
+        errors: List[str] = []
+
+        # 1. Uniqueness within the file and against the database
+        for field in ("email", "username", "referral_code"):
+            seen = set()
+            for row in rows:
+                value = getattr(row, field)
+                if value is not None:
+                    if value in seen:
+                        errors.append(f"duplicate {field} in file: {value}")
+                    seen.add(value)
+        for row in rows:
+            if pwd_context.identify(row.password_hash) is None:
+                errors.append(f"{row.username}: password_hash is not a recognised hash")
+        BulkImportService._raise_if_errors(errors)
+
+        clashes = await db.execute(text("""
+            SELECT email, username, referral_code FROM users
+            WHERE email = ANY(:emails) OR username = ANY(:usernames) OR referral_code = ANY(:codes)
+        """), {
+            "emails": [row.email for row in rows],
+            "usernames": [row.username for row in rows],
+            "codes": [row.referral_code for row in rows if row.referral_code],
+        })
+        for clash in clashes:
+            errors.append(f"already exists: {clash.username} / {clash.email} / {clash.referral_code}")
+        BulkImportService._raise_if_errors(errors)
+
+        # 2. Ids and referral codes for the new users
+        ids = [uuid.uuid4() for _ in rows]
+        codes = [row.referral_code or str(uuid.uuid4())[:12].replace('-', '').upper() for row in rows]
+        id_by_code: Dict[str, uuid.UUID] = dict(zip(codes, ids))
+        code_by_id: Dict[uuid.UUID, str] = dict(zip(ids, codes))
+
+        # 3. Resolve referrer codes: first within the file, then against the database
+        missing_codes = {row.referred_by for row in rows if row.referred_by and row.referred_by not in id_by_code}
+        existing_by_code: Dict[str, uuid.UUID] = {}
+        if missing_codes:
+            result = await db.execute(
+                text("SELECT referral_code, id FROM users WHERE referral_code = ANY(:codes)"),
+                {"codes": list(missing_codes)}
+            )
+            existing_by_code = {code: user_id for code, user_id in result}
+        for code in missing_codes - existing_by_code.keys():
+            errors.append(f"unknown referral code: {code}")
+        BulkImportService._raise_if_errors(errors)
+
+        parent_of: Dict[uuid.UUID, Optional[uuid.UUID]] = {}
+        for user_id, row in zip(ids, rows):
+            if row.referred_by:
+                parent_of[user_id] = id_by_code.get(row.referred_by) or existing_by_code[row.referred_by]
+            else:
+                parent_of[user_id] = None
+
+        # 4. Topological order (parents before children); anything unreachable is in a cycle
+        new_ids = set(ids)
+        children = defaultdict(list)
+        queue = deque()
+        for user_id in ids:
+            parent = parent_of[user_id]
+            if parent in new_ids:
+                children[parent].append(user_id)
+            else:
+                queue.append(user_id)
+        order: List[uuid.UUID] = []
+        while queue:
+            user_id = queue.popleft()
+            order.append(user_id)
+            queue.extend(children[user_id])
+        if len(order) != len(ids):
+            errors.append(f"{len(ids) - len(order)} users are part of a referral cycle")
+        BulkImportService._raise_if_errors(errors)
+
+        # 5. Commissions, computed in one pass over the combined parent pointers
+        rows_by_id = dict(zip(ids, rows))
+        credits: Dict[uuid.UUID, Decimal] = defaultdict(Decimal)
+        commission_records = []
+        if post_commissions:
+            levels = len(CommissionService.COMMISSION_RATES)
+            attached = {parent for parent in parent_of.values() if parent is not None and parent not in new_ids}
+            upline = dict(parent_of)
+            if attached:
+                result = await db.execute(_EXISTING_UPLINE, {"ids": list(attached), "levels": levels})
+                upline.update({user_id: referrer_id for user_id, referrer_id in result})
+
+            amounts = [
+                Decimal(str(CommissionService.REGISTRATION_FEE * rate)).quantize(Decimal("0.01"))
+                for rate in CommissionService.COMMISSION_RATES
+            ]
+            for user_id in order:
+                username = rows_by_id[user_id].username
+                ancestor = upline[user_id]
+                level = 0
+                while ancestor is not None and level < levels:
+                    credits[ancestor] += amounts[level]
+                    commission_records.append((
+                        uuid.uuid4(), ancestor, "commission",
+                        f"Commission from Level {level + 1} referral: {username}",
+                        amounts[level], "completed",
+                    ))
+                    ancestor = upline.get(ancestor)
+                    level += 1
+
+        # 6. Referral counters: subtree sizes within the file (children before parents),
+        #    and how much each existing attachment point grows
+        downline: Dict[uuid.UUID, int] = defaultdict(int)
+        for user_id in reversed(order):
+            parent = parent_of[user_id]
+            if parent in new_ids:
+                downline[parent] += 1 + downline[user_id]
+        attached_direct: Dict[uuid.UUID, int] = defaultdict(int)
+        attached_added: Dict[uuid.UUID, int] = defaultdict(int)
+        for user_id in order:
+            parent = parent_of[user_id]
+            if parent is not None and parent not in new_ids:
+                attached_direct[parent] += 1
+                attached_added[parent] += 1 + downline[user_id]
+
+        # 7. COPY users parents-first (new users' own balances already include their credits),
+        #    then commission rows, then one update for credited existing users
+        connection = await db.connection()
+        raw_connection = await connection.get_raw_connection()
+        copy_connection = raw_connection.driver_connection
+
+        await copy_connection.copy_records_to_table(
+            "users",
+            columns=[
+                "id", "email", "username", "password_hash", "first_name", "last_name",
+                "referral_code", "referrer_id", "balance", "role", "status",
+                "withdrawal_status", "is_kyc_verified", "total_earned",
+                "direct_referral_count", "downline_count",
+            ],
+            records=[
+                (
+                    user_id, rows_by_id[user_id].email, rows_by_id[user_id].username,
+                    rows_by_id[user_id].password_hash, rows_by_id[user_id].first_name,
+                    rows_by_id[user_id].last_name, code_by_id[user_id],
+                    parent_of[user_id], credits.get(user_id, Decimal("0.00")), "user", "active",
+                    "active", False, credits.get(user_id, Decimal("0.00")),
+                    len(children[user_id]), downline[user_id],
+                )
+                for user_id in order
+            ],
+        )
+        if commission_records:
+            await copy_connection.copy_records_to_table(
+                "transactions",
+                columns=["id", "user_id", "tx_type", "reference", "amount", "status"],
+                records=commission_records,
+            )
+
+        existing_credits = {user_id: amount for user_id, amount in credits.items() if user_id not in new_ids}
+        touched = list(existing_credits.keys() | attached_direct.keys())
+        if touched:
+            await db.execute(_CREDIT_EXISTING, {
+                "ids": touched,
+                "amounts": [existing_credits.get(user_id, Decimal("0.00")) for user_id in touched],
+                "directs": [attached_direct.get(user_id, 0) for user_id in touched],
+            })
+        if attached_added:
+            await db.execute(_EXTEND_EXISTING_DOWNLINE, {
+                "ids": list(attached_added.keys()),
+                "added": list(attached_added.values()),
+            })
+
+        await db.commit()
+        for row in rows:
+            AvailabilityService.remember(row.username, row.email)
+        return BulkImportResult(
+            imported_users=len(order),
+            commission_transactions=len(commission_records),
+            total_commission=float(sum(credits.values(), Decimal("0.00"))),
+            existing_users_credited=len(existing_credits),
+        )
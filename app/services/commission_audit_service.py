@@ -0,0 +1,162 @@
+# app/services/commission_audit_service.py
+# Offline replay of registration commissions over the whole referral tree.
+# The tree is loaded as a dense parent-pointer array (user index -> referrer index)
+# and every level of ancestors is computed with vectorized indexing, so a full
+# audit is a handful of NumPy passes instead of one DB round trip per user and level.
+import io
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from app.services.commission_service import CommissionService
+
+# Users numbered 0..n-1 in id order. Both COPY queries below must run in the
+# same snapshot so the numbering agrees.
+_NUMBERED = "WITH numbered AS (SELECT id, referrer_id, (row_number() OVER (ORDER BY id) - 1)::bigint AS idx FROM users)"
+
+_PARENTS_QUERY = f"""
+    {_NUMBERED}
+    SELECT coalesce(p.idx, -1) FROM numbered n LEFT JOIN numbered p ON p.id = n.referrer_id ORDER BY n.idx
+"""
+
+_POSTED_QUERY = f"""
+    {_NUMBERED}
+    SELECT n.idx, round(sum(t.amount) * 100)::bigint
+    FROM transactions t JOIN numbered n ON n.id = t.user_id
+    WHERE t.tx_type = 'commission' AND t.status = 'completed'
+    GROUP BY n.idx
+"""
+
+_USERS_QUERY = f"""
+    {_NUMBERED}
+    SELECT n.idx, n.id, u.username FROM numbered n JOIN users u ON u.id = n.id WHERE n.idx = ANY($1::bigint[])
+"""
+
+# PostgreSQL binary COPY: 11-byte signature, int32 flags, int32 header-extension length
+_BINARY_HEADER = 19
+
+
+def _binary_copy_columns(data: bytes, columns: int) -> np.ndarray:
+    """Decode a binary COPY of non-null bigint columns into an (rows, columns) int64 array."""
+    extension = int.from_bytes(data[15:19], "big")
+    body = data[_BINARY_HEADER + extension:-2]  # trailer is int16 -1
+    fields = [("count", ">i2")]
+    for i in range(columns):
+        fields += [(f"len{i}", ">i4"), (f"v{i}", ">i8")]
+    rows = np.frombuffer(body, dtype=np.dtype(fields))
+    return np.stack([rows[f"v{i}"].astype(np.int64) for i in range(columns)], axis=1)
+
+
+def level_amounts_pence(rates: Sequence[float], fee: float = CommissionService.REGISTRATION_FEE) -> np.ndarray:
+    return np.array([round(fee * rate * 100) for rate in rates], dtype=np.int64)
+
+
+def ancestors_by_level(parent: np.ndarray, levels: int) -> List[np.ndarray]:
+    """
+    ancestors[k][i] is the index of user i's level-(k+1) referrer, or -1.
+    Each level is one gather over the parent array.
+    """
+    n = len(parent)
+    # Route "no parent" to a sentinel slot n that points at itself
+    extended = np.append(np.where(parent < 0, n, parent), n)
+    current = np.arange(n, dtype=np.int64)
+    result = []
+    for _ in range(levels):
+        current = extended[current]
+        result.append(np.where(current == n, -1, current))
+    return result
+
+
+def expected_commission_pence(parent: np.ndarray, rates: Sequence[float]) -> np.ndarray:
+    """Total commission each user should have earned from every registration below them."""
+    n = len(parent)
+    expected = np.zeros(n, dtype=np.int64)
+    for amount, ancestors in zip(level_amounts_pence(rates), ancestors_by_level(parent, len(rates))):
+        valid = ancestors[ancestors >= 0]
+        expected += np.bincount(valid, minlength=n)[:n] * amount
+    return expected
+
+
+@dataclass
+class ReferralTree:
+    parent: np.ndarray        # referrer index per user, -1 for none
+    posted_pence: np.ndarray  # completed commission transactions per user
+
+
+class CommissionAuditService:
+
+    @staticmethod
+    async def load_tree(raw_connection) -> ReferralTree:
+        """
+        Load parent pointers and posted commission totals with binary COPY.
+        `raw_connection` is an asyncpg connection; both reads share one
+        repeatable-read snapshot.
+        """
+        parents_buffer, posted_buffer = io.BytesIO(), io.BytesIO()
+        await raw_connection.copy_from_query(_PARENTS_QUERY, output=parents_buffer, format="binary")
+        await raw_connection.copy_from_query(_POSTED_QUERY, output=posted_buffer, format="binary")
+
+        parent = _binary_copy_columns(parents_buffer.getvalue(), 1)[:, 0]
+        posted = np.zeros(len(parent), dtype=np.int64)
+        posted_rows = _binary_copy_columns(posted_buffer.getvalue(), 2)
+        if len(posted_rows):
+            posted[posted_rows[:, 0]] = posted_rows[:, 1]
+        return ReferralTree(parent=parent, posted_pence=posted)
+
+    @staticmethod
+    async def describe_users(raw_connection, indices: Sequence[int]) -> Dict[int, dict]:
+        rows = await raw_connection.fetch(_USERS_QUERY, [int(i) for i in indices])
+        return {row["idx"]: {"user_id": str(row["id"]), "username": row["username"]} for row in rows}
+
+    @staticmethod
+    async def audit(
+        raw_connection,
+        what_if_rates: Optional[Sequence[float]] = None,
+        top: int = 20
+    ) -> dict:
+        """
+        Compare posted commissions with COMMISSION_RATES replayed over the tree,
+        and optionally model an alternative rate table.
+        """
+        async with raw_connection.transaction(isolation="repeatable_read", readonly=True):
+            tree = await CommissionAuditService.load_tree(raw_connection)
+            current_rates = CommissionService.COMMISSION_RATES
+            expected = expected_commission_pence(tree.parent, current_rates)
+            diff = tree.posted_pence - expected
+            mismatched = np.flatnonzero(diff)
+            worst = mismatched[np.argsort(-np.abs(diff[mismatched]))[:top]]
+
+            report = {
+                "users": int(len(tree.parent)),
+                "expected_total": int(expected.sum()) / 100,
+                "posted_total": int(tree.posted_pence.sum()) / 100,
+                "mismatched_users": int(len(mismatched)),
+                "overpaid_total": int(diff[diff > 0].sum()) / 100,
+                "underpaid_total": int(-diff[diff < 0].sum()) / 100,
+                "largest_mismatches": [],
+            }
+            users = await CommissionAuditService.describe_users(raw_connection, worst)
+            for i in worst:
+                report["largest_mismatches"].append({
+                    **users.get(int(i), {}),
+                    "expected": int(expected[i]) / 100,
+                    "posted": int(tree.posted_pence[i]) / 100,
+                })
+
+            if what_if_rates is not None:
+                alternative = expected_commission_pence(tree.parent, what_if_rates)
+                change = alternative - expected
+                ancestor_levels = ancestors_by_level(tree.parent, max(len(what_if_rates), len(current_rates)))
+                report["what_if"] = {
+                    "rates": list(what_if_rates),
+                    "total": int(alternative.sum()) / 100,
+                    "change_vs_current": int(change.sum()) / 100,
+                    "users_gaining": int((change > 0).sum()),
+                    "users_losing": int((change < 0).sum()),
+                    "per_level_total": [
+                        int((ancestors >= 0).sum() * amount) / 100
+                        for ancestors, amount in zip(ancestor_levels, level_amounts_pence(what_if_rates))
+                    ],
+                }
+        return report
@@ -35,7 +35,12 @@ class CommissionService:
             commission_rate = CommissionService.COMMISSION_RATES[distributed_levels]
             commission_amount = CommissionService.REGISTRATION_FEE * commission_rate
 
-            # Create commission transaction for the referrer
+            # Credit the referrer's balance and earnings counter...
+            await UserService.increment_counters(
+                db, referrer.id, balance=commission_amount, total_earned=commission_amount
+            )
+
+            # ...and commit them together with the commission transaction
             await TransactionService.create_commission(
                 db=db,
                 user_id=referrer.id,
@@ -43,9 +48,6 @@ class CommissionService:
                 reference=f"Commission from Level {distributed_levels + 1} referral: {new_user.username}"
             )
 
-            # Update referrer's balance
-            await UserService.update_balance(db, referrer.id, commission_amount)
-
             # Move to next level in the chain
             current_user_id = referrer.referrer_id
             distributed_levels += 1
\ No newline at end of file
@@ -0,0 +1,88 @@
+# app/services/kyc_review_service.py
+# Work queue for KYC reviewers. Each claim takes the oldest unclaimed pending
+# requests with FOR UPDATE SKIP LOCKED, so concurrent reviewers never receive
+# the same rows, and leases them for KYC_CLAIM_LEASE_SECONDS.
+import uuid
+from typing import List
+
+from sqlalchemy import text, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.models.kyc_request import KycRequest
+from app.schemas.kyc_request import KycClaimResponse
+from app.utils.supabase_storage import generate_signed_urls
+
+# Served by ix_kyc_requests_pending_created_at; the reviewer's own live claims are
+# handed back too, so reloading the queue extends rather than loses them
+_CLAIM = text("""
+    WITH next AS (
+        SELECT id FROM kyc_requests
+        WHERE status = 'pending'
+          AND (claim_expires_at IS NULL OR claim_expires_at < now() OR claimed_by = :reviewer_id)
+        ORDER BY created_at
+        LIMIT :limit
+        FOR UPDATE SKIP LOCKED
+    )
+    UPDATE kyc_requests
+    SET claimed_by = :reviewer_id, claim_expires_at = now() + make_interval(secs => :lease_seconds)
+    FROM next
+    WHERE kyc_requests.id = next.id
+    RETURNING kyc_requests.*
+""")
+
+
+class KycReviewService:
+
+    @staticmethod
+    async def claim(db: AsyncSession, reviewer_id: uuid.UUID, limit: int) -> List[KycClaimResponse]:
+        """
+        Lease up to `limit` pending requests to a reviewer, oldest first, with
+        signed document URLs fetched for the whole batch in one storage call.
+        """
+        result = await db.execute(_CLAIM, {
+            "reviewer_id": reviewer_id,
+            "limit": min(limit, settings.KYC_CLAIM_MAX_BATCH),
+            "lease_seconds": settings.KYC_CLAIM_LEASE_SECONDS,
+        })
+        rows = sorted(result.mappings().all(), key=lambda row: row["created_at"])
+        await db.commit()
+
+        document_urls = [
+            url for row in rows
+            for url in (row["document_front_url"], row["document_back_url"], row["selfie_url"]) if url
+        ]
+        signed = await generate_signed_urls(document_urls, expires_in=settings.KYC_CLAIM_LEASE_SECONDS)
+        return [
+            KycClaimResponse(
+                **row,
+                document_front_signed_url=signed.get(row["document_front_url"]),
+                document_back_signed_url=signed.get(row["document_back_url"]) if row["document_back_url"] else None,
+                selfie_signed_url=signed.get(row["selfie_url"]),
+            )
+            for row in rows
+        ]
+
+    @staticmethod
+    async def release(db: AsyncSession, reviewer_id: uuid.UUID, request_ids: List[uuid.UUID] = None) -> int:
+        """Return the reviewer's claims (all of them, or just `request_ids`) to the queue."""
+        query = (
+            update(KycRequest)
+            .where(KycRequest.claimed_by == reviewer_id, KycRequest.status == 'pending')
+            .values(claimed_by=None, claim_expires_at=None)
+            .execution_options(synchronize_session=False)
+        )
+        if request_ids:
+            query = query.where(KycRequest.id.in_(request_ids))
+        result = await db.execute(query)
+        await db.commit()
+        return result.rowcount
+
+    @staticmethod
+    def claimed_by_other(kyc_request: KycRequest, reviewer_id: uuid.UUID, now) -> bool:
+        return (
+            kyc_request.claimed_by is not None
+            and kyc_request.claimed_by != reviewer_id
+            and kyc_request.claim_expires_at is not None
+            and kyc_request.claim_expires_at > now
+        )
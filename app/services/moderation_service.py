@@ -0,0 +1,137 @@
+# app/services/moderation_service.py
+# Set-based admin decisions: every bulk call is one UPDATE ... WHERE id = ANY(:ids)
+# RETURNING (plus one joined update for KYC approval) and a single commit.
+import uuid
+from typing import List, Optional
+
+from sqlalchemy import any_, bindparam, func, or_, select, update
+from sqlalchemy.dialects.postgresql import ARRAY, UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.events import publish_events
+from app.db.models.kyc_request import KycRequest
+from app.db.models.user import User
+from app.schemas.moderation import BulkItemResult, BulkModerationResult
+
+
+def _ids_param(name: str, ids: List[uuid.UUID]):
+    """One array parameter instead of one bind parameter per id."""
+    return bindparam(name, ids, type_=ARRAY(UUID(as_uuid=True)))
+
+
+class ModerationService:
+
+    @staticmethod
+    async def _results(
+        db: AsyncSession,
+        model,
+        ids: List[uuid.UUID],
+        updated: List[uuid.UUID]
+    ) -> BulkModerationResult:
+        """Classify every requested id; only ids that were not updated need an existence check."""
+        updated_set = set(updated)
+        remaining = [item_id for item_id in ids if item_id not in updated_set]
+        existing = set()
+        if remaining:
+            result = await db.execute(
+                select(model.id).where(model.id == any_(_ids_param("remaining", remaining)))
+            )
+            existing = set(result.scalars().all())
+        return BulkModerationResult(
+            updated=len(updated_set),
+            results=[
+                BulkItemResult(
+                    id=item_id,
+                    result="updated" if item_id in updated_set else "unchanged" if item_id in existing else "not_found"
+                )
+                for item_id in ids
+            ],
+        )
+
+    @staticmethod
+    async def _set_user_column(
+        db: AsyncSession,
+        column,
+        value: str,
+        user_ids: List[uuid.UUID]
+    ) -> BulkModerationResult:
+        ids = list(dict.fromkeys(user_ids))
+        result = await db.execute(
+            update(User)
+            .where(User.id == any_(_ids_param("ids", ids)), column != value)
+            .values({column.key: value})
+            .returning(User.id)
+            .execution_options(synchronize_session=False)
+        )
+        updated = result.scalars().all()
+        outcome = await ModerationService._results(db, User, ids, updated)
+        await db.commit()
+        return outcome
+
+    @staticmethod
+    async def set_user_status(db: AsyncSession, user_ids: List[uuid.UUID], status: str) -> BulkModerationResult:
+        """Freeze or unfreeze many accounts."""
+        return await ModerationService._set_user_column(db, User.status, status, user_ids)
+
+    @staticmethod
+    async def set_withdrawal_status(
+        db: AsyncSession,
+        user_ids: List[uuid.UUID],
+        withdrawal_status: str
+    ) -> BulkModerationResult:
+        """Pause or resume withdrawals for many accounts."""
+        return await ModerationService._set_user_column(db, User.withdrawal_status, withdrawal_status, user_ids)
+
+    @staticmethod
+    async def review_kyc_requests(
+        db: AsyncSession,
+        request_ids: List[uuid.UUID],
+        status: str,
+        reviewer_id: uuid.UUID,
+        rejection_reason: Optional[str] = None
+    ) -> BulkModerationResult:
+        """
+        Approve or reject many pending KYC requests. Requests that were already
+        reviewed, or are claimed by another reviewer, are reported as unchanged.
+        """
+        ids = list(dict.fromkeys(request_ids))
+        values = {"status": status}
+        if status == 'rejected' and rejection_reason:
+            values["rejection_reason"] = rejection_reason
+
+        result = await db.execute(
+            update(KycRequest)
+            .where(
+                KycRequest.id == any_(_ids_param("ids", ids)),
+                KycRequest.status == 'pending',
+                or_(
+                    KycRequest.claimed_by.is_(None),
+                    KycRequest.claimed_by == reviewer_id,
+                    KycRequest.claim_expires_at < func.now()
+                )
+            )
+            .values(values)
+            .returning(KycRequest.id, KycRequest.user_id)
+            .execution_options(synchronize_session=False)
+        )
+        reviewed = result.all()
+        reviewed_ids = [row.id for row in reviewed]
+
+        if status == 'approved' and reviewed_ids:
+            # UPDATE users ... FROM kyc_requests: the user ids never leave the database
+            await db.execute(
+                update(User)
+                .where(
+                    User.id == KycRequest.user_id,
+                    KycRequest.id == any_(_ids_param("reviewed", reviewed_ids))
+                )
+                .values(is_kyc_verified=True)
+                .execution_options(synchronize_session=False)
+            )
+
+        await publish_events(db, "kyc.reviewed", [
+            (row.user_id, {"kyc_request_id": row.id, "status": status}) for row in reviewed
+        ])
+        outcome = await ModerationService._results(db, KycRequest, ids, reviewed_ids)
+        await db.commit()
+        return outcome
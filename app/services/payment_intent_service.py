@@ -0,0 +1,84 @@
+# app/services/payment_intent_service.py
+# Registration payments are confirmed from a local table filled by the
+# payment_intent.succeeded webhook; Stripe is only asked when a confirm
+# arrives before its webhook.
+from sqlalchemy import select, text, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import HTTPException, status
+
+from app.db.models.verified_payment_intent import VerifiedPaymentIntent
+from app.services.stripe_service import StripeService
+
+REGISTRATION_CURRENCY = "gbp"
+
+
+class PaymentIntentService:
+
+    @staticmethod
+    async def record_succeeded(db: AsyncSession, payment_intent_id: str, amount: int, currency: str) -> None:
+        """Store a succeeded intent; webhook redeliveries are no-ops."""
+        await db.execute(
+            insert(VerifiedPaymentIntent)
+            .values(id=payment_intent_id, amount=amount, currency=currency)
+            .on_conflict_do_nothing(index_elements=["id"])
+        )
+        await db.commit()
+
+    @staticmethod
+    async def consume(db: AsyncSession, payment_intent_id: str, expected_amount: int) -> None:
+        """
+        Mark a registration payment as used, or raise 400. Does not commit: the
+        caller commits together with the new account, so a failed registration
+        leaves the payment available for another attempt.
+        """
+        result = await db.execute(
+            update(VerifiedPaymentIntent)
+            .where(
+                VerifiedPaymentIntent.id == payment_intent_id,
+                VerifiedPaymentIntent.consumed_at.is_(None),
+                VerifiedPaymentIntent.amount == expected_amount,
+                VerifiedPaymentIntent.currency == REGISTRATION_CURRENCY
+            )
+            .values(consumed_at=text("now()"))
+            .returning(VerifiedPaymentIntent.id)
+            .execution_options(synchronize_session=False)
+        )
+        if result.scalar_one_or_none():
+            return
+
+        known = (await db.execute(
+            select(VerifiedPaymentIntent).where(VerifiedPaymentIntent.id == payment_intent_id)
+        )).scalar_one_or_none()
+        if known:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Payment already used" if known.consumed_at else "Invalid or unsuccessful payment"
+            )
+
+        # Not seen by the webhook yet: ask Stripe, without holding a connection meanwhile
+        await db.commit()
+        if not await StripeService.verify_payment_intent(payment_intent_id, expected_amount=expected_amount):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid or unsuccessful payment"
+            )
+        # The webhook may have recorded it meanwhile: only an unconsumed row may be claimed
+        statement = insert(VerifiedPaymentIntent).values(
+            id=payment_intent_id,
+            amount=expected_amount,
+            currency=REGISTRATION_CURRENCY,
+            consumed_at=text("now()")
+        )
+        result = await db.execute(
+            statement.on_conflict_do_update(
+                index_elements=["id"],
+                set_={"consumed_at": text("now()")},
+                where=VerifiedPaymentIntent.consumed_at.is_(None)
+            ).returning(VerifiedPaymentIntent.id)
+        )
+        if not result.scalar_one_or_none():
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Payment already used"
+            )
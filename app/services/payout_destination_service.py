@@ -0,0 +1,123 @@
+# app/services/payout_destination_service.py
+# Saved bank accounts for withdrawals. Details are tokenized with Stripe once,
+# when the destination is first saved, and stored encrypted; every later
+# withdrawal pays out to the stored bank account id with a single Stripe call.
+import uuid
+from typing import List
+
+from fastapi import HTTPException, status
+from sqlalchemy import select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.security import bank_account_fingerprint, encrypt_bank_detail
+from app.db.models.payout_destination import PayoutDestination
+from app.schemas.payout_destination import PayoutDestinationCreate
+from app.services.stripe_service import StripeService
+
+
+class PayoutDestinationService:
+
+    @staticmethod
+    async def list_for_user(db: AsyncSession, user_id: uuid.UUID) -> List[PayoutDestination]:
+        result = await db.execute(
+            select(PayoutDestination)
+            .where(PayoutDestination.user_id == user_id, PayoutDestination.is_active.is_(True))
+            .order_by(PayoutDestination.created_at.desc())
+        )
+        return result.scalars().all()
+
+    @staticmethod
+    async def get_active(db: AsyncSession, user_id: uuid.UUID, destination_id: uuid.UUID) -> PayoutDestination:
+        result = await db.execute(
+            select(PayoutDestination).where(
+                PayoutDestination.id == destination_id,
+                PayoutDestination.user_id == user_id,
+                PayoutDestination.is_active.is_(True)
+            )
+        )
+        destination = result.scalar_one_or_none()
+        if not destination:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Payout destination not found"
+            )
+        return destination
+
+    @staticmethod
+    async def get_or_create(
+        db: AsyncSession,
+        user_id: uuid.UUID,
+        data: PayoutDestinationCreate
+    ) -> PayoutDestination:
+        """
+        Return the user's saved destination for these details, tokenizing and
+        saving them first if needed. The caller commits.
+
+        Before calling Stripe the current transaction is committed, so no pooled
+        connection is held during the round trip; call this before writing anything.
+        """
+        fingerprint = bank_account_fingerprint(data.account_number, data.account_name)
+        result = await db.execute(
+            select(PayoutDestination).where(
+                PayoutDestination.user_id == user_id,
+                PayoutDestination.fingerprint == fingerprint
+            )
+        )
+        destination = result.scalar_one_or_none()
+        if destination:
+            destination.is_active = True
+            destination.bank_name = data.bank_name
+            return destination
+
+        await db.commit()
+        bank_account_id = await StripeService.create_bank_account(
+            account_number=data.account_number,
+            sort_code="000000",  # Placeholder - you'll need to collect sort_code or adjust for your country
+            account_name=data.account_name,
+            # Two concurrent first withdrawals to the same account share one token
+            idempotency_key=f"payout-destination-{user_id}-{fingerprint[:32]}"
+        )
+
+        statement = (
+            insert(PayoutDestination)
+            .values(
+                id=uuid.uuid4(),
+                user_id=user_id,
+                bank_name=data.bank_name,
+                account_name=data.account_name,
+                account_last4=data.account_number[-4:],
+                account_number_encrypted=encrypt_bank_detail(data.account_number),
+                fingerprint=fingerprint,
+                stripe_bank_account_id=bank_account_id
+            )
+            .on_conflict_do_update(
+                constraint="uq_payout_destinations_user_fingerprint",
+                set_={"is_active": True}
+            )
+            .returning(PayoutDestination)
+        )
+        result = await db.execute(
+            select(PayoutDestination).from_statement(statement).execution_options(populate_existing=True)
+        )
+        return result.scalar_one()
+
+    @staticmethod
+    async def deactivate(db: AsyncSession, user_id: uuid.UUID, destination_id: uuid.UUID) -> None:
+        """Remove a destination from the user's list; past withdrawals keep their reference."""
+        result = await db.execute(
+            update(PayoutDestination)
+            .where(
+                PayoutDestination.id == destination_id,
+                PayoutDestination.user_id == user_id,
+                PayoutDestination.is_active.is_(True)
+            )
+            .values(is_active=False)
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount == 0:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Payout destination not found"
+            )
+        await db.commit()
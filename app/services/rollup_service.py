@@ -0,0 +1,156 @@
+# app/services/rollup_service.py
+# Daily trend data for the admin dashboard. The periodic job finds the days touched
+# by rows created (or, for withdrawals, updated) since its watermark and rebuilds
+# just those days from the source tables; the backfill does the same for a date range.
+import logging
+from datetime import date, datetime, time, timedelta, timezone
+from typing import List, Optional, Sequence
+
+from sqlalchemy import delete, select, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.models.daily_rollup import DailyRollup, RollupWatermark
+from app.db.session import AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
+
+WATERMARK_NAME = "daily_rollups"
+# Only one worker process rebuilds rollups at a time
+_ROLLUP_LOCK_KEY = 0x726F6C6C  # "roll"
+
+_TOUCHED_DAYS = text("""
+    SELECT (created_at AT TIME ZONE 'UTC')::date FROM users WHERE created_at > :since
+    UNION
+    SELECT (created_at AT TIME ZONE 'UTC')::date FROM transactions
+    WHERE tx_type = 'commission' AND created_at > :since
+    UNION
+    SELECT (created_at AT TIME ZONE 'UTC')::date FROM withdrawal_requests WHERE updated_at > :since
+""")
+
+# Every source is range-filtered on created_at first (index / partition pruning),
+# then narrowed to the requested days
+_REBUILD_DAYS = text("""
+    WITH u AS (
+        SELECT (created_at AT TIME ZONE 'UTC')::date AS day, referrer_id FROM users
+        WHERE created_at >= :start AND created_at < :end
+    ),
+    c AS (
+        SELECT (created_at AT TIME ZONE 'UTC')::date AS day,
+               coalesce(substring(reference FROM 'Level ([0-9]+)'), 'unknown') AS level,
+               amount
+        FROM transactions
+        WHERE tx_type = 'commission' AND status = 'completed'
+          AND created_at >= :start AND created_at < :end
+    ),
+    w AS (
+        SELECT (created_at AT TIME ZONE 'UTC')::date AS day, status, amount FROM withdrawal_requests
+        WHERE created_at >= :start AND created_at < :end
+    )
+    INSERT INTO daily_rollups (day, metric, dimension, count, amount)
+    SELECT day, 'signups', 'all', count(*), 0 FROM u
+    WHERE day = ANY(CAST(:days AS date[])) GROUP BY day
+    UNION ALL
+    SELECT day, 'signups', 'referred', count(*), 0 FROM u
+    WHERE day = ANY(CAST(:days AS date[])) AND referrer_id IS NOT NULL GROUP BY day
+    UNION ALL
+    SELECT day, 'commission', 'level_' || level, count(*), sum(amount) FROM c
+    WHERE day = ANY(CAST(:days AS date[])) GROUP BY day, level
+    UNION ALL
+    SELECT day, 'withdrawals', status, count(*), sum(amount) FROM w
+    WHERE day = ANY(CAST(:days AS date[])) GROUP BY day, status
+""")
+
+
+def _utc_midnight(day: date) -> datetime:
+    return datetime.combine(day, time.min, tzinfo=timezone.utc)
+
+
+class RollupService:
+
+    @staticmethod
+    async def _try_lock(db: AsyncSession) -> bool:
+        result = await db.execute(text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": _ROLLUP_LOCK_KEY})
+        return result.scalar()
+
+    @staticmethod
+    async def rebuild_days(db: AsyncSession, days: Sequence[date]) -> None:
+        """Replace the rollup rows of `days` with fresh aggregates. Does not commit."""
+        if not days:
+            return
+        days = sorted(set(days))
+        await db.execute(delete(DailyRollup).where(DailyRollup.day.in_(days)))
+        await db.execute(_REBUILD_DAYS, {
+            "days": days,
+            "start": _utc_midnight(days[0]),
+            "end": _utc_midnight(days[-1] + timedelta(days=1)),
+        })
+
+    @staticmethod
+    async def refresh(db: AsyncSession) -> int:
+        """
+        Incremental run: rebuild the days touched since the watermark, then move it.
+        Returns the number of days rebuilt (0 when another worker holds the lock).
+        """
+        if not await RollupService._try_lock(db):
+            return 0
+
+        # now() is the transaction start, so anything committed later is picked up next run
+        started = (await db.execute(text("SELECT now()"))).scalar()
+        watermark = (await db.execute(
+            select(RollupWatermark.watermark).where(RollupWatermark.name == WATERMARK_NAME)
+        )).scalar()
+        lookback = timedelta(seconds=settings.ROLLUP_LOOKBACK_SECONDS)
+        # First run only covers recent rows; history comes from the backfill command
+        since = (watermark or started) - lookback
+
+        days = [day for (day,) in await db.execute(_TOUCHED_DAYS, {"since": since})]
+        await RollupService.rebuild_days(db, days)
+
+        await db.execute(
+            insert(RollupWatermark)
+            .values(name=WATERMARK_NAME, watermark=started)
+            .on_conflict_do_update(index_elements=[RollupWatermark.name], set_={"watermark": started})
+        )
+        await db.commit()
+        return len(days)
+
+    @staticmethod
+    async def backfill(db: AsyncSession, start: date, end: date, chunk_days: int = 31) -> int:
+        """Rebuild every day in [start, end], committing one chunk at a time. Returns days rebuilt."""
+        rebuilt = 0
+        chunk_start = start
+        while chunk_start <= end:
+            chunk_end = min(chunk_start + timedelta(days=chunk_days - 1), end)
+            # Wait for the periodic job instead of skipping the chunk
+            await db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": _ROLLUP_LOCK_KEY})
+            days = [chunk_start + timedelta(days=i) for i in range((chunk_end - chunk_start).days + 1)]
+            await RollupService.rebuild_days(db, days)
+            await db.commit()
+            rebuilt += len(days)
+            logger.info("Rebuilt rollups %s..%s", chunk_start, chunk_end)
+            chunk_start = chunk_end + timedelta(days=1)
+        return rebuilt
+
+    @staticmethod
+    async def series(
+        db: AsyncSession,
+        start: date,
+        end: date,
+        metrics: Optional[List[str]] = None
+    ) -> List[DailyRollup]:
+        """Rollup rows for a day range: one range scan on the (day, metric, dimension) key."""
+        query = select(DailyRollup).where(DailyRollup.day >= start, DailyRollup.day <= end)
+        if metrics:
+            query = query.where(DailyRollup.metric.in_(metrics))
+        result = await db.execute(query.order_by(DailyRollup.day, DailyRollup.metric, DailyRollup.dimension))
+        return result.scalars().all()
+
+
+async def refresh_daily_rollups() -> None:
+    """Periodic job entry point (see app/main.py)."""
+    async with AsyncSessionLocal() as session:
+        days = await RollupService.refresh(session)
+    if days:
+        logger.info("Rebuilt rollups for %d day(s)", days)
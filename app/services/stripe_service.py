@@ -1,9 +1,20 @@
 # app/services/stripe_service.py
-import stripe
 from app.core.config import settings
-from app.core.stripe_client import stripe
+from app.core.stripe_client import get_stripe
+from app.core.resilience import stripe_provider, ProviderUnavailable, ProviderTimeout
 from fastapi import HTTPException, status
-from typing import Dict, Any
+from typing import Dict, Any, Optional
+
+
+class PayoutOutcomeUnknown(HTTPException):
+    """
+    Stripe could not be reached, failed internally or did not answer in time, so
+    the request may or may not have taken effect. Retry with the same idempotency
+    key; do not compensate.
+    """
+
+    def __init__(self, detail: str):
+        super().__init__(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=detail)
 
 
 class StripeService:
@@ -11,8 +22,11 @@ class StripeService:
     @staticmethod
     async def create_payment_intent(amount: int, currency: str = "gbp") -> str:
         """Create a PaymentIntent for user registration."""
+        stripe = get_stripe()
         try:
-            payment_intent = stripe.PaymentIntent.create(
+            # Not idempotent (no key), so never retried
+            payment_intent = await stripe_provider.call(
+                stripe.PaymentIntent.create,
                 amount=amount,  # in smallest currency unit (pence)
                 currency=currency,
                 automatic_payment_methods={"enabled": True},
@@ -28,8 +42,11 @@ class StripeService:
     @staticmethod
     async def verify_payment_intent(payment_intent_id: str, expected_amount: int) -> bool:
         """Verify that a PaymentIntent was successful and for the correct amount."""
+        stripe = get_stripe()
         try:
-            payment_intent = stripe.PaymentIntent.retrieve(payment_intent_id)
+            payment_intent = await stripe_provider.call(
+                stripe.PaymentIntent.retrieve, payment_intent_id, idempotent=True
+            )
             
             return (
                 payment_intent.status == "succeeded" and
@@ -43,12 +60,40 @@ class StripeService:
             )
 
     @staticmethod
-    async def create_bank_account_token(account_number: str, sort_code: str, account_name: str) -> str:
+    async def create_bank_account_token(
+        account_number: str,
+        sort_code: str,
+        account_name: str,
+        idempotency_key: Optional[str] = None
+    ) -> str:
         """Create a Stripe token for bank account details (PCI-compliant)."""
+        token = await StripeService._tokenize_bank_account(account_number, sort_code, account_name, idempotency_key)
+        return token.id
+
+    @staticmethod
+    async def create_bank_account(
+        account_number: str,
+        sort_code: str,
+        account_name: str,
+        idempotency_key: Optional[str] = None
+    ) -> str:
+        """Tokenize bank account details once and return the reusable bank account id ("ba_...")."""
+        token = await StripeService._tokenize_bank_account(account_number, sort_code, account_name, idempotency_key)
+        return token.bank_account.id
+
+    @staticmethod
+    async def _tokenize_bank_account(
+        account_number: str,
+        sort_code: str,
+        account_name: str,
+        idempotency_key: Optional[str]
+    ):
+        stripe = get_stripe()
         try:
             # UK bank accounts use sort_code + account_number
             # Format: sort_code (6 digits) and account_number (8 digits)
-            token = stripe.Token.create(
+            token = await stripe_provider.call(
+                stripe.Token.create,
                 bank_account={
                     "country": "GB",
                     "currency": "gbp",
@@ -56,9 +101,16 @@ class StripeService:
                     "account_holder_type": "individual",
                     "account_number": account_number,
                     "sort_code": sort_code,
-                }
+                },
+                idempotency_key=idempotency_key,
+                idempotent=idempotency_key is not None
             )
-            return token.id
+            return token
+        except (ProviderUnavailable, ProviderTimeout) as e:
+            # An earlier attempt may have reached Stripe before the circuit opened
+            raise PayoutOutcomeUnknown(e.detail)
+        except (stripe.error.APIConnectionError, stripe.error.APIError, stripe.error.RateLimitError) as e:
+            raise PayoutOutcomeUnknown(f"Stripe unavailable: {str(e)}")
         except stripe.error.StripeError as e:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -66,17 +118,35 @@ class StripeService:
             )
 
     @staticmethod
-    async def create_payout(amount: int, bank_token: str, description: str = "") -> str:
-        """Create a Stripe Payout to a bank account."""
+    async def create_payout(
+        amount: int,
+        bank_token: str,
+        description: str = "",
+        idempotency_key: Optional[str] = None,
+        metadata: Optional[Dict[str, str]] = None
+    ) -> str:
+        """
+        Create a Stripe Payout to a bank account.
+        With an idempotency key, retrying within 24 hours returns the original payout.
+        """
+        stripe = get_stripe()
         try:
-            payout = stripe.Payout.create(
+            payout = await stripe_provider.call(
+                stripe.Payout.create,
                 amount=amount,
                 currency="gbp",
                 method="standard",
                 destination=bank_token,
-                description=description or f"Withdrawal payout {amount} GBP"
+                description=description or f"Withdrawal payout {amount} GBP",
+                metadata=metadata or {},
+                idempotency_key=idempotency_key,
+                idempotent=idempotency_key is not None
             )
             return payout.id  # Returns payout ID like "po_..."
+        except (ProviderUnavailable, ProviderTimeout) as e:
+            raise PayoutOutcomeUnknown(e.detail)
+        except (stripe.error.APIConnectionError, stripe.error.APIError, stripe.error.RateLimitError) as e:
+            raise PayoutOutcomeUnknown(f"Stripe payout not confirmed: {str(e)}")
         except stripe.error.StripeError as e:
             raise HTTPException(
                 status_code=status.HTTP_502_BAD_GATEWAY,
@@ -86,6 +156,7 @@ class StripeService:
     @staticmethod
     async def construct_webhook_event(payload: bytes, sig_header: str) -> Dict[str, Any]:
         """Verify and construct a Stripe webhook event."""
+        stripe = get_stripe()
         try:
             event = stripe.Webhook.construct_event(
                 payload, sig_header, settings.STRIPE_WEBHOOK_SECRET
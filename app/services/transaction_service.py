@@ -1,5 +1,6 @@
 # app/services/transaction_service.py
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
 from app.db.models.transaction import Transaction
 from app.schemas.transaction import TransactionCreate
 from typing import Optional
@@ -41,10 +42,16 @@ class TransactionService:
         return await TransactionService.create(db, transaction_data)
 
     @staticmethod
-    async def update_status(db: AsyncSession, transaction_id: uuid.UUID, status: str) -> Optional[Transaction]:
-        transaction = await db.get(Transaction, transaction_id)
+    async def update_status(
+        db: AsyncSession, transaction_id: uuid.UUID, status: str, commit: bool = True
+    ) -> Optional[Transaction]:
+        """Set a transaction's status. With commit=False the caller commits."""
+        # Primary key is (id, created_at) on the partitioned table, so look up by id
+        result = await db.execute(select(Transaction).where(Transaction.id == transaction_id))
+        transaction = result.scalar_one_or_none()
         if transaction:
             transaction.status = status
-            await db.commit()
-            await db.refresh(transaction)
+            if commit:
+                await db.commit()
+                await db.refresh(transaction)
         return transaction
\ No newline at end of file
@@ -1,47 +1,163 @@
 # app/services/user_service.py
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update
+from sqlalchemy import select, update, bindparam, literal_column, text
 from sqlalchemy.exc import IntegrityError
 from typing import Optional
+from decimal import Decimal
 import uuid
 from app.db.models.user import User
 from app.schemas.user import UserCreate, UserUpdate
 from app.core.security import get_password_hash, verify_password
+from app.services.availability_service import AvailabilityService
 from fastapi import HTTPException, status
 
 
+# Hot lookups are built once at import and executed with bound parameters, so each
+# call skips statement construction and goes straight to the compiled cache.
+_USER_BY_ID = select(User).where(User.id == bindparam("user_id"))
+_USER_BY_EMAIL = select(User).where(User.email == bindparam("email"))
+_USER_BY_USERNAME = select(User).where(User.username == bindparam("username"))
+_USER_BY_REFERRAL_CODE = select(User).where(User.referral_code == bindparam("referral_code"))
+
+# Existence checks select a constant instead of hydrating a User
+_EMAIL_EXISTS = select(literal_column("1")).where(User.email == bindparam("email")).limit(1)
+_USERNAME_EXISTS = select(literal_column("1")).where(User.username == bindparam("username")).limit(1)
+
+# Counter columns that can be adjusted with increment_counters / update_balance
+MONEY_COUNTERS = ("balance", "total_earned", "total_withdrawn", "pending_withdrawals")
+COUNT_COUNTERS = ("direct_referral_count", "downline_count")
+
+# A new referral adds one to the downline of every ancestor, and one direct referral to the referrer.
+# The upline is locked in id order first: the UPDATE alone locks rows in join order,
+# which differs between transactions, so concurrent signups under a shared
+# ancestor deadlocked instead of queueing.
+_RECORD_REFERRAL = text("""
+    WITH RECURSIVE upline(id, depth) AS (
+        SELECT CAST(:referrer_id AS uuid), 1
+        UNION ALL
+        SELECT u.referrer_id, upline.depth + 1
+        FROM users u JOIN upline ON u.id = upline.id
+        WHERE u.referrer_id IS NOT NULL
+    ),
+    locked AS MATERIALIZED (
+        SELECT users.id FROM users JOIN upline ON users.id = upline.id
+        ORDER BY users.id
+        FOR NO KEY UPDATE OF users
+    )
+    UPDATE users SET
+        downline_count = users.downline_count + 1,
+        direct_referral_count = users.direct_referral_count + CASE WHEN upline.depth = 1 THEN 1 ELSE 0 END,
+        updated_at = now()
+    FROM upline JOIN locked ON locked.id = upline.id
+    WHERE users.id = upline.id
+""")
+
+# Counters recomputed from transactions, withdrawal_requests and the referral tree
+_EXPECTED_COUNTERS = """
+    WITH RECURSIVE
+    earned AS (
+        SELECT user_id, sum(amount) AS total FROM transactions
+        WHERE tx_type = 'commission' AND status = 'completed'
+        GROUP BY user_id
+    ),
+    withdrawn AS (
+        SELECT user_id,
+               coalesce(sum(amount) FILTER (WHERE status = 'paid'), 0) AS paid,
+               coalesce(sum(amount) FILTER (WHERE status NOT IN ('paid', 'failed')), 0) AS pending
+        FROM withdrawal_requests
+        GROUP BY user_id
+    ),
+    direct AS (
+        SELECT referrer_id AS id, count(*) AS n FROM users WHERE referrer_id IS NOT NULL GROUP BY referrer_id
+    ),
+    chain(id, ancestor) AS (
+        SELECT id, referrer_id FROM users WHERE referrer_id IS NOT NULL
+        UNION ALL
+        SELECT chain.id, u.referrer_id FROM chain JOIN users u ON u.id = chain.ancestor
+        WHERE u.referrer_id IS NOT NULL
+    ),
+    downline AS (
+        SELECT ancestor AS id, count(*) AS n FROM chain GROUP BY ancestor
+    ),
+    expected AS (
+        SELECT u.id,
+               coalesce(earned.total, 0) AS total_earned,
+               coalesce(withdrawn.paid, 0) AS total_withdrawn,
+               coalesce(withdrawn.pending, 0) AS pending_withdrawals,
+               coalesce(direct.n, 0) AS direct_referral_count,
+               coalesce(downline.n, 0) AS downline_count
+        FROM users u
+        LEFT JOIN earned ON earned.user_id = u.id
+        LEFT JOIN withdrawn ON withdrawn.user_id = u.id
+        LEFT JOIN direct ON direct.id = u.id
+        LEFT JOIN downline ON downline.id = u.id
+    )
+"""
+_DRIFTED = """
+    (users.total_earned, users.total_withdrawn, users.pending_withdrawals,
+     users.direct_referral_count, users.downline_count)
+    IS DISTINCT FROM
+    (expected.total_earned, expected.total_withdrawn, expected.pending_withdrawals,
+     expected.direct_referral_count, expected.downline_count)
+"""
+_COUNT_DRIFTED = text(_EXPECTED_COUNTERS + f"""
+    SELECT count(*) FROM users JOIN expected ON expected.id = users.id WHERE {_DRIFTED}
+""")
+REPAIR_COUNTERS = text(_EXPECTED_COUNTERS + f"""
+    UPDATE users SET
+        total_earned = expected.total_earned,
+        total_withdrawn = expected.total_withdrawn,
+        pending_withdrawals = expected.pending_withdrawals,
+        direct_referral_count = expected.direct_referral_count,
+        downline_count = expected.downline_count,
+        updated_at = now()
+    FROM expected
+    WHERE users.id = expected.id AND {_DRIFTED}
+""")
+
+
 class UserService:
     
     @staticmethod
     async def get_by_id(db: AsyncSession, user_id: uuid.UUID) -> Optional[User]:
-        result = await db.execute(select(User).where(User.id == user_id))
+        result = await db.execute(_USER_BY_ID, {"user_id": user_id})
         return result.scalar_one_or_none()
 
     @staticmethod
     async def get_by_email(db: AsyncSession, email: str) -> Optional[User]:
-        result = await db.execute(select(User).where(User.email == email))
+        result = await db.execute(_USER_BY_EMAIL, {"email": email})
         return result.scalar_one_or_none()
 
     @staticmethod
     async def get_by_username(db: AsyncSession, username: str) -> Optional[User]:
-        result = await db.execute(select(User).where(User.username == username))
+        result = await db.execute(_USER_BY_USERNAME, {"username": username})
         return result.scalar_one_or_none()
 
     @staticmethod
     async def get_by_referral_code(db: AsyncSession, referral_code: str) -> Optional[User]:
-        result = await db.execute(select(User).where(User.referral_code == referral_code))
+        result = await db.execute(_USER_BY_REFERRAL_CODE, {"referral_code": referral_code})
         return result.scalar_one_or_none()
 
+    @staticmethod
+    async def email_exists(db: AsyncSession, email: str) -> bool:
+        result = await db.execute(_EMAIL_EXISTS, {"email": email})
+        return result.scalar() is not None
+
+    @staticmethod
+    async def username_exists(db: AsyncSession, username: str) -> bool:
+        result = await db.execute(_USERNAME_EXISTS, {"username": username})
+        return result.scalar() is not None
+
     @staticmethod
     async def create(db: AsyncSession, user_data: UserCreate, referrer_id: Optional[uuid.UUID] = None) -> User:
         # Check if user already exists
-        if await UserService.get_by_email(db, user_data.email):
+        if await UserService.email_exists(db, user_data.email):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="User with this email already exists"
             )
         
-        if await UserService.get_by_username(db, user_data.username):
+        if await UserService.username_exists(db, user_data.username):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="User with this username already exists"
@@ -62,7 +178,10 @@ class UserService:
         )
 
         db.add(db_user)
+        if referrer_id:
+            await UserService.record_referral(db, referrer_id)
         await db.commit()
+        AvailabilityService.remember(db_user.username, db_user.email)
         await db.refresh(db_user)
         return db_user
 
@@ -89,6 +208,8 @@ class UserService:
             setattr(user, field, value)
 
         await db.commit()
+        if 'username' in update_data or 'email' in update_data:
+            AvailabilityService.remember(user.username, user.email)
         await db.refresh(user)
         return user
     
@@ -112,23 +233,79 @@ class UserService:
 
 
     @staticmethod
-    async def update_balance(db: AsyncSession, user_id: uuid.UUID, amount: float) -> User:
-        """Atomically update user balance. Use negative amount for deductions."""
-        user = await UserService.get_by_id(db, user_id)
-        if not user:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="User not found"
-            )
+    def _counter_values(deltas: dict) -> dict:
+        values = {}
+        for name, delta in deltas.items():
+            if name in MONEY_COUNTERS:
+                values[name] = getattr(User, name) + Decimal(str(delta))
+            elif name in COUNT_COUNTERS:
+                values[name] = getattr(User, name) + int(delta)
+            else:
+                raise ValueError(f"{name} is not a counter column")
+        return values
+
+    @staticmethod
+    async def increment_counters(db: AsyncSession, user_id: uuid.UUID, **deltas) -> None:
+        """
+        Add deltas to counter columns in one UPDATE, e.g. total_earned=25.0.
+        Does not commit: the caller commits it together with the ledger change.
+        """
+        await db.execute(
+            update(User)
+            .where(User.id == user_id)
+            .values(UserService._counter_values(deltas))
+            .execution_options(synchronize_session=False)
+        )
 
-        # Check if deduction would make balance negative
-        if user.balance + amount < 0:
+    @staticmethod
+    async def record_referral(db: AsyncSession, referrer_id: uuid.UUID) -> None:
+        """Count a new user in the referral counters of the whole upline. Does not commit."""
+        await db.execute(_RECORD_REFERRAL, {"referrer_id": referrer_id})
+
+    @staticmethod
+    async def repair_counters(db: AsyncSession, dry_run: bool = False) -> int:
+        """Recompute every user's counters from the source tables. Returns the number of drifted users."""
+        if dry_run:
+            return (await db.execute(_COUNT_DRIFTED)).scalar_one()
+        # Counter writers update users in the same transaction as their ledger row, so
+        # blocking user writes while recomputing gives a consistent snapshot (reads continue)
+        await db.execute(text("LOCK TABLE users IN SHARE ROW EXCLUSIVE MODE"))
+        result = await db.execute(REPAIR_COUNTERS)
+        await db.commit()
+        return result.rowcount
+
+    @staticmethod
+    async def update_balance(
+        db: AsyncSession,
+        user_id: uuid.UUID,
+        amount: float,
+        commit: bool = True,
+        **counters
+    ) -> User:
+        """
+        Atomically update user balance, plus any counter deltas passed as keywords.
+        Use negative amount for deductions. With commit=False the caller commits.
+        """
+        result = await db.execute(
+            update(User)
+            .where(User.id == user_id, User.balance + Decimal(str(amount)) >= 0)
+            .values(UserService._counter_values({"balance": amount, **counters}))
+            .returning(User)
+            .execution_options(synchronize_session=False, populate_existing=True)
+        )
+        user = result.scalar_one_or_none()
+        if not user:
+            if not await UserService.get_by_id(db, user_id):
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="User not found"
+                )
+            # Deduction would make balance negative
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Insufficient balance"
             )
 
-        user.balance += amount
-        await db.commit()
-        await db.refresh(user)
-        return user
\ No newline at end of file
+        if commit:
+            await db.commit()
+        return user
@@ -1,17 +1,52 @@
 # app/services/withdrawal_service.py
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, update, func, or_, text, literal
 from app.db.models.user import User
 from app.db.models.transaction import Transaction
 from app.db.models.withdrawal_request import WithdrawalRequest
+from app.db.models.payout_destination import PayoutDestination
 from app.schemas.withdrawal_request import WithdrawalRequestCreate
+from app.schemas.payout_destination import PayoutDestinationCreate
 from app.services.user_service import UserService
 from app.services.transaction_service import TransactionService
-from app.services.stripe_service import StripeService
+from app.services.stripe_service import StripeService, PayoutOutcomeUnknown
+from app.services.payout_destination_service import PayoutDestinationService
+from app.core.config import settings
+from app.core.resilience import stripe_provider
+from app.db.session import AsyncSessionLocal
 from app.core.security import verify_password
+from app.core.events import publish_event
 from fastapi import HTTPException, status
 import uuid
+import logging
+from datetime import timedelta
 from decimal import Decimal
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Stripe keeps idempotency keys for 24 hours; stop retrying well before that
+IDEMPOTENCY_WINDOW = timedelta(hours=23)
+
+# Requests from before payout destinations carry a plaintext account number, needed
+# only while a payout may still be sent from it: it is cut to the last four digits
+# once the request leaves 'pending_payout' (migration 0007 masked the settled ones)
+_MASKED_ACCOUNT_NUMBER = literal("****") + func.right(WithdrawalRequest.account_number, 4)
+
+# Lease stuck reservations to one recovering worker
+_CLAIM_STUCK_PAYOUTS = text("""
+    WITH stuck AS (
+        SELECT id FROM withdrawal_requests
+        WHERE status = 'pending_payout' AND updated_at < now() - make_interval(secs => :age_seconds)
+        ORDER BY created_at
+        LIMIT :limit
+        FOR UPDATE SKIP LOCKED
+    )
+    UPDATE withdrawal_requests SET updated_at = now()
+    FROM stuck
+    WHERE withdrawal_requests.id = stuck.id
+    RETURNING withdrawal_requests.id
+""")
 
 
 class WithdrawalService:
@@ -63,8 +98,14 @@ class WithdrawalService:
         user_id: uuid.UUID
     ) -> WithdrawalRequest:
         """
-        Create a withdrawal request with full validation and Stripe integration.
-        This is the main withdrawal workflow.
+        Create a withdrawal request and pay it out without holding a database
+        connection across the Stripe calls:
+        1. reserve: debit the balance and insert the request as 'pending_payout' (short transaction)
+        2. pay out to the saved destination, with an idempotency key derived from the request id (no connection held)
+        3. finalize to 'processing', or compensate on a Stripe rejection (short transaction)
+        If Stripe cannot confirm the payout, the request stays 'pending_payout' and
+        recover_pending_payouts() retries it with the same idempotency keys.
+        Inline bank details are saved as a payout destination first (tokenized once per account).
         """
         amount_decimal = Decimal(withdrawal_data.amount)
         
@@ -72,96 +113,271 @@ class WithdrawalService:
         user = await WithdrawalService.validate_withdrawal_request(
             db, user_id, float(amount_decimal), withdrawal_data.pin
         )
+        username = user.username
+        # Answer 503 now rather than reserving funds for a payout that cannot be sent
+        stripe_provider.ensure_available()
         
-        # Start database transaction
-        async with db.begin():
-            try:
-                # 1. Create withdrawal transaction (negative amount)
-                transaction = await TransactionService.create_withdrawal_transaction(
-                    db, user_id, float(amount_decimal)
-                )
-                
-                # 2. Immediately deduct from user balance
-                await UserService.update_balance(db, user_id, -float(amount_decimal))
-                
-                # 3. Create bank account token with Stripe
+        if withdrawal_data.payout_destination_id:
+            destination = await PayoutDestinationService.get_active(
+                db, user_id, withdrawal_data.payout_destination_id
+            )
+        else:
+            destination = await PayoutDestinationService.get_or_create(db, user_id, PayoutDestinationCreate(
+                bank_name=withdrawal_data.bank_name,
+                account_number=withdrawal_data.account_number,
+                account_name=withdrawal_data.account_name
+            ))
+        bank_account_id = destination.stripe_bank_account_id
+        
+        withdrawal = await WithdrawalService._reserve(db, user_id, amount_decimal, destination.id)
+        try:
+            await WithdrawalService._pay_out(db, withdrawal, username, bank_account_id)
+        except PayoutOutcomeUnknown:
+            # Accepted but unconfirmed: the response shows 'pending_payout'
+            logger.warning("Payout for withdrawal %s not confirmed, left for recovery", withdrawal.id)
+        return withdrawal
+
+    @staticmethod
+    async def _reserve(
+        db: AsyncSession,
+        user_id: uuid.UUID,
+        amount: Decimal,
+        payout_destination_id: uuid.UUID
+    ) -> WithdrawalRequest:
+        """Debit the balance and record the request in one short transaction."""
+        transaction = Transaction(
+            id=uuid.uuid4(),
+            user_id=user_id,
+            tx_type="withdrawal",
+            amount=-float(amount),  # Negative amount for withdrawal
+            status="processing",  # Starts as processing, updated by webhook
+            reference="Withdrawal request"
+        )
+        withdrawal = WithdrawalRequest(
+            id=uuid.uuid4(),
+            user_id=user_id,
+            transaction_id=transaction.id,
+            amount=float(amount),
+            status='pending_payout',
+            payout_destination_id=payout_destination_id
+        )
+        
+        # Conditional debit: a concurrent withdrawal that already spent the balance gets a 400
+        await UserService.update_balance(
+            db, user_id, -float(amount), commit=False, pending_withdrawals=float(amount)
+        )
+        db.add_all([transaction, withdrawal])
+        await db.flush()
+        await publish_event(
+            db, "withdrawal.created", user_id,
+            withdrawal_id=withdrawal.id, status=withdrawal.status, amount=float(amount)
+        )
+        # Committing also hands the connection back to the pool before Stripe is called
+        await db.commit()
+        return withdrawal
+
+    @staticmethod
+    async def _pay_out(
+        db: AsyncSession,
+        withdrawal: WithdrawalRequest,
+        username: str,
+        bank_account_id: Optional[str]
+    ) -> None:
+        """
+        Stripe calls for a reserved request, then finalize or compensate.
+        Raises PayoutOutcomeUnknown (request left as is) or the Stripe rejection (after compensating).
+        """
+        try:
+            destination = bank_account_id
+            if destination is None:
+                # Requests from before payout destinations carry inline details to tokenize
                 # Note: For UK banks, we need sort_code + account_number
-                # You might need to adjust this based on your country's banking format
-                bank_token = await StripeService.create_bank_account_token(
-                    account_number=withdrawal_data.account_number,
+                destination = await StripeService.create_bank_account_token(
+                    account_number=withdrawal.account_number,
                     sort_code="000000",  # Placeholder - you'll need to collect sort_code or adjust for your country
-                    account_name=withdrawal_data.account_name
-                )
-                
-                # 4. Create Stripe payout
-                payout_id = await StripeService.create_payout(
-                    amount=int(amount_decimal * 100),  # Convert to pence
-                    bank_token=bank_token,
-                    description=f"Withdrawal for user {user.username}"
+                    account_name=withdrawal.account_name,
+                    idempotency_key=f"withdrawal-{withdrawal.id}-token"
                 )
-                
-                # 5. Create withdrawal request record
-                db_withdrawal = WithdrawalRequest(
-                    user_id=user_id,
-                    transaction_id=transaction.id,
-                    amount=float(amount_decimal),
-                    bank_name=withdrawal_data.bank_name,
-                    account_number=withdrawal_data.account_number,
-                    account_name=withdrawal_data.account_name,
-                    stripe_payout_id=payout_id
-                )
-                
-                db.add(db_withdrawal)
-                await db.commit()
-                await db.refresh(db_withdrawal)
-                await db.refresh(transaction)
-                
-                return db_withdrawal
-                
-            except Exception as e:
-                await db.rollback()
-                # Re-raise the exception to be handled by the API layer
-                raise e
+            payout_id = await StripeService.create_payout(
+                amount=int(Decimal(str(withdrawal.amount)) * 100),  # Convert to pence
+                bank_token=destination,
+                description=f"Withdrawal for user {username}",
+                idempotency_key=f"withdrawal-{withdrawal.id}-payout",
+                metadata={"withdrawal_id": str(withdrawal.id)}
+            )
+        except PayoutOutcomeUnknown:
+            raise
+        except HTTPException:
+            # Stripe rejected the request outright, so no payout exists: release the reservation
+            await WithdrawalService._compensate(db, withdrawal.id)
+            raise
+        
+        await WithdrawalService._finalize(db, withdrawal.id, payout_id)
 
     @staticmethod
-    async def handle_successful_payout(db: AsyncSession, payout_id: str) -> None:
-        """Update records when a payout is successful."""
-        async with db.begin():
-            # Find the withdrawal request
-            result = await db.execute(
-                select(WithdrawalRequest).where(WithdrawalRequest.stripe_payout_id == payout_id)
-            )
-            withdrawal_request = result.scalar_one_or_none()
-            
-            if withdrawal_request:
-                withdrawal_request.status = 'paid'
-                # Update the associated transaction status
-                await TransactionService.update_status(
-                    db, withdrawal_request.transaction_id, 'completed'
+    async def _finalize(db: AsyncSession, withdrawal_id: uuid.UUID, payout_id: str) -> None:
+        # Guarded on 'pending_payout' so a webhook that got there first is not overwritten
+        result = await db.execute(
+            update(WithdrawalRequest)
+            .where(WithdrawalRequest.id == withdrawal_id, WithdrawalRequest.status == 'pending_payout')
+            .values(status='processing', stripe_payout_id=payout_id, account_number=_MASKED_ACCOUNT_NUMBER)
+            .returning(WithdrawalRequest)
+            .execution_options(synchronize_session=False, populate_existing=True)
+        )
+        withdrawal = result.scalar_one_or_none()
+        if withdrawal:
+            await publish_event(
+                db, "withdrawal.updated", withdrawal.user_id,
+                withdrawal_id=withdrawal.id, status=withdrawal.status
+            )
+        await db.commit()
+
+    @staticmethod
+    async def _compensate(db: AsyncSession, withdrawal_id: uuid.UUID) -> None:
+        """Fail a reserved request and refund its amount."""
+        result = await db.execute(
+            update(WithdrawalRequest)
+            .where(WithdrawalRequest.id == withdrawal_id, WithdrawalRequest.status == 'pending_payout')
+            .values(status='failed', account_number=_MASKED_ACCOUNT_NUMBER)
+            .returning(WithdrawalRequest)
+            .execution_options(synchronize_session=False, populate_existing=True)
+        )
+        withdrawal = result.scalar_one_or_none()
+        if withdrawal:
+            await db.execute(
+                update(Transaction)
+                .where(Transaction.id == withdrawal.transaction_id)
+                .values(status='failed')
+                .execution_options(synchronize_session=False)
+            )
+            await UserService.update_balance(
+                db, withdrawal.user_id, withdrawal.amount, commit=False,
+                pending_withdrawals=-withdrawal.amount
+            )
+            await publish_event(
+                db, "withdrawal.updated", withdrawal.user_id,
+                withdrawal_id=withdrawal.id, status='failed'
+            )
+        await db.commit()
+
+    @staticmethod
+    async def recover_pending_payouts(db: AsyncSession) -> int:
+        """
+        Retry requests left in 'pending_payout' by a crash or an unconfirmed Stripe call.
+        Rows are leased by bumping updated_at, so several workers never retry the same one.
+        Returns the number of requests processed.
+        """
+        result = await db.execute(_CLAIM_STUCK_PAYOUTS, {
+            "age_seconds": settings.WITHDRAWAL_RECOVERY_AGE_SECONDS,
+            "limit": settings.WITHDRAWAL_RECOVERY_BATCH,
+        })
+        claimed = result.scalars().all()
+        if not claimed:
+            await db.commit()
+            return 0
+        
+        rows = (await db.execute(
+            select(WithdrawalRequest, User.username, PayoutDestination.stripe_bank_account_id)
+            .join(User, User.id == WithdrawalRequest.user_id)
+            .outerjoin(PayoutDestination, PayoutDestination.id == WithdrawalRequest.payout_destination_id)
+            .where(WithdrawalRequest.id.in_(claimed))
+        )).all()
+        now = (await db.execute(select(func.now()))).scalar()
+        await db.commit()
+        
+        for withdrawal, username, bank_account_id in rows:
+            if now - withdrawal.created_at > IDEMPOTENCY_WINDOW:
+                # Stripe forgets idempotency keys after 24h: a retry could pay twice
+                await db.execute(
+                    update(WithdrawalRequest)
+                    .where(WithdrawalRequest.id == withdrawal.id, WithdrawalRequest.status == 'pending_payout')
+                    .values(status='requires_action', account_number=_MASKED_ACCOUNT_NUMBER)
+                    .execution_options(synchronize_session=False)
                 )
                 await db.commit()
+                logger.error("Withdrawal %s unconfirmed past the idempotency window; needs manual review", withdrawal.id)
+                continue
+            try:
+                await WithdrawalService._pay_out(db, withdrawal, username, bank_account_id)
+            except PayoutOutcomeUnknown:
+                logger.warning("Payout for withdrawal %s still unconfirmed", withdrawal.id)
+            except HTTPException as e:
+                logger.warning("Payout for withdrawal %s rejected by Stripe and refunded: %s", withdrawal.id, e.detail)
+        return len(rows)
+
+    @staticmethod
+    def _payout_lookup(payout_id: str, withdrawal_id: Optional[str]):
+        """
+        Match on the payout id, or on the withdrawal id from the payout metadata
+        when the webhook beats the finalize step that stores the payout id.
+        """
+        condition = WithdrawalRequest.stripe_payout_id == payout_id
+        try:
+            if withdrawal_id:
+                condition = or_(condition, WithdrawalRequest.id == uuid.UUID(withdrawal_id))
+        except ValueError:
+            pass
+        return select(WithdrawalRequest).where(condition)
 
     @staticmethod
-    async def handle_failed_payout(db: AsyncSession, payout_id: str) -> None:
-        """Handle failed payout by refunding user balance and updating records."""
-        async with db.begin():
-            # Find the withdrawal request
-            result = await db.execute(
-                select(WithdrawalRequest).where(WithdrawalRequest.stripe_payout_id == payout_id)
-            )
-            withdrawal_request = result.scalar_one_or_none()
+    async def handle_successful_payout(db: AsyncSession, payout_id: str, withdrawal_id: Optional[str] = None) -> None:
+        """Update records when a payout is successful, in one transaction."""
+        # Locked, so a redelivered webhook waits and then sees 'paid'
+        result = await db.execute(WithdrawalService._payout_lookup(payout_id, withdrawal_id).with_for_update())
+        withdrawal_request = result.scalar_one_or_none()
+        
+        if withdrawal_request and withdrawal_request.status != 'paid':
+            withdrawal_request.status = 'paid'
+            withdrawal_request.stripe_payout_id = payout_id
+            # Move the amount from pending to withdrawn (skipped on webhook redelivery)
+            await UserService.increment_counters(
+                db, withdrawal_request.user_id,
+                pending_withdrawals=-withdrawal_request.amount,
+                total_withdrawn=withdrawal_request.amount
+            )
+            await publish_event(
+                db, "withdrawal.updated", withdrawal_request.user_id,
+                withdrawal_id=withdrawal_request.id, status='paid'
+            )
+            # Update the associated transaction status
+            await TransactionService.update_status(
+                db, withdrawal_request.transaction_id, 'completed', commit=False
+            )
+        await db.commit()
+
+    @staticmethod
+    async def handle_failed_payout(db: AsyncSession, payout_id: str, withdrawal_id: Optional[str] = None) -> None:
+        """Handle failed payout by refunding user balance and updating records, in one transaction."""
+        # Locked, so a redelivered webhook waits and then sees 'failed' (one refund)
+        result = await db.execute(WithdrawalService._payout_lookup(payout_id, withdrawal_id).with_for_update())
+        withdrawal_request = result.scalar_one_or_none()
+        
+        if withdrawal_request and withdrawal_request.status != 'failed':
+            # A payout can fail after it was reported paid; undo whichever counter holds it
+            released = 'total_withdrawn' if withdrawal_request.status == 'paid' else 'pending_withdrawals'
+            withdrawal_request.status = 'failed'
+            withdrawal_request.stripe_payout_id = payout_id
+            await publish_event(
+                db, "withdrawal.updated", withdrawal_request.user_id,
+                withdrawal_id=withdrawal_request.id, status='failed'
+            )
             
-            if withdrawal_request:
-                withdrawal_request.status = 'failed'
-                
-                # Update transaction status
-                await TransactionService.update_status(
-                    db, withdrawal_request.transaction_id, 'failed'
-                )
-                
-                # Refund the amount to user's balance
-                await UserService.update_balance(
-                    db, withdrawal_request.user_id, withdrawal_request.amount
-                )
-                
-                await db.commit()
\ No newline at end of file
+            # Update transaction status
+            await TransactionService.update_status(
+                db, withdrawal_request.transaction_id, 'failed', commit=False
+            )
+            
+            # Refund the amount to user's balance
+            await UserService.update_balance(
+                db, withdrawal_request.user_id, withdrawal_request.amount, commit=False,
+                **{released: -withdrawal_request.amount}
+            )
+        await db.commit()
+
+
+async def recover_pending_payouts() -> None:
+    """Periodic job entry point (see app/main.py)."""
+    async with AsyncSessionLocal() as session:
+        recovered = await WithdrawalService.recover_pending_payouts(session)
+    if recovered:
+        logger.info("Retried %d pending payout(s)", recovered)
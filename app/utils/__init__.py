@@ -1,5 +1,5 @@
 # app/utils/__init__.py
 # This file makes the 'utils' directory a Python package
-from app.utils.supabase_storage import upload_file_to_supabase, delete_file_from_supabase, generate_signed_url
+from app.utils.supabase_storage import upload_file_to_supabase, delete_file_from_supabase, generate_signed_url, generate_signed_urls, get_supabase
 
-__all__ = ["upload_file_to_supabase", "delete_file_from_supabase", "generate_signed_url"]
+__all__ = ["upload_file_to_supabase", "delete_file_from_supabase", "generate_signed_url", "generate_signed_urls", "get_supabase"]
@@ -1,14 +1,34 @@
 # app/utils/supabase_storage.py
+import logging
 import os
-from typing import Optional, BinaryIO
-from supabase import create_client, Client
+from typing import Optional, BinaryIO, Any, Dict, List
 from app.core.config import settings
+from app.core.resilience import storage_provider
 import uuid
 from fastapi import UploadFile, HTTPException, status
 
+logger = logging.getLogger(__name__)
+
+
+# The Supabase client is created on first use (or by the app lifespan) rather than at import
+_supabase: Optional[Any] = None
+
+
+def get_supabase() -> Any:
+    """Return the shared Supabase client, creating it on first use."""
+    global _supabase
+    if _supabase is None:
+        from supabase import create_client
+
+        _supabase = create_client(str(settings.SUPABASE_URL), settings.SUPABASE_KEY)
+    return _supabase
+
+
+def set_supabase_client(client: Any) -> None:
+    """Replace the Supabase client, e.g. with the in-process stand-in used by benchmarks."""
+    global _supabase
+    _supabase = client
 
-# Initialize the Supabase client
-supabase: Client = create_client(settings.SUPABASE_URL, settings.SUPABASE_KEY)
 
 # Constants for the storage bucket
 KYC_BUCKET_NAME = "kyc-documents"  # You'll need to create this bucket in Supabase Storage
@@ -42,18 +62,21 @@ async def upload_file_to_supabase(
         # Read file content
         content = await file.read()
         
-        # Upload to Supabase Storage
-        response = supabase.storage.from_(KYC_BUCKET_NAME).upload(
+        # Upload to Supabase Storage (not retried: a repeat upload to the same path conflicts)
+        response = await storage_provider.call(
+            get_supabase().storage.from_(KYC_BUCKET_NAME).upload,
             path=unique_filename,
             file=content,
             file_options={"content-type": file.content_type}
         )
         
         # Get public URL
-        url_response = supabase.storage.from_(KYC_BUCKET_NAME).get_public_url(unique_filename)
+        url_response = get_supabase().storage.from_(KYC_BUCKET_NAME).get_public_url(unique_filename)
         
         return url_response
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -81,16 +104,56 @@ async def delete_file_from_supabase(file_url: str) -> bool:
         file_path = parts[1]
         
         # Delete the file
-        supabase.storage.from_(KYC_BUCKET_NAME).remove([file_path])
+        await storage_provider.call(
+            get_supabase().storage.from_(KYC_BUCKET_NAME).remove, [file_path], idempotent=True
+        )
         
         return True
         
     except Exception as e:
         # Log the error but don't raise exception as this might be called in cleanup
-        print(f"Error deleting file from Supabase Storage: {str(e)}")
+        logger.warning("Error deleting file from Supabase Storage: %s", e)
         return False
 
 
+def _storage_path(file_url: str) -> Optional[str]:
+    """Object path inside the KYC bucket for a public URL, or None if it is not one."""
+    parts = file_url.split(f"/object/public/{KYC_BUCKET_NAME}/")
+    if len(parts) != 2:
+        return None
+    return parts[1]
+
+
+async def generate_signed_urls(file_urls: List[str], expires_in: int = 3600) -> Dict[str, Optional[str]]:
+    """
+    Signed URLs for many files with a single storage API call.
+    
+    Args:
+        file_urls: Public URLs of the files
+        expires_in: URL expiration time in seconds (default: 1 hour)
+    
+    Returns:
+        Dict[str, Optional[str]]: Signed URL per public URL (None where signing failed)
+    """
+    paths = {file_url: _storage_path(file_url) for file_url in file_urls}
+    wanted = sorted({path for path in paths.values() if path})
+    if not wanted:
+        return {file_url: None for file_url in file_urls}
+
+    try:
+        # The storage client is synchronous; the call runs on the storage provider's threads
+        signed = await storage_provider.call(
+            get_supabase().storage.from_(KYC_BUCKET_NAME).create_signed_urls, wanted, expires_in,
+            idempotent=True
+        )
+    except Exception as e:
+        logger.warning("Error generating signed URLs for %d file(s): %s", len(wanted), e)
+        return {file_url: None for file_url in file_urls}
+
+    by_path = {item.get("path"): item.get("signedURL") for item in signed if not item.get("error")}
+    return {file_url: by_path.get(path) for file_url, path in paths.items()}
+
+
 async def generate_signed_url(file_url: str, expires_in: int = 3600) -> Optional[str]:
     """
     Generates a signed URL for temporary access to a private file.
@@ -111,12 +174,13 @@ async def generate_signed_url(file_url: str, expires_in: int = 3600) -> Optional
         file_path = parts[1]
         
         # Generate signed URL
-        signed_url = supabase.storage.from_(KYC_BUCKET_NAME).create_signed_url(
-            file_path, expires_in=expires_in
+        signed_url = await storage_provider.call(
+            get_supabase().storage.from_(KYC_BUCKET_NAME).create_signed_url,
+            file_path, expires_in=expires_in, idempotent=True
         )
         
         return signed_url
         
     except Exception as e:
-        print(f"Error generating signed URL: {str(e)}")
+        logger.warning("Error generating signed URL: %s", e)
         return None
\ No newline at end of file
@@ -0,0 +1,3 @@
+# benchmarks/__init__.py
+# Benchmark and load-testing scripts. They run against a disposable local database
+# with Stripe and Supabase replaced by the fakes in benchmarks/fakes.py.
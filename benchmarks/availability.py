@@ -0,0 +1,48 @@
+# benchmarks/availability.py
+"""
+Cost of the availability filter in app/core/bloom.py: build throughput for a
+given number of users, per-lookup CPU time, memory, and the measured
+false-positive rate (the share of never-added values that would still go to
+the database).
+
+    python -m benchmarks.availability [--users 1000000 --probes 200000]
+
+No database is used; run the endpoint scenario against a real one to see the
+queries it saves.
+"""
+import argparse
+import json
+import time
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--probes", type=int, default=200_000)
+    parser.add_argument("--false-positive-rate", type=float, default=0.01)
+    args = parser.parse_args(argv)
+
+    from app.core.bloom import BloomFilter
+
+    bloom = BloomFilter(args.users * 2, args.false_positive_rate)
+    started = time.process_time()
+    for i in range(args.users):
+        bloom.add(f"u:user{i}")
+        bloom.add(f"e:user{i}@example.com")
+    build_s = time.process_time() - started
+
+    started = time.process_time()
+    false_positives = sum(f"u:typing{i}" in bloom for i in range(args.probes))
+    lookup_us = (time.process_time() - started) / args.probes * 1_000_000
+
+    print(json.dumps({
+        "filter": bloom.snapshot(),
+        "build_seconds": round(build_s, 2),
+        "lookup_cpu_us": round(lookup_us, 2),
+        "false_positive_rate": round(false_positives / args.probes, 4),
+        "probes": args.probes,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
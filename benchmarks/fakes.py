@@ -0,0 +1,174 @@
+# benchmarks/fakes.py
+# In-process stand-ins for the Stripe SDK and the Supabase storage client.
+# They mimic the small surface the services use, with configurable latency and
+# error injection, so the API can be exercised without any external calls.
+import json
+import random
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+import httpx
+import stripe as stripe_sdk
+
+
+@dataclass
+class FaultConfig:
+    """Latency and error injection applied to every fake provider call."""
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0
+
+    def apply(self, error_factory) -> None:
+        delay = self.latency_ms + random.uniform(0, self.jitter_ms)
+        if delay > 0:
+            # The real SDKs are synchronous, so the stand-ins block the same way.
+            time.sleep(delay / 1000)
+        if self.error_rate and random.random() < self.error_rate:
+            raise error_factory()
+
+
+class _Obj(dict):
+    """Dict with attribute access, like stripe.StripeObject."""
+    __getattr__ = dict.__getitem__
+
+
+class FakeStripe:
+    """Drop-in for the `stripe` module as used by StripeService."""
+    error = stripe_sdk.error
+
+    def __init__(self, faults: Optional[FaultConfig] = None):
+        self.faults = faults or FaultConfig()
+        self.calls: Dict[str, int] = {}
+        self.payment_intents: Dict[str, _Obj] = {}
+        self.idempotent: Dict[str, _Obj] = {}
+        fake = self
+
+        def _replay(kwargs: Dict[str, Any], create) -> _Obj:
+            # Like Stripe, a repeated idempotency key returns the first result
+            key = kwargs.get("idempotency_key")
+            if key is None:
+                return create()
+            if key not in fake.idempotent:
+                fake.idempotent[key] = create()
+            return fake.idempotent[key]
+
+        def _call(name: str) -> None:
+            fake.calls[name] = fake.calls.get(name, 0) + 1
+            fake.faults.apply(lambda: stripe_sdk.error.APIConnectionError(f"Injected failure in {name}"))
+
+        class PaymentIntent:
+            @staticmethod
+            def create(amount: int, currency: str, **kwargs) -> _Obj:
+                _call("PaymentIntent.create")
+                pi_id = f"pi_{uuid.uuid4().hex[:24]}"
+                intent = _Obj(
+                    id=pi_id, amount=amount, currency=currency, status="succeeded",
+                    client_secret=f"{pi_id}_secret_{uuid.uuid4().hex[:8]}",
+                    metadata=kwargs.get("metadata", {})
+                )
+                fake.payment_intents[pi_id] = intent
+                return intent
+
+            @staticmethod
+            def retrieve(payment_intent_id: str, **kwargs) -> _Obj:
+                _call("PaymentIntent.retrieve")
+                intent = fake.payment_intents.get(payment_intent_id)
+                if intent is None:
+                    # Unknown ids behave like intents paid outside this process
+                    intent = _Obj(id=payment_intent_id, amount=5000, currency="gbp", status="succeeded")
+                return intent
+
+        class Token:
+            @staticmethod
+            def create(bank_account: Dict[str, Any], **kwargs) -> _Obj:
+                _call("Token.create")
+                return _replay(kwargs, lambda: _Obj(
+                    id=f"btok_{uuid.uuid4().hex[:24]}",
+                    bank_account=_Obj(id=f"ba_{uuid.uuid4().hex[:24]}", last4=bank_account["account_number"][-4:])
+                ))
+
+        class Payout:
+            @staticmethod
+            def create(amount: int, currency: str, destination: str, **kwargs) -> _Obj:
+                _call("Payout.create")
+                return _replay(kwargs, lambda: _Obj(
+                    id=f"po_{uuid.uuid4().hex[:24]}", amount=amount, currency=currency, status="pending",
+                    metadata=kwargs.get("metadata", {})
+                ))
+
+        class Webhook:
+            @staticmethod
+            def construct_event(payload: bytes, sig_header: str, secret: str) -> Dict[str, Any]:
+                _call("Webhook.construct_event")
+                return json.loads(payload)
+
+        self.PaymentIntent = PaymentIntent
+        self.Token = Token
+        self.Payout = Payout
+        self.Webhook = Webhook
+
+
+class _FakeBucket:
+    def __init__(self, storage: "FakeSupabase", name: str):
+        self.storage = storage
+        self.name = name
+
+    def upload(self, path: str, file: bytes, file_options: Optional[dict] = None) -> dict:
+        self.storage._call("upload")
+        self.storage.objects[(self.name, path)] = file
+        return {"Key": f"{self.name}/{path}"}
+
+    def get_public_url(self, path: str) -> str:
+        return f"http://storage.local/storage/v1/object/public/{self.name}/{path}"
+
+    def remove(self, paths: list) -> list:
+        self.storage._call("remove")
+        for path in paths:
+            self.storage.objects.pop((self.name, path), None)
+        return paths
+
+    def create_signed_url(self, path: str, expires_in: int) -> dict:
+        self.storage._call("create_signed_url")
+        return {"signedURL": f"http://storage.local/storage/v1/object/sign/{self.name}/{path}?token=fake"}
+
+    def create_signed_urls(self, paths: list, expires_in: int) -> list:
+        self.storage._call("create_signed_urls")
+        return [
+            {"path": path, "error": None,
+             "signedURL": f"http://storage.local/storage/v1/object/sign/{self.name}/{path}?token=fake"}
+            for path in paths
+        ]
+
+
+class FakeSupabase:
+    """Drop-in for the Supabase client as used by app.utils.supabase_storage."""
+
+    def __init__(self, faults: Optional[FaultConfig] = None):
+        self.faults = faults or FaultConfig()
+        self.calls: Dict[str, int] = {}
+        self.objects: Dict[tuple, bytes] = {}
+        self.storage = self
+
+    def _call(self, name: str) -> None:
+        self.calls[name] = self.calls.get(name, 0) + 1
+        self.faults.apply(lambda: httpx.ConnectError(f"Injected storage failure in {name}"))
+
+    def from_(self, bucket: str) -> _FakeBucket:
+        return _FakeBucket(self, bucket)
+
+
+def install_fakes(
+    stripe_faults: Optional[FaultConfig] = None,
+    storage_faults: Optional[FaultConfig] = None
+) -> tuple[FakeStripe, FakeSupabase]:
+    """Swap the provider clients used by the app for in-process fakes."""
+    from app.core.stripe_client import set_stripe_client
+    from app.utils.supabase_storage import set_supabase_client
+
+    fake_stripe = FakeStripe(stripe_faults)
+    fake_supabase = FakeSupabase(storage_faults)
+    set_stripe_client(fake_stripe)
+    set_supabase_client(fake_supabase)
+    return fake_stripe, fake_supabase
@@ -0,0 +1,160 @@
+# benchmarks/harness.py
+# Shared plumbing for the benchmark scripts: pointing the app at a benchmark
+# database, booting the ASGI app in-process and summarising latencies.
+import asyncio
+import json
+import math
+import os
+import secrets
+import statistics
+import subprocess
+import sys
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+
+def configure_database(database_url: str) -> None:
+    """Point the app at the benchmark database. Must run before any `app` import."""
+    if "app.core.config" in sys.modules:
+        raise RuntimeError("configure_database() must be called before importing the app")
+    os.environ["DATABASE_URL"] = database_url
+    if "PAYOUT_ENCRYPTION_KEY" not in os.environ:
+        from cryptography.fernet import Fernet
+        # Withdrawals save bank details as encrypted payout destinations
+        os.environ["PAYOUT_ENCRYPTION_KEY"] = Fernet.generate_key().decode()
+    os.environ.setdefault("PAYOUT_FINGERPRINT_KEY", secrets.token_urlsafe(32))
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    # Nearest-rank percentile
+    index = min(len(sorted_values) - 1, max(0, math.ceil(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+@dataclass
+class ScenarioResult:
+    name: str
+    latencies_ms: List[float] = field(default_factory=list)
+    errors: int = 0
+    duration_s: float = 0.0
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+    def summary(self) -> Dict[str, Any]:
+        values = sorted(self.latencies_ms)
+        ops = len(values) + self.errors
+        return {
+            "ops": ops,
+            "errors": self.errors,
+            "duration_s": round(self.duration_s, 3),
+            "throughput_rps": round(ops / self.duration_s, 2) if self.duration_s else 0.0,
+            "mean_ms": round(statistics.fmean(values), 2) if values else 0.0,
+            "p50_ms": round(percentile(values, 50), 2),
+            "p95_ms": round(percentile(values, 95), 2),
+            "p99_ms": round(percentile(values, 99), 2),
+            **self.extra,
+        }
+
+
+async def drive(
+    name: str,
+    operations: List[Callable[[], Awaitable[bool]]],
+    concurrency: int
+) -> ScenarioResult:
+    """
+    Run the operations with bounded concurrency. Each operation returns True on
+    success; exceptions and False count as errors.
+    """
+    result = ScenarioResult(name)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run_one(operation) -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                ok = await operation()
+            except Exception:
+                ok = False
+            if ok:
+                result.latencies_ms.append((time.perf_counter() - started) * 1000)
+            else:
+                result.errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(run_one(op) for op in operations))
+    result.duration_s = time.perf_counter() - started
+    return result
+
+
+@asynccontextmanager
+async def running_app() -> AsyncIterator[Any]:
+    """Run the app's lifespan and yield an httpx client bound to it in-process."""
+    import httpx
+    from app.main import app
+
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(app=app, base_url="http://bench") as client:
+            yield client
+
+
+async def reset_schema(bind=None) -> None:
+    """Create all tables on the benchmark database (or the `bind` engine) and empty them."""
+    from sqlalchemy import text
+    from app.db.base_class import Base
+    from app.db.session import engine
+    import app.db.base  # noqa: F401 - registers every model on Base.metadata
+    import app.core.events  # noqa: F401 - registers the app_event_ids sequence
+
+    from app.db.partitions import ensure_transaction_partitions
+
+    async with (bind or engine).begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await ensure_transaction_partitions(conn)
+        tables = ", ".join(table.name for table in Base.metadata.sorted_tables)
+        await conn.execute(text(f"TRUNCATE {tables} CASCADE"))
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def write_report(path: Optional[str], params: Dict[str, Any], results: List[ScenarioResult]) -> Dict[str, Any]:
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "git_revision": git_revision(),
+            "params": params,
+        },
+        "scenarios": {result.name: result.summary() for result in results},
+    }
+    text = json.dumps(report, indent=2)
+    if path:
+        with open(path, "w") as fh:
+            fh.write(text)
+    print(text)
+    return report
+
+
+def compare_reports(baseline_path: str, report: Dict[str, Any]) -> None:
+    """Print per-scenario p50/p95/p99 and throughput changes against a previous run."""
+    with open(baseline_path) as fh:
+        baseline = json.load(fh)
+    for name, current in report["scenarios"].items():
+        previous = baseline.get("scenarios", {}).get(name)
+        if not previous:
+            continue
+        changes = []
+        for key in ("throughput_rps", "p50_ms", "p95_ms", "p99_ms"):
+            before, after = previous.get(key) or 0, current.get(key) or 0
+            delta = ((after - before) / before * 100) if before else 0.0
+            changes.append(f"{key} {before} -> {after} ({delta:+.1f}%)")
+        print(f"{name}: " + ", ".join(changes))
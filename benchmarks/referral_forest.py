@@ -0,0 +1,412 @@
+# benchmarks/referral_forest.py
+"""
+Seed a capacity-test database with a synthetic referral forest and its ledger.
+
+    python -m benchmarks.referral_forest --database-url postgresql+asyncpg://postgres@localhost/optivus_bench \\
+        --users 10000000 [--seed 42 --days 730 --organic-share 0.1 --super-referrers 20 ...]
+    python -m benchmarks.referral_forest --users 1000000 --dry-run   # generate and encode only, no database
+
+Users sign up in index order over --days, so every referrer precedes its referrals.
+Each new user is one of:
+  organic        - no referrer (--organic-share)
+  super          - referred by one of --super-referrers hot accounts (--super-share)
+  chain          - referred by the user who signed up just before (--chain-share), which
+                   grows chains well past the commission levels
+  power-law      - otherwise, referred by an earlier user picked in proportion to a
+                   Pareto(--fanout-alpha) activity weight, so fan-out is heavy-tailed
+The commission ledger is the same replay CommissionAuditService uses (one completed
+transaction per ancestor level), withdrawals and KYC requests are drawn on top, and
+every counter on users is derived from those rows, so the audit and
+`repair_user_counters --dry-run` both come back clean.
+
+All rows are loaded with COPY in --batch-size chunks streamed from NumPy arrays.
+Memory is about 150 bytes per user. The benchmark database is TRUNCATED, so never
+point it at real data. Run app.commands.backfill_rollups afterwards for the dashboard.
+"""
+import argparse
+import asyncio
+import json
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import AsyncIterator, Callable, Dict, Iterator, List
+
+import numpy as np
+
+from benchmarks.harness import configure_database
+
+PASSWORD = "Synthetic-Pa55"
+# Odd 64-bit multiplier: i -> i * K mod 2**64 is a bijection, so ids are unique
+# but spread over the key space like random UUIDs
+_SCRAMBLE = np.uint64(0x9E3779B97F4A7C15)
+_TAGS = {"users": 1, "withdrawal_requests": 2, "kyc_requests": 3, "withdrawal_tx": 4, "commission_tx": 16}
+
+WITHDRAWAL_STATUSES = ["paid", "processing", "failed", "pending_payout", "requires_action"]
+WITHDRAWAL_STATUS_WEIGHTS = [0.80, 0.08, 0.07, 0.03, 0.02]
+# Status of the withdrawal's ledger row (see WithdrawalService)
+WITHDRAWAL_TX_STATUS = {"paid": "completed", "failed": "failed"}
+KYC_STATUSES = ["approved", "pending", "rejected"]
+KYC_STATUS_WEIGHTS = [0.70, 0.20, 0.10]
+
+
+@dataclass
+class Forest:
+    parent: np.ndarray      # referrer index per user, -1 for none
+    signup_us: np.ndarray   # signup time, microseconds since the epoch, increasing
+    depth: np.ndarray       # referral depth, 0 for users without a referrer
+
+
+def generate_parents(args, rng: np.random.Generator) -> np.ndarray:
+    n = args.users
+    index = np.arange(n, dtype=np.int64)
+
+    weights = rng.pareto(args.fanout_alpha, n) + 1.0
+    cumulative = np.cumsum(weights)
+    # Earlier users only: the target lies below the cumulative weight of users 0..i-1
+    targets = rng.random(n) * np.concatenate(([0.0], cumulative[:-1]))
+    parent = np.minimum(np.searchsorted(cumulative, targets, side="right"), index - 1)
+
+    supers = rng.choice(max(args.super_referrers, n // 1000), size=min(args.super_referrers, n), replace=False)
+    kind = rng.random(n)
+    organic = kind < args.organic_share
+    to_super = (kind >= args.organic_share) & (kind < args.organic_share + args.super_share)
+    chained = (kind >= args.organic_share + args.super_share) & (
+        kind < args.organic_share + args.super_share + args.chain_share
+    )
+    parent[to_super] = supers[rng.integers(0, len(supers), int(to_super.sum()))]
+    parent[chained] = index[chained] - 1
+    parent[organic] = -1
+    # A super referrer can only refer users who sign up after it
+    parent = np.where(parent < index, parent, -1)
+    parent[0] = -1
+    return parent
+
+
+def referral_depths(parent: np.ndarray) -> np.ndarray:
+    """Depth of every user by pointer jumping: log2(max depth) vectorized passes."""
+    depth = (parent >= 0).astype(np.int64)
+    ancestor = parent.copy()
+    active = np.flatnonzero(ancestor >= 0)
+    while len(active):
+        hop = ancestor[active]
+        depth[active] += depth[hop]
+        ancestor[active] = ancestor[hop]
+        active = active[ancestor[active] >= 0]
+    return depth
+
+
+def downline_counts(parent: np.ndarray, depth: np.ndarray) -> np.ndarray:
+    """Descendants of every user, accumulated one depth level at a time from the deepest."""
+    n = len(parent)
+    downline = np.zeros(n, dtype=np.int64)
+    order = np.argsort(depth, kind="stable")
+    boundaries = np.searchsorted(depth[order], np.arange(depth.max() + 2))
+    for level in range(int(depth.max()), 0, -1):
+        nodes = order[boundaries[level]:boundaries[level + 1]]
+        np.add.at(downline, parent[nodes], downline[nodes] + 1)
+    return downline
+
+
+def generate_forest(args, rng: np.random.Generator) -> Forest:
+    n = args.users
+    now_us = int(datetime.now(timezone.utc).timestamp() * 1_000_000)
+    span_us = args.days * 86400 * 1_000_000
+    signup_us = now_us - span_us + np.sort(rng.integers(0, span_us, n))
+    parent = generate_parents(args, rng)
+    return Forest(parent=parent, signup_us=signup_us, depth=referral_depths(parent))
+
+
+# --- CSV encoding ---------------------------------------------------------
+
+def uuids(tag: int, index: np.ndarray) -> List[str]:
+    """Scrambled index, then table tag and index: unique per table, unordered like uuid4."""
+    halves = np.empty((len(index), 2), dtype=">u8")
+    halves[:, 0] = index.astype(np.uint64) * _SCRAMBLE
+    halves[:, 1] = (np.uint64(tag) << np.uint64(48)) | index.astype(np.uint64)
+    # Postgres accepts the 32 hex digits without hyphens
+    digits = halves.tobytes().hex()
+    return [digits[start:start + 32] for start in range(0, len(digits), 32)]
+
+
+def timestamps(microseconds: np.ndarray) -> List[str]:
+    return np.datetime_as_string(microseconds.astype("datetime64[us]"), unit="us", timezone="UTC").tolist()
+
+
+def money(pence: np.ndarray) -> List[str]:
+    return [f"{'-' if p < 0 else ''}{abs(p) // 100}.{abs(p) % 100:02d}" for p in pence.tolist()]
+
+
+def csv_rows(columns: List[List[str]]) -> bytes:
+    """Columns of already-quoted-safe strings (no commas, quotes or newlines); '' is NULL."""
+    return ("".join(",".join(row) + "\n" for row in zip(*columns))).encode()
+
+
+def batches(n: int, size: int) -> Iterator[np.ndarray]:
+    for start in range(0, n, size):
+        yield np.arange(start, min(start + size, n), dtype=np.int64)
+
+
+# --- Ledger and tables -------------------------------------------------------
+
+class Dataset:
+    """Every table's rows as arrays, with the user counters derived from them."""
+
+    def __init__(self, args, forest: Forest, rng: np.random.Generator):
+        from app.core.security import get_password_hash
+        from app.services.commission_audit_service import ancestors_by_level, level_amounts_pence
+        from app.services.commission_service import CommissionService
+
+        n = args.users
+        self.args = args
+        self.forest = forest
+        self.password_hash = get_password_hash(PASSWORD)
+        now_us = int(datetime.now(timezone.utc).timestamp() * 1_000_000)
+
+        # Commissions: for every level, (new user, ancestor) pairs, exactly as the audit replays them
+        self.level_amounts = level_amounts_pence(CommissionService.COMMISSION_RATES)
+        self.ancestors = ancestors_by_level(forest.parent, len(self.level_amounts))
+        self.earned = np.zeros(n, dtype=np.int64)
+        for amount, ancestors in zip(self.level_amounts, self.ancestors):
+            valid = ancestors[ancestors >= 0]
+            self.earned += np.bincount(valid, minlength=n)[:n] * amount
+
+        # Withdrawals: one per withdrawing user with at least £10 earned, for part of the balance
+        eligible = np.flatnonzero(self.earned >= 1000)
+        self.withdrawers = eligible[rng.random(len(eligible)) < args.withdrawal_share]
+        self.withdrawal_pence = (
+            self.earned[self.withdrawers] * rng.uniform(0.1, 0.9, len(self.withdrawers))
+        ).astype(np.int64)
+        self.withdrawal_status = rng.choice(
+            len(WITHDRAWAL_STATUSES), len(self.withdrawers), p=WITHDRAWAL_STATUS_WEIGHTS
+        )
+        signed_up = forest.signup_us[self.withdrawers]
+        self.withdrawal_us = signed_up + (rng.random(len(self.withdrawers)) * (now_us - signed_up)).astype(np.int64)
+
+        paid = self.withdrawal_status == WITHDRAWAL_STATUSES.index("paid")
+        failed = self.withdrawal_status == WITHDRAWAL_STATUSES.index("failed")
+        self.withdrawn = np.bincount(self.withdrawers[paid], weights=self.withdrawal_pence[paid], minlength=n)
+        pending = ~paid & ~failed
+        self.pending = np.bincount(self.withdrawers[pending], weights=self.withdrawal_pence[pending], minlength=n)
+        self.withdrawn = self.withdrawn.astype(np.int64)
+        self.pending = self.pending.astype(np.int64)
+        self.balance = self.earned - self.withdrawn - self.pending
+
+        # KYC: submitted shortly after signup; approval verifies the user
+        self.kyc_users = np.flatnonzero(rng.random(n) < args.kyc_share)
+        self.kyc_status = rng.choice(len(KYC_STATUSES), len(self.kyc_users), p=KYC_STATUS_WEIGHTS)
+        self.kyc_us = forest.signup_us[self.kyc_users] + rng.integers(60, 86400, len(self.kyc_users)) * 1_000_000
+        self.verified = np.zeros(n, dtype=bool)
+        self.verified[self.kyc_users[self.kyc_status == KYC_STATUSES.index("approved")]] = True
+
+        self.direct = np.bincount(forest.parent[forest.parent >= 0], minlength=n)
+        self.downline = downline_counts(forest.parent, forest.depth)
+
+        if self.balance.max(initial=0) >= 10 ** 10:
+            raise SystemExit("a balance exceeds Numeric(10, 2): use more --super-referrers or a lower --super-share")
+
+    def user_batches(self) -> Iterator[bytes]:
+        forest = self.forest
+        for index in batches(self.args.users, self.args.batch_size):
+            created = timestamps(forest.signup_us[index])
+            names = [f"synthetic{i}" for i in index.tolist()]
+            parents = forest.parent[index]
+            referrers = uuids(_TAGS["users"], np.maximum(parents, 0))
+            yield csv_rows([
+                uuids(_TAGS["users"], index), created, created,
+                [f"{name}@example.test" for name in names], names,
+                [self.password_hash] * len(index), ["Synthetic"] * len(index), [f"User{i}" for i in index.tolist()],
+                [f"S{i:011X}" for i in index.tolist()],
+                [referrer if p >= 0 else "" for referrer, p in zip(referrers, parents.tolist())],
+                money(self.balance[index]), ["user"] * len(index), ["active"] * len(index), ["active"] * len(index),
+                ["t" if v else "f" for v in self.verified[index].tolist()],
+                money(self.earned[index]), money(self.withdrawn[index]), money(self.pending[index]),
+                self.direct[index].astype(str).tolist(), self.downline[index].astype(str).tolist(),
+            ])
+
+    def commission_batches(self) -> Iterator[bytes]:
+        for level, (amount, ancestors) in enumerate(zip(self.level_amounts, self.ancestors)):
+            amount_text = money(np.array([amount]))[0]
+            for index in batches(self.args.users, self.args.batch_size):
+                index = index[ancestors[index] >= 0]
+                if not len(index):
+                    continue
+                created = timestamps(self.forest.signup_us[index])
+                yield csv_rows([
+                    uuids(_TAGS["commission_tx"] + level, index), created, created,
+                    uuids(_TAGS["users"], ancestors[index]), ["commission"] * len(index),
+                    [f"Commission from Level {level + 1} referral: synthetic{i}" for i in index.tolist()],
+                    [amount_text] * len(index), ["completed"] * len(index),
+                ])
+
+    def withdrawal_transaction_batches(self) -> Iterator[bytes]:
+        for rows in batches(len(self.withdrawers), self.args.batch_size):
+            created = timestamps(self.withdrawal_us[rows])
+            statuses = [WITHDRAWAL_STATUSES[s] for s in self.withdrawal_status[rows].tolist()]
+            yield csv_rows([
+                uuids(_TAGS["withdrawal_tx"], rows), created, created,
+                uuids(_TAGS["users"], self.withdrawers[rows]), ["withdrawal"] * len(rows),
+                ["Withdrawal request"] * len(rows), money(-self.withdrawal_pence[rows]),
+                [WITHDRAWAL_TX_STATUS.get(status, "processing") for status in statuses],
+            ])
+
+    def withdrawal_request_batches(self) -> Iterator[bytes]:
+        for rows in batches(len(self.withdrawers), self.args.batch_size):
+            created = timestamps(self.withdrawal_us[rows])
+            statuses = [WITHDRAWAL_STATUSES[s] for s in self.withdrawal_status[rows].tolist()]
+            yield csv_rows([
+                uuids(_TAGS["withdrawal_requests"], rows), created, created,
+                uuids(_TAGS["users"], self.withdrawers[rows]), uuids(_TAGS["withdrawal_tx"], rows),
+                money(self.withdrawal_pence[rows]), statuses,
+                ["Synthetic Bank"] * len(rows), ["00012345"] * len(rows),
+                [f"synthetic{i}" for i in self.withdrawers[rows].tolist()],
+                [f"po_synthetic{r}" if status != "pending_payout" else "" for r, status in zip(rows.tolist(), statuses)],
+            ])
+
+    def kyc_batches(self) -> Iterator[bytes]:
+        for rows in batches(len(self.kyc_users), self.args.batch_size):
+            created = timestamps(self.kyc_us[rows])
+            users = self.kyc_users[rows].tolist()
+            statuses = [KYC_STATUSES[s] for s in self.kyc_status[rows].tolist()]
+            yield csv_rows([
+                uuids(_TAGS["kyc_requests"], rows), created, created,
+                uuids(_TAGS["users"], self.kyc_users[rows]), statuses,
+                ["Document unreadable" if status == "rejected" else "" for status in statuses],
+                [f"https://storage.example.test/kyc/{u}/front.jpg" for u in users],
+                [f"https://storage.example.test/kyc/{u}/back.jpg" for u in users],
+                [f"https://storage.example.test/kyc/{u}/selfie.jpg" for u in users],
+            ])
+
+    def tables(self) -> List[tuple]:
+        """(table, columns, batch generator) in foreign-key order."""
+        transaction_columns = ["id", "created_at", "updated_at", "user_id", "tx_type", "reference", "amount", "status"]
+        return [
+            ("users", [
+                "id", "created_at", "updated_at", "email", "username", "password_hash", "first_name",
+                "last_name", "referral_code", "referrer_id", "balance", "role", "status", "withdrawal_status",
+                "is_kyc_verified", "total_earned", "total_withdrawn", "pending_withdrawals",
+                "direct_referral_count", "downline_count",
+            ], self.user_batches),
+            ("transactions", transaction_columns, self.commission_batches),
+            ("transactions", transaction_columns, self.withdrawal_transaction_batches),
+            ("withdrawal_requests", [
+                "id", "created_at", "updated_at", "user_id", "transaction_id", "amount", "status",
+                "bank_name", "account_number", "account_name", "stripe_payout_id",
+            ], self.withdrawal_request_batches),
+            ("kyc_requests", [
+                "id", "created_at", "updated_at", "user_id", "status", "rejection_reason",
+                "document_front_url", "document_back_url", "selfie_url",
+            ], self.kyc_batches),
+        ]
+
+    def summary(self) -> dict:
+        depth = self.forest.depth
+        return {
+            "users": self.args.users,
+            "organic": int((self.forest.parent < 0).sum()),
+            "max_depth": int(depth.max()),
+            "deeper_than_commission_levels": int((depth > len(self.level_amounts)).sum()),
+            "max_direct_referrals": int(self.direct.max()),
+            "max_downline": int(self.downline.max()),
+            "commission_transactions": int(sum((a >= 0).sum() for a in self.ancestors)),
+            "withdrawals": int(len(self.withdrawers)),
+            "kyc_requests": int(len(self.kyc_users)),
+            "total_earned": int(self.earned.sum()) / 100,
+        }
+
+
+# --- Loading -----------------------------------------------------------------
+
+def _label(generate: Callable) -> str:
+    return generate.__name__.removesuffix("_batches")
+
+
+async def _stream(generate: Callable[[], Iterator[bytes]], counter: list) -> AsyncIterator[bytes]:
+    for chunk in generate():
+        counter[0] += chunk.count(b"\n")
+        yield chunk
+
+
+async def load(dataset: Dataset) -> Dict[str, float]:
+    from sqlalchemy import text
+    from benchmarks.harness import reset_schema
+    from app.db.partitions import add_months, month_start, partition_statements
+    from app.db.session import engine
+
+    await reset_schema()
+    first = datetime.fromtimestamp(int(dataset.forest.signup_us[0]) / 1_000_000, timezone.utc).date()
+    async with engine.begin() as conn:
+        for statement in partition_statements(month_start(first), add_months(month_start(datetime.now(timezone.utc).date()), 1)):
+            await conn.execute(text(statement))
+
+    timings = {}
+    async with engine.connect() as connection:
+        raw_connection = (await connection.get_raw_connection()).driver_connection
+        for table, columns, generate in dataset.tables():
+            started, counter = time.perf_counter(), [0]
+            await raw_connection.copy_to_table(
+                table, columns=columns, source=_stream(generate, counter), format="csv", null=""
+            )
+            label = _label(generate)
+            timings[label] = {"rows": counter[0], "seconds": round(time.perf_counter() - started, 1)}
+            print(f"  {label}: {timings[label]}", flush=True)
+        await raw_connection.execute("ANALYZE")
+    await engine.dispose()
+    return timings
+
+
+def encode_only(dataset: Dataset) -> Dict[str, dict]:
+    timings = {}
+    for _, _, generate in dataset.tables():
+        started, rows, size = time.perf_counter(), 0, 0
+        for chunk in generate():
+            rows += chunk.count(b"\n")
+            size += len(chunk)
+        timings[_label(generate)] = {
+            "rows": rows, "megabytes": round(size / 1e6, 1), "seconds": round(time.perf_counter() - started, 1)
+        }
+    return timings
+
+
+def main(args) -> None:
+    started = time.perf_counter()
+    rng = np.random.default_rng(args.seed)
+    forest = generate_forest(args, rng)
+    dataset = Dataset(args, forest, rng)
+    generated = time.perf_counter() - started
+    print(json.dumps({"shape": dataset.summary(), "generate_seconds": round(generated, 1)}, indent=2), flush=True)
+
+    timings = encode_only(dataset) if args.dry_run else asyncio.run(load(dataset))
+    print(json.dumps({
+        "tables": timings,
+        "dry_run": args.dry_run,
+        "total_seconds": round(time.perf_counter() - started, 1),
+        "password": PASSWORD,
+    }, indent=2))
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="postgresql+asyncpg URL of a disposable database")
+    parser.add_argument("--dry-run", action="store_true", help="generate and encode the rows without a database")
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--days", type=int, default=730, help="signups are spread over this many days up to now")
+    parser.add_argument("--organic-share", type=float, default=0.10)
+    parser.add_argument("--super-referrers", type=int, default=20)
+    parser.add_argument("--super-share", type=float, default=0.05, help="share of users referred by a super referrer")
+    parser.add_argument("--chain-share", type=float, default=0.05, help="share referred by the previous signup")
+    parser.add_argument("--fanout-alpha", type=float, default=1.2, help="Pareto shape of referrer activity")
+    parser.add_argument("--withdrawal-share", type=float, default=0.3, help="of users with at least £10 earned")
+    parser.add_argument("--kyc-share", type=float, default=0.4)
+    parser.add_argument("--batch-size", type=int, default=50_000, help="rows per COPY chunk")
+    args = parser.parse_args(argv)
+    if not args.dry_run and not args.database_url:
+        parser.error("--database-url is required unless --dry-run is given")
+    return args
+
+
+if __name__ == "__main__":
+    arguments = parse_args()
+    if arguments.database_url:
+        configure_database(arguments.database_url)
+    main(arguments)
@@ -0,0 +1,92 @@
+# benchmarks/resilience.py
+"""
+Exercise the provider guards in app/core/resilience.py against the fake Stripe.
+
+Runs StripeService calls through four phases and prints outcomes, latencies and
+the provider snapshot after each:
+  healthy  - normal latency: everything succeeds
+  slow     - latency above the deadline: calls time out (504) until the circuit opens
+  failing  - every call errors: idempotent calls retry, then the circuit opens and
+             later calls fail fast with 503 + Retry-After
+  recovery - faults cleared and the reset time elapsed: one trial call closes the circuit
+
+    python -m benchmarks.resilience [--calls 200 --concurrency 50 --timeout 0.2 --reset-seconds 2]
+
+No database is used.
+"""
+import argparse
+import asyncio
+import time
+from collections import Counter
+
+from benchmarks.harness import percentile
+
+
+async def run_phase(name: str, args, call) -> None:
+    from fastapi import HTTPException
+    from app.core.resilience import stripe_provider
+
+    outcomes: Counter = Counter()
+    latencies = []
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def one() -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                await call()
+                outcomes["ok"] += 1
+            except HTTPException as e:
+                outcomes[str(e.status_code)] += 1
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    await asyncio.gather(*(one() for _ in range(args.calls)))
+    latencies.sort()
+    print(f"{name}: {dict(outcomes)} p50 {percentile(latencies, 50):.1f}ms p99 {percentile(latencies, 99):.1f}ms")
+    print(f"  {stripe_provider.snapshot()}")
+
+
+async def main(args) -> None:
+    from benchmarks.fakes import FaultConfig, install_fakes
+    from app.core.resilience import stripe_provider
+    from app.services.stripe_service import StripeService
+
+    fake_stripe, _ = install_fakes(stripe_faults=FaultConfig(latency_ms=args.latency_ms))
+    stripe_provider.timeout = args.timeout
+    stripe_provider.breaker.reset_seconds = args.reset_seconds
+
+    async def verify():
+        # Idempotent: retried with jittered backoff
+        await StripeService.verify_payment_intent("pi_resilience", expected_amount=5000)
+
+    async def create():
+        # Not idempotent: never retried
+        await StripeService.create_payment_intent(amount=5000)
+
+    await run_phase("healthy", args, verify)
+
+    fake_stripe.faults = FaultConfig(latency_ms=args.timeout * 3000)
+    await run_phase("slow", args, create)
+
+    fake_stripe.faults = FaultConfig(latency_ms=args.latency_ms, error_rate=1.0)
+    await asyncio.sleep(args.reset_seconds)
+    await run_phase("failing", args, verify)
+
+    fake_stripe.faults = FaultConfig(latency_ms=args.latency_ms)
+    await asyncio.sleep(args.reset_seconds)
+    await run_phase("recovery", args, verify)
+    print(f"stripe calls: {fake_stripe.calls}")
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=200, help="calls per phase")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="fake Stripe latency when healthy")
+    parser.add_argument("--timeout", type=float, default=0.2, help="per-call deadline in seconds")
+    parser.add_argument("--reset-seconds", type=float, default=2.0, help="circuit open time")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
@@ -0,0 +1,218 @@
+# benchmarks/run.py
+"""
+End-to-end benchmark of the API against a local Postgres, with Stripe and
+Supabase replaced by in-process fakes.
+
+    python -m benchmarks.run --database-url postgresql+asyncpg://postgres@localhost/optivus_bench \
+        --output bench.json [--compare previous.json] [--stripe-latency-ms 150 --stripe-error-rate 0.01]
+
+The benchmark database is created with Base.metadata and TRUNCATED on every run,
+so never point it at a database holding real data.
+"""
+import argparse
+import asyncio
+import json
+import uuid
+from typing import List
+
+from benchmarks.harness import configure_database, drive, ScenarioResult
+
+PASSWORD = "bench-password-1"
+PIN = "1234"
+SCENARIOS = ["registration_upline", "login_storm", "token_refresh", "concurrent_withdrawals", "webhook_burst", "admin_paging"]
+
+
+async def register(client, username: str, referral_code: str = None) -> bool:
+    """Run both registration steps for one user."""
+    body = {"email": f"{username}@bench.example.com", "username": username, "password": PASSWORD}
+    if referral_code:
+        body["referral_code"] = referral_code
+    response = await client.post("/api/users/register/", json=body)
+    if response.status_code != 200:
+        return False
+    payment_intent_id = response.json()["clientSecret"].split("_secret")[0]
+    response = await client.post(
+        "/api/users/register/confirm/", json={**body, "payment_intent_id": payment_intent_id}
+    )
+    return response.status_code == 201
+
+
+async def login(client, username: str) -> dict:
+    response = await client.post("/api/users/login/", json={"username": username, "password": PASSWORD})
+    response.raise_for_status()
+    return response.json()
+
+
+async def execute_sql(statement: str, **params) -> list:
+    from sqlalchemy import text
+    from app.db.session import engine
+
+    async with engine.begin() as conn:
+        result = await conn.execute(text(statement), params)
+        return result.fetchall() if result.returns_rows else []
+
+
+async def registration_upline(client, args) -> ScenarioResult:
+    """Registrations whose referrer sits at the bottom of a 6-level chain."""
+    run = uuid.uuid4().hex[:6]
+    referral_code = None
+    for level in range(6):
+        username = f"up{run}_{level}"
+        if not await register(client, username, referral_code):
+            raise RuntimeError(f"Could not build upline (level {level})")
+        referral_code = (await login(client, username))["referral_code"]
+
+    operations = [
+        (lambda i=i: register(client, f"reg{run}_{i}", referral_code))
+        for i in range(args.operations)
+    ]
+    return await drive("registration_upline", operations, args.concurrency)
+
+
+async def login_storm(client, args) -> ScenarioResult:
+    run = uuid.uuid4().hex[:6]
+    usernames = [f"login{run}_{i}" for i in range(min(args.operations, 50))]
+    for username in usernames:
+        await register(client, username)
+
+    async def attempt(username: str) -> bool:
+        response = await client.post("/api/users/login/", json={"username": username, "password": PASSWORD})
+        return response.status_code == 200
+
+    operations = [(lambda i=i: attempt(usernames[i % len(usernames)])) for i in range(args.operations)]
+    return await drive("login_storm", operations, args.concurrency)
+
+
+async def token_refresh(client, args) -> ScenarioResult:
+    """The login_storm workload served by refresh-token rotation instead of passwords."""
+    run = uuid.uuid4().hex[:6]
+    usernames = [f"refresh{run}_{i}" for i in range(min(args.operations, 50))]
+    for username in usernames:
+        await register(client, username)
+    tokens = {username: (await login(client, username))["refresh_token"] for username in usernames}
+    # A spent token must never be presented again, so each user's refreshes run one at a time
+    locks = {username: asyncio.Lock() for username in usernames}
+
+    async def attempt(username: str) -> bool:
+        async with locks[username]:
+            response = await client.post("/api/users/token/refresh/", json={"refresh_token": tokens[username]})
+            if response.status_code != 200:
+                return False
+            tokens[username] = response.json()["refresh_token"]
+            return True
+
+    operations = [(lambda i=i: attempt(usernames[i % len(usernames)])) for i in range(args.operations)]
+    return await drive("token_refresh", operations, args.concurrency)
+
+
+async def concurrent_withdrawals(client, args) -> ScenarioResult:
+    from app.core.security import get_password_hash
+
+    run = uuid.uuid4().hex[:6]
+    usernames = [f"wd{run}_{i}" for i in range(min(args.operations, 50))]
+    for username in usernames:
+        await register(client, username)
+    await execute_sql(
+        "UPDATE users SET is_kyc_verified = true, balance = 100000, pin_hash = :pin_hash "
+        "WHERE username LIKE :pattern",
+        pin_hash=get_password_hash(PIN), pattern=f"wd{run}_%"
+    )
+    users = [await login(client, username) for username in usernames]
+
+    async def withdraw(user: dict) -> bool:
+        response = await client.post(
+            "/api/withdrawals/",
+            headers={"Authorization": f"Bearer {user['access_token']}"},
+            json={
+                "user_id": user["id"], "amount": "10.00", "pin": PIN,
+                "bank_name": "Bench Bank", "account_number": "00012345", "account_name": user["username"],
+            },
+        )
+        return response.status_code == 202
+
+    operations = [(lambda i=i: withdraw(users[i % len(users)])) for i in range(args.operations)]
+    return await drive("concurrent_withdrawals", operations, args.concurrency)
+
+
+async def webhook_burst(client, args) -> ScenarioResult:
+    rows = await execute_sql(
+        "SELECT stripe_payout_id FROM withdrawal_requests WHERE stripe_payout_id IS NOT NULL LIMIT :n",
+        n=args.operations
+    )
+    payout_ids = [row[0] for row in rows] or [f"po_unknown_{i}" for i in range(args.operations)]
+
+    async def deliver(i: int) -> bool:
+        event = {
+            "id": f"evt_{uuid.uuid4().hex[:24]}",
+            "type": "payout.paid" if i % 5 else "payout.failed",
+            "data": {"object": {"id": payout_ids[i % len(payout_ids)]}},
+        }
+        response = await client.post(
+            "/api/stripe/webhook/", content=json.dumps(event), headers={"stripe-signature": "t=0,v1=bench"}
+        )
+        return response.status_code == 200
+
+    operations = [(lambda i=i: deliver(i)) for i in range(args.operations)]
+    return await drive("webhook_burst", operations, args.concurrency)
+
+
+async def admin_paging(client, args) -> ScenarioResult:
+    username = f"admin{uuid.uuid4().hex[:6]}"
+    await register(client, username)
+    await execute_sql("UPDATE users SET role = 'admin' WHERE username = :username", username=username)
+    headers = {"Authorization": f"Bearer {(await login(client, username))['access_token']}"}
+    paths = ["/api/admin/users/", "/api/admin/withdrawals/", "/api/admin/kyc-requests/"]
+
+    async def page(i: int) -> bool:
+        response = await client.get(
+            paths[i % len(paths)], headers=headers, params={"skip": (i // len(paths)) % 10 * 50, "limit": 50}
+        )
+        return response.status_code == 200
+
+    operations = [(lambda i=i: page(i)) for i in range(args.operations)]
+    return await drive("admin_paging", operations, args.concurrency)
+
+
+async def main(args) -> None:
+    from benchmarks.fakes import FaultConfig, install_fakes
+    from benchmarks.harness import compare_reports, reset_schema, running_app, write_report
+
+    fake_stripe, fake_storage = install_fakes(
+        stripe_faults=FaultConfig(args.stripe_latency_ms, args.stripe_jitter_ms, args.stripe_error_rate),
+        storage_faults=FaultConfig(args.storage_latency_ms, args.storage_jitter_ms, args.storage_error_rate),
+    )
+    await reset_schema()
+
+    results: List[ScenarioResult] = []
+    async with running_app() as client:
+        for name in args.scenarios:
+            result = await globals()[name](client, args)
+            results.append(result)
+            print(f"{name}: {result.summary()}")
+
+    params = {key: value for key, value in vars(args).items() if key not in ("database_url", "output", "compare")}
+    params["stripe_calls"] = fake_stripe.calls
+    report = write_report(args.output, params, results)
+    if args.compare:
+        compare_reports(args.compare, report)
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", required=True, help="postgresql+asyncpg URL of a disposable database")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument("--operations", type=int, default=500, help="operations per scenario")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--output", help="write the JSON report here")
+    parser.add_argument("--compare", help="previous JSON report to compare against")
+    for provider in ("stripe", "storage"):
+        parser.add_argument(f"--{provider}-latency-ms", type=float, default=0.0)
+        parser.add_argument(f"--{provider}-jitter-ms", type=float, default=0.0)
+        parser.add_argument(f"--{provider}-error-rate", type=float, default=0.0)
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    arguments = parse_args()
+    configure_database(arguments.database_url)
+    asyncio.run(main(arguments))
@@ -0,0 +1,88 @@
+# benchmarks/sparse_fields.py
+"""
+Cost of one admin users page with and without `fields=`: the full path loads
+User entities and serializes them through UserResponse the way FastAPI does;
+the sparse path (app.api.fields) selects only the requested columns and dumps
+them with the cut-down model.
+
+    python -m benchmarks.sparse_fields [--rows 1000 --fields username,email,status,balance,created_at]
+
+Runs against an in-memory SQLite database, so it measures client-side work
+(row width, ORM hydration, validation, JSON encoding) and payload size only.
+"""
+import argparse
+import json
+import time
+import uuid
+from typing import List
+
+
+def _per_call_ms(fn, iterations: int) -> float:
+    fn()
+    started = time.process_time()
+    for _ in range(iterations):
+        fn()
+    return (time.process_time() - started) / iterations * 1000
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--fields", default="username,email,status,balance,created_at")
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    from fastapi import Response
+    from pydantic import TypeAdapter
+    from sqlalchemy import create_engine, select
+    from sqlalchemy.orm import Session
+
+    from app.api.fields import sparse_fields
+    from app.db.models.user import User
+    from app.schemas.user import UserResponse
+
+    engine = create_engine("sqlite://")
+    User.__table__.create(engine)
+    with Session(engine) as session:
+        session.add_all(
+            User(
+                id=uuid.uuid4(), email=f"user{i}@example.com", username=f"user{i}", password_hash="x" * 60,
+                first_name="First", last_name="Last", referral_code=f"REF{i:09d}", balance=10,
+                role="user", status="active", withdrawal_status="active", is_kyc_verified=False,
+                total_earned=0, total_withdrawn=0, pending_withdrawals=0,
+                direct_referral_count=0, downline_count=0,
+            )
+            for i in range(args.rows)
+        )
+        session.commit()
+
+    full_adapter = TypeAdapter(List[UserResponse])
+    sparse = sparse_fields(args.fields, User, UserResponse)
+    page = select(User).order_by(User.created_at.desc()).limit(args.rows)
+    sparse_page = select(*sparse.columns).order_by(User.created_at.desc()).limit(args.rows)
+
+    def full() -> bytes:
+        with Session(engine) as session:
+            users = session.execute(page).scalars().all()
+            # FastAPI validates against response_model, then encodes the plain data
+            return json.dumps(full_adapter.dump_python(
+                full_adapter.validate_python(users, from_attributes=True), mode="json"
+            )).encode()
+
+    def projected() -> bytes:
+        with Session(engine) as session:
+            return sparse.render(session.execute(sparse_page).all(), Response()).body
+
+    results = {
+        "full_ms": round(_per_call_ms(full, args.iterations), 2),
+        "sparse_ms": round(_per_call_ms(projected, args.iterations), 2),
+        "full_bytes": len(full()),
+        "sparse_bytes": len(projected()),
+    }
+    results["speedup"] = round(results["full_ms"] / results["sparse_ms"], 2)
+    results["payload_ratio"] = round(results["sparse_bytes"] / results["full_bytes"], 2)
+    print(json.dumps({"rows": args.rows, "fields": sparse.names, "cpu_per_page": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
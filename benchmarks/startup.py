@@ -0,0 +1,83 @@
+# benchmarks/startup.py
+"""
+Measure cold import time of app.main and the latency of the first requests
+after startup, and fail if they exceed the given budgets.
+
+    python -m benchmarks.startup --import-budget-ms 900
+    python -m benchmarks.startup --database-url postgresql+asyncpg://postgres@localhost/optivus_bench \
+        --first-request-budget-ms 50
+
+Import time is measured in fresh interpreters (median of --runs). First-request
+latency needs a database, so it is only measured when --database-url is given.
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+IMPORT_SNIPPET = "import time; t = time.perf_counter(); import app.main; print((time.perf_counter() - t) * 1000)"
+
+
+def measure_import_ms(runs: int) -> float:
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", IMPORT_SNIPPET], capture_output=True, text=True, check=True
+        ).stdout
+        samples.append(float(output.strip().splitlines()[-1]))
+    return statistics.median(samples)
+
+
+async def measure_first_requests() -> dict:
+    from benchmarks.fakes import install_fakes
+    from benchmarks.harness import running_app
+
+    install_fakes()
+    timings = {}
+    started = time.perf_counter()
+    async with running_app() as client:
+        timings["startup_ms"] = (time.perf_counter() - started) * 1000
+        for name, method, path, body in [
+            ("first_health_ms", "GET", "/health/ready", None),
+            # Unknown user: exercises auth lookups against the DB without bcrypt
+            ("first_login_ms", "POST", "/api/users/login/", {"username": "nobody", "password": "x" * 8}),
+        ]:
+            t = time.perf_counter()
+            await client.request(method, path, json=body)
+            timings[name] = (time.perf_counter() - t) * 1000
+    return {key: round(value, 2) for key, value in timings.items()}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--import-budget-ms", type=float, default=None)
+    parser.add_argument("--database-url", help="measure first-request latency against this database")
+    parser.add_argument("--first-request-budget-ms", type=float, default=None)
+    args = parser.parse_args(argv)
+
+    report = {"import_ms": round(measure_import_ms(args.runs), 2)}
+    if args.database_url:
+        from benchmarks.harness import configure_database
+
+        configure_database(args.database_url)
+        report.update(asyncio.run(measure_first_requests()))
+    print(json.dumps(report, indent=2))
+
+    failures = []
+    if args.import_budget_ms is not None and report["import_ms"] > args.import_budget_ms:
+        failures.append(f"import took {report['import_ms']} ms (budget {args.import_budget_ms} ms)")
+    if args.first_request_budget_ms is not None and "first_login_ms" in report:
+        slowest = max(report["first_health_ms"], report["first_login_ms"])
+        if slowest > args.first_request_budget_ms:
+            failures.append(f"first request took {slowest} ms (budget {args.first_request_budget_ms} ms)")
+    for failure in failures:
+        print(f"Budget exceeded: {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
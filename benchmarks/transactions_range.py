@@ -0,0 +1,103 @@
+# benchmarks/transactions_range.py
+"""
+Date-range query latency on `transactions`.
+
+    python -m benchmarks.transactions_range --database-url postgresql+asyncpg://postgres@localhost/optivus_bench \
+        [--seed-rows 5000000 --months 24] [--queries 50 --range-days 7]
+
+With --seed-rows it first loads synthetic rows spread evenly over the last
+--months months (server-side generate_series, so it needs a users row to point
+at and creates one). Run it once on a database at the baseline schema and once
+after `alembic upgrade head` to compare the plain table with the partitioned one.
+The report includes the plan of one query so partition pruning can be checked.
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+
+from benchmarks.harness import configure_database, percentile
+
+
+async def seed(conn, rows: int, months: int) -> None:
+    from sqlalchemy import text
+    from app.db.partitions import add_months, month_start, partition_statements
+
+    partitioned = (await conn.execute(
+        text("SELECT relkind = 'p' FROM pg_class WHERE oid = 'transactions'::regclass")
+    )).scalar()
+    if partitioned:
+        this_month = month_start(datetime.now(timezone.utc).date())
+        for statement in partition_statements(add_months(this_month, -months - 1), this_month):
+            await conn.execute(text(statement))
+
+    user_id = (await conn.execute(text("""
+        INSERT INTO users (id, email, username, password_hash, referral_code, balance, role, status,
+                           withdrawal_status, is_kyc_verified)
+        VALUES (gen_random_uuid(), 'range-bench@bench.local', 'range_bench', '!', 'RANGEBENCH', 0,
+                'user', 'active', 'active', false)
+        ON CONFLICT (email) DO UPDATE SET email = EXCLUDED.email
+        RETURNING id
+    """))).scalar()
+    await conn.execute(text("""
+        INSERT INTO transactions (id, user_id, tx_type, reference, amount, status, created_at, updated_at)
+        SELECT gen_random_uuid(), :user_id, 'commission', 'range benchmark', 25.00, 'completed', ts, ts
+        FROM (
+            SELECT now() - (:span * random()) AS ts FROM generate_series(1, :rows)
+        ) AS generated
+    """), {"user_id": user_id, "rows": rows, "span": timedelta(days=30 * months)})
+    await conn.execute(text("ANALYZE transactions"))
+
+
+async def main(args) -> None:
+    from sqlalchemy import text
+    from app.db.session import engine
+
+    if args.seed_rows:
+        async with engine.begin() as conn:
+            await seed(conn, args.seed_rows, args.months)
+
+    query = text(
+        "SELECT count(*), coalesce(sum(amount), 0) FROM transactions "
+        "WHERE created_at >= :start AND created_at < :end"
+    )
+    now = datetime.now(timezone.utc)
+    span_days = 30 * args.months - args.range_days
+    latencies = []
+    async with engine.connect() as conn:
+        for _ in range(args.queries):
+            start = now - timedelta(days=random.uniform(args.range_days, span_days))
+            params = {"start": start, "end": start + timedelta(days=args.range_days)}
+            started = time.perf_counter()
+            await conn.execute(query, params)
+            latencies.append((time.perf_counter() - started) * 1000)
+        plan = (await conn.execute(
+            text(f"EXPLAIN (ANALYZE, COSTS OFF) {query.text}"), params
+        )).scalars().all()
+
+    latencies.sort()
+    print(json.dumps({
+        "queries": args.queries,
+        "range_days": args.range_days,
+        "mean_ms": round(statistics.fmean(latencies), 2),
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+        "plan": plan,
+    }, indent=2))
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", required=True)
+    parser.add_argument("--seed-rows", type=int, default=0)
+    parser.add_argument("--months", type=int, default=24)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--range-days", type=int, default=7)
+    arguments = parser.parse_args()
+    configure_database(arguments.database_url)
+    asyncio.run(main(arguments))
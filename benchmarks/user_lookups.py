@@ -0,0 +1,71 @@
+# benchmarks/user_lookups.py
+"""
+CPU cost per UserService lookup: statements rebuilt on every call (the old
+code path) versus the prebuilt statements in app.services.user_service, and
+ORM hydration versus the scalar-only existence checks.
+
+    python -m benchmarks.user_lookups [--iterations 20000]
+
+Runs against an in-memory SQLite database so only client-side work (statement
+construction, cache key generation, compilation lookup, result processing and
+ORM hydration) is measured; network and server time are excluded on purpose.
+"""
+import argparse
+import json
+import time
+import uuid
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+
+
+def _per_call_us(fn, iterations: int) -> float:
+    fn()  # populate the compiled cache before timing
+    started = time.process_time()
+    for _ in range(iterations):
+        fn()
+    return (time.process_time() - started) / iterations * 1_000_000
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args(argv)
+
+    from app.db.models.user import User
+    from app.services import user_service
+
+    engine = create_engine("sqlite://")
+    User.__table__.create(engine)
+    with Session(engine) as session:
+        session.add(User(
+            id=uuid.uuid4(), email="bench@example.com", username="bench", password_hash="x",
+            referral_code="BENCH", balance=0, role="user", status="active",
+            withdrawal_status="active", is_kyc_verified=False,
+        ))
+        session.commit()
+
+    with Session(engine) as session:
+        cases = {
+            "get_by_email_rebuilt": lambda: session.execute(
+                select(User).where(User.email == "bench@example.com")
+            ).scalar_one_or_none(),
+            "get_by_email_prebuilt": lambda: session.execute(
+                user_service._USER_BY_EMAIL, {"email": "bench@example.com"}
+            ).scalar_one_or_none(),
+            "email_exists_orm": lambda: session.execute(
+                select(User).where(User.email == "bench@example.com")
+            ).scalar_one_or_none() is not None,
+            "email_exists_scalar": lambda: session.execute(
+                user_service._EMAIL_EXISTS, {"email": "bench@example.com"}
+            ).scalar() is not None,
+        }
+        results = {name: round(_per_call_us(fn, args.iterations), 2) for name, fn in cases.items()}
+
+    results["lookup_speedup"] = round(results["get_by_email_rebuilt"] / results["get_by_email_prebuilt"], 2)
+    results["exists_speedup"] = round(results["email_exists_orm"] / results["email_exists_scalar"], 2)
+    print(json.dumps({"cpu_us_per_call": results, "iterations": args.iterations}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+# benchmarks/withdrawal_pool.py
+"""
+Database pool occupancy while withdrawals wait on a slow Stripe.
+
+Runs concurrent withdrawals against the fake Stripe with injected latency and,
+at the same time, a stream of GET /api/users/me/ probes that need a pooled
+connection. The pool's checked-out count is sampled throughout, so a flow that
+holds connections across Stripe calls shows up as a saturated pool and slow probes.
+
+    python -m benchmarks.withdrawal_pool --database-url postgresql+asyncpg://postgres@localhost/optivus_bench \\
+        --stripe-latency-ms 500 --withdrawals 200 --concurrency 50
+
+The benchmark database is TRUNCATED, so never point it at real data.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+
+from benchmarks.harness import configure_database, drive
+
+
+async def sample_pool(stop: asyncio.Event, interval_s: float) -> list:
+    from app.db.session import engine
+
+    samples = []
+    while not stop.is_set():
+        samples.append(engine.pool.checkedout())
+        await asyncio.sleep(interval_s)
+    return samples
+
+
+async def main(args) -> None:
+    from benchmarks.fakes import FaultConfig, install_fakes
+    from benchmarks.harness import reset_schema, running_app
+    from benchmarks.run import PIN, execute_sql, login, register
+    from app.core.config import settings
+    from app.core.security import get_password_hash
+
+    fake_stripe, _ = install_fakes(stripe_faults=FaultConfig(args.stripe_latency_ms, args.stripe_jitter_ms))
+    await reset_schema()
+
+    async with running_app() as client:
+        run = uuid.uuid4().hex[:6]
+        usernames = [f"pool{run}_{i}" for i in range(args.users)]
+        for username in usernames:
+            await register(client, username)
+        await execute_sql(
+            "UPDATE users SET is_kyc_verified = true, balance = 100000, pin_hash = :pin_hash "
+            "WHERE username LIKE :pattern",
+            pin_hash=get_password_hash(PIN), pattern=f"pool{run}_%"
+        )
+        users = [await login(client, username) for username in usernames]
+
+        async def withdraw(user: dict) -> bool:
+            response = await client.post(
+                "/api/withdrawals/",
+                headers={"Authorization": f"Bearer {user['access_token']}"},
+                json={
+                    "user_id": user["id"], "amount": "10.00", "pin": PIN,
+                    "bank_name": "Bench Bank", "account_number": "00012345", "account_name": user["username"],
+                },
+            )
+            return response.status_code == 202
+
+        async def probe(user: dict) -> bool:
+            response = await client.get(
+                "/api/users/me/", headers={"Authorization": f"Bearer {user['access_token']}"}
+            )
+            return response.status_code == 200
+
+        stop = asyncio.Event()
+        sampler = asyncio.create_task(sample_pool(stop, args.sample_ms / 1000))
+        started = time.perf_counter()
+        withdrawals, probes = await asyncio.gather(
+            drive("withdrawals", [
+                (lambda i=i: withdraw(users[i % len(users)])) for i in range(args.withdrawals)
+            ], args.concurrency),
+            drive("probes", [
+                (lambda i=i: probe(users[i % len(users)])) for i in range(args.probes)
+            ], args.probe_concurrency),
+        )
+        elapsed = time.perf_counter() - started
+        stop.set()
+        samples = await sampler
+
+    pool_capacity = settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW
+    print(f"stripe latency {args.stripe_latency_ms}ms, pool capacity {pool_capacity}, {elapsed:.2f}s")
+    print(f"pool checked out: max {max(samples)}, mean {statistics.fmean(samples):.2f}, "
+          f"saturated {sum(s >= pool_capacity for s in samples) / len(samples):.1%} of samples")
+    for result in (withdrawals, probes):
+        print(f"{result.name}: {result.summary()}")
+    print(f"stripe calls: {fake_stripe.calls}")
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", required=True, help="postgresql+asyncpg URL of a disposable database")
+    parser.add_argument("--stripe-latency-ms", type=float, default=500.0)
+    parser.add_argument("--stripe-jitter-ms", type=float, default=0.0)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--withdrawals", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--probes", type=int, default=500)
+    parser.add_argument("--probe-concurrency", type=int, default=10)
+    parser.add_argument("--sample-ms", type=float, default=5.0, help="pool sampling interval")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    arguments = parse_args()
+    configure_database(arguments.database_url)
+    asyncio.run(main(arguments))
@@ -0,0 +1,100 @@
+# benchmarks/workers.py
+"""
+Requests per second against worker count for the production launcher.
+
+    python -m benchmarks.workers --workers 1 2 4 --duration 10 \
+        [--database-url postgresql+asyncpg://postgres@localhost/optivus_bench --token <access token>]
+
+For each worker count it starts `python -m app.server` on a local port, waits
+for /health, then drives /health (and /api/users/me/ when --token is given)
+with --connections concurrent keep-alive clients for --duration seconds.
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+
+import httpx
+
+
+async def wait_until_up(base_url: str, timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get("/health")).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"Server at {base_url} did not come up within {timeout}s")
+
+
+async def measure_rps(base_url: str, path: str, headers: dict, connections: int, duration: float) -> dict:
+    completed = errors = 0
+    deadline = time.monotonic() + duration
+
+    async def client_loop() -> None:
+        nonlocal completed, errors
+        async with httpx.AsyncClient(base_url=base_url, headers=headers) as client:
+            while time.monotonic() < deadline:
+                try:
+                    response = await client.get(path)
+                    if response.status_code == 200:
+                        completed += 1
+                    else:
+                        errors += 1
+                except httpx.TransportError:
+                    errors += 1
+
+    started = time.monotonic()
+    await asyncio.gather(*(client_loop() for _ in range(connections)))
+    elapsed = time.monotonic() - started
+    return {"rps": round(completed / elapsed, 1), "errors": errors}
+
+
+async def bench_worker_count(workers: int, args) -> dict:
+    env = {
+        **os.environ,
+        "WEB_CONCURRENCY": str(workers),
+        "SERVER_PORT": str(args.port),
+        "SERVER_MAX_REQUESTS": "0",
+    }
+    if args.database_url:
+        env["DATABASE_URL"] = args.database_url
+    server = subprocess.Popen([sys.executable, "-m", "app.server"], env=env)
+    base_url = f"http://127.0.0.1:{args.port}"
+    try:
+        await wait_until_up(base_url, timeout=60)
+        results = {"/health": await measure_rps(base_url, "/health", {}, args.connections, args.duration)}
+        if args.token:
+            results["/api/users/me/"] = await measure_rps(
+                base_url, "/api/users/me/", {"Authorization": f"Bearer {args.token}"},
+                args.connections, args.duration
+            )
+        return results
+    finally:
+        server.terminate()
+        server.wait(timeout=60)
+
+
+async def main(args) -> None:
+    report = {"connections": args.connections, "duration_s": args.duration, "results": {}}
+    for workers in args.workers:
+        report["results"][str(workers)] = await bench_worker_count(workers, args)
+        print(f"{workers} workers: {report['results'][str(workers)]}", file=sys.stderr)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--connections", type=int, default=64)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--database-url")
+    parser.add_argument("--token", help="access token for /api/users/me/")
+    asyncio.run(main(parser.parse_args()))
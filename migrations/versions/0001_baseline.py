@@ -0,0 +1,108 @@
+"""Baseline schema (as created before migrations existed)
+
+Existing databases already have these tables; the upgrade skips any table that
+is present, so running it there only records the revision.
+
+Revision ID: 0001_baseline
+Revises:
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+revision = "0001_baseline"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def _timestamps():
+    return [
+        sa.Column("id", UUID(as_uuid=True), primary_key=True, nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    ]
+
+
+def upgrade() -> None:
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if "users" not in existing:
+        op.create_table(
+            "users",
+            sa.Column("email", sa.String, nullable=False),
+            sa.Column("username", sa.String, nullable=False),
+            sa.Column("password_hash", sa.String, nullable=False),
+            sa.Column("first_name", sa.String, nullable=True),
+            sa.Column("last_name", sa.String, nullable=True),
+            sa.Column("referral_code", sa.String, nullable=False),
+            sa.Column("referrer_id", UUID(as_uuid=True), sa.ForeignKey("users.id", ondelete="SET NULL"), nullable=True),
+            sa.Column("balance", sa.Numeric(10, 2), nullable=False),
+            sa.Column("role", sa.String, nullable=False),
+            sa.Column("status", sa.String, nullable=False),
+            sa.Column("withdrawal_status", sa.String, nullable=False),
+            sa.Column("is_kyc_verified", sa.Boolean, nullable=False),
+            sa.Column("pin_hash", sa.String, nullable=True),
+            *_timestamps(),
+        )
+        op.create_index("ix_users_email", "users", ["email"], unique=True)
+        op.create_index("ix_users_username", "users", ["username"], unique=True)
+        op.create_index("ix_users_referral_code", "users", ["referral_code"], unique=True)
+        op.create_index("ix_users_id", "users", ["id"], unique=True)
+        op.create_index("ix_users_status_withdrawal", "users", ["status", "withdrawal_status"])
+
+    if "kyc_requests" not in existing:
+        op.create_table(
+            "kyc_requests",
+            sa.Column("user_id", UUID(as_uuid=True), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+            sa.Column("status", sa.String, nullable=False),
+            sa.Column("rejection_reason", sa.String, nullable=True),
+            sa.Column("document_front_url", sa.String, nullable=False),
+            sa.Column("document_back_url", sa.String, nullable=True),
+            sa.Column("selfie_url", sa.String, nullable=False),
+            *_timestamps(),
+        )
+        op.create_index("ix_kyc_requests_id", "kyc_requests", ["id"], unique=True)
+        op.create_index("ix_kyc_requests_user_id", "kyc_requests", ["user_id"])
+
+    if "transactions" not in existing:
+        op.create_table(
+            "transactions",
+            sa.Column("user_id", UUID(as_uuid=True), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+            sa.Column("tx_type", sa.String, nullable=False),
+            sa.Column("reference", sa.String, nullable=True),
+            sa.Column("amount", sa.Numeric(10, 2), nullable=False),
+            sa.Column("status", sa.String, nullable=False),
+            *_timestamps(),
+        )
+        op.create_index("ix_transactions_id", "transactions", ["id"], unique=True)
+        op.create_index("ix_transactions_user_id", "transactions", ["user_id"])
+
+    if "withdrawal_requests" not in existing:
+        op.create_table(
+            "withdrawal_requests",
+            sa.Column("user_id", UUID(as_uuid=True), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+            sa.Column(
+                "transaction_id", UUID(as_uuid=True),
+                sa.ForeignKey("transactions.id", ondelete="CASCADE"), nullable=False, unique=True
+            ),
+            sa.Column("amount", sa.Numeric(10, 2), nullable=False),
+            sa.Column("status", sa.String, nullable=False),
+            sa.Column("bank_name", sa.String, nullable=False),
+            sa.Column("account_number", sa.String, nullable=False),
+            sa.Column("account_name", sa.String, nullable=False),
+            sa.Column("stripe_payout_id", sa.String, nullable=True),
+            *_timestamps(),
+        )
+        op.create_index("ix_withdrawal_requests_id", "withdrawal_requests", ["id"], unique=True)
+        op.create_index("ix_withdrawal_requests_user_id", "withdrawal_requests", ["user_id"])
+        op.create_index("ix_withdrawal_requests_status", "withdrawal_requests", ["status"])
+        op.create_index("ix_withdrawal_requests_stripe_payout_id", "withdrawal_requests", ["stripe_payout_id"])
+
+
+def downgrade() -> None:
+    op.drop_table("withdrawal_requests")
+    op.drop_table("transactions")
+    op.drop_table("kyc_requests")
+    op.drop_table("users")
@@ -0,0 +1,190 @@
+"""Partition transactions by month on created_at, with BRIN indexing
+
+The table stays online while the data is copied:
+
+1. Create `transactions_partitioned` (PARTITION BY RANGE (created_at)) with
+   monthly partitions covering existing rows plus MONTHS_AHEAD months and a
+   default partition.
+2. Mirror every INSERT/UPDATE/DELETE on `transactions` into the new table with a trigger.
+3. Backfill existing rows in small autocommitted batches (ordered by a temporary
+   (created_at, id) index built CONCURRENTLY), so no long-held locks.
+4. Swap the tables in one short transaction: lock, verify row counts, drop the
+   withdrawal_requests foreign key (it cannot reference a partitioned table
+   without the partition key), rename, drop the old table.
+
+Revision ID: 0002_partition_transactions
+Revises: 0001_baseline
+Create Date: 2026-10-19
+"""
+from datetime import date, datetime, timezone
+from typing import List
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002_partition_transactions"
+down_revision = "0001_baseline"
+branch_labels = None
+depends_on = None
+
+COLUMNS = "id, created_at, updated_at, user_id, tx_type, reference, amount, status"
+BATCH_SIZE = 10000
+# TRANSACTION_PARTITION_MONTHS_AHEAD as of this revision; the app creates later months itself
+MONTHS_AHEAD = 3
+
+
+# Frozen copies of the helpers in app/db/partitions.py as of this revision
+def month_start(value: date) -> date:
+    return date(value.year, value.month, 1)
+
+
+def add_months(value: date, months: int) -> date:
+    index = value.year * 12 + value.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_statements(first_month: date, last_month: date, parent: str) -> List[str]:
+    """DDL creating the default partition and every monthly partition in [first_month, last_month]."""
+    statements = [f"CREATE TABLE IF NOT EXISTS {parent}_default PARTITION OF {parent} DEFAULT"]
+    month = month_start(first_month)
+    while month <= last_month:
+        statements.append(
+            f"CREATE TABLE IF NOT EXISTS {parent}_p{month.year:04d}_{month.month:02d} PARTITION OF {parent} "
+            f"FOR VALUES FROM ('{month.isoformat()} 00:00:00+00') "
+            f"TO ('{add_months(month, 1).isoformat()} 00:00:00+00')"
+        )
+        month = add_months(month, 1)
+    return statements
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.execute(sa.text(
+        "SELECT relkind FROM pg_class WHERE oid = 'transactions'::regclass"
+    )).scalar() == "p":
+        return  # already partitioned (e.g. created from the current models)
+
+    op.execute("""
+        CREATE TABLE transactions_partitioned (
+            id UUID NOT NULL,
+            created_at TIMESTAMP WITH TIME ZONE DEFAULT now() NOT NULL,
+            updated_at TIMESTAMP WITH TIME ZONE DEFAULT now() NOT NULL,
+            user_id UUID NOT NULL REFERENCES users (id) ON DELETE CASCADE,
+            tx_type VARCHAR NOT NULL,
+            reference VARCHAR,
+            amount NUMERIC(10, 2) NOT NULL,
+            status VARCHAR NOT NULL,
+            CONSTRAINT transactions_partitioned_pkey PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+    """)
+
+    oldest = bind.execute(sa.text("SELECT min(created_at) FROM transactions")).scalar()
+    this_month = month_start(datetime.now(timezone.utc).date())
+    first_month = month_start(oldest.date()) if oldest else this_month
+    last_month = add_months(this_month, MONTHS_AHEAD)
+    for statement in partition_statements(first_month, last_month, parent="transactions_partitioned"):
+        op.execute(statement)
+
+    op.execute("CREATE INDEX ix_transactions_partitioned_user_id ON transactions_partitioned (user_id)")
+    op.execute(
+        "CREATE INDEX ix_transactions_partitioned_created_at_brin "
+        "ON transactions_partitioned USING brin (created_at)"
+    )
+
+    op.execute(f"""
+        CREATE FUNCTION transactions_mirror() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'DELETE' THEN
+                DELETE FROM transactions_partitioned WHERE id = OLD.id AND created_at = OLD.created_at;
+                RETURN OLD;
+            END IF;
+            INSERT INTO transactions_partitioned ({COLUMNS})
+            VALUES (NEW.id, NEW.created_at, NEW.updated_at, NEW.user_id, NEW.tx_type,
+                    NEW.reference, NEW.amount, NEW.status)
+            ON CONFLICT (id, created_at) DO UPDATE SET
+                updated_at = EXCLUDED.updated_at, user_id = EXCLUDED.user_id,
+                tx_type = EXCLUDED.tx_type, reference = EXCLUDED.reference,
+                amount = EXCLUDED.amount, status = EXCLUDED.status;
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER transactions_mirror AFTER INSERT OR UPDATE OR DELETE ON transactions
+        FOR EACH ROW EXECUTE FUNCTION transactions_mirror()
+    """)
+
+    # Commit the setup so the trigger is live before the backfill starts
+    with op.get_context().autocommit_block():
+        op.execute("CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_transactions_backfill ON transactions (created_at, id)")
+
+        last_key = (datetime.min.replace(tzinfo=timezone.utc), "00000000-0000-0000-0000-000000000000")
+        while True:
+            row = bind.execute(sa.text(f"""
+                WITH batch AS (
+                    SELECT {COLUMNS} FROM transactions
+                    WHERE (created_at, id) > (:created_at, CAST(:id AS uuid))
+                    ORDER BY created_at, id
+                    LIMIT :batch_size
+                ), copied AS (
+                    INSERT INTO transactions_partitioned ({COLUMNS})
+                    SELECT {COLUMNS} FROM batch
+                    ON CONFLICT (id, created_at) DO NOTHING
+                )
+                SELECT created_at, id FROM batch ORDER BY created_at DESC, id DESC LIMIT 1
+            """), {"created_at": last_key[0], "id": str(last_key[1]), "batch_size": BATCH_SIZE}).first()
+            if row is None:
+                break
+            last_key = (row.created_at, row.id)
+
+    op.execute("LOCK TABLE transactions IN ACCESS EXCLUSIVE MODE")
+    counts = bind.execute(sa.text(
+        "SELECT (SELECT count(*) FROM transactions), (SELECT count(*) FROM transactions_partitioned)"
+    )).first()
+    if counts[0] != counts[1]:
+        raise RuntimeError(f"Backfill mismatch: {counts[0]} rows in transactions, {counts[1]} copied")
+
+    op.execute("DROP TRIGGER transactions_mirror ON transactions")
+    op.execute("DROP FUNCTION transactions_mirror()")
+    op.execute("ALTER TABLE withdrawal_requests DROP CONSTRAINT IF EXISTS withdrawal_requests_transaction_id_fkey")
+    op.execute("DROP TABLE transactions")
+    op.execute("ALTER TABLE transactions_partitioned RENAME TO transactions")
+    op.execute("ALTER TABLE transactions RENAME CONSTRAINT transactions_partitioned_pkey TO transactions_pkey")
+    op.execute("ALTER INDEX ix_transactions_partitioned_user_id RENAME TO ix_transactions_user_id")
+    op.execute("ALTER INDEX ix_transactions_partitioned_created_at_brin RENAME TO ix_transactions_created_at_brin")
+    # Partitions keep their transactions_partitioned_* names; give them the names
+    # the app's partition maintenance expects.
+    partitions = bind.execute(sa.text("""
+        SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = 'transactions'::regclass
+    """)).scalars().all()
+    for name in partitions:
+        op.execute(f"ALTER TABLE {name} RENAME TO {name.replace('transactions_partitioned_', 'transactions_', 1)}")
+
+
+def downgrade() -> None:
+    # Rebuild a plain table; intended for development databases (it locks while copying).
+    op.execute("ALTER TABLE transactions RENAME TO transactions_partitioned")
+    op.execute("ALTER TABLE transactions_partitioned RENAME CONSTRAINT transactions_pkey TO transactions_partitioned_pkey")
+    op.execute("ALTER INDEX ix_transactions_user_id RENAME TO ix_transactions_partitioned_user_id")
+    op.execute("ALTER INDEX ix_transactions_created_at_brin RENAME TO ix_transactions_partitioned_created_at_brin")
+    op.execute("""
+        CREATE TABLE transactions (
+            id UUID NOT NULL PRIMARY KEY,
+            created_at TIMESTAMP WITH TIME ZONE DEFAULT now() NOT NULL,
+            updated_at TIMESTAMP WITH TIME ZONE DEFAULT now() NOT NULL,
+            user_id UUID NOT NULL REFERENCES users (id) ON DELETE CASCADE,
+            tx_type VARCHAR NOT NULL,
+            reference VARCHAR,
+            amount NUMERIC(10, 2) NOT NULL,
+            status VARCHAR NOT NULL
+        )
+    """)
+    op.execute(f"INSERT INTO transactions ({COLUMNS}) SELECT {COLUMNS} FROM transactions_partitioned")
+    op.execute("DROP TABLE transactions_partitioned CASCADE")
+    op.create_index("ix_transactions_id", "transactions", ["id"], unique=True)
+    op.create_index("ix_transactions_user_id", "transactions", ["user_id"])
+    op.execute("""
+        ALTER TABLE withdrawal_requests ADD CONSTRAINT withdrawal_requests_transaction_id_fkey
+        FOREIGN KEY (transaction_id) REFERENCES transactions (id) ON DELETE CASCADE
+    """)
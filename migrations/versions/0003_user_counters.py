@@ -0,0 +1,92 @@
+"""Denormalized earnings and referral counters on users
+
+Adds total_earned, total_withdrawn, pending_withdrawals, direct_referral_count
+and downline_count with constant defaults (no table rewrite), then fills them
+from transactions, withdrawal_requests and the referral tree while user writes
+are blocked.
+
+Revision ID: 0003_user_counters
+Revises: 0002_partition_transactions
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003_user_counters"
+down_revision = "0002_partition_transactions"
+branch_labels = None
+depends_on = None
+
+MONEY_COLUMNS = ("total_earned", "total_withdrawn", "pending_withdrawals")
+COUNT_COLUMNS = ("direct_referral_count", "downline_count")
+
+# Frozen copy of UserService's counter repair as of this revision; the app's
+# version keeps evolving and must not change what replaying this migration does
+FILL_COUNTERS = """
+    WITH RECURSIVE
+    earned AS (
+        SELECT user_id, sum(amount) AS total FROM transactions
+        WHERE tx_type = 'commission' AND status = 'completed'
+        GROUP BY user_id
+    ),
+    withdrawn AS (
+        SELECT user_id,
+               coalesce(sum(amount) FILTER (WHERE status = 'paid'), 0) AS paid,
+               coalesce(sum(amount) FILTER (WHERE status NOT IN ('paid', 'failed')), 0) AS pending
+        FROM withdrawal_requests
+        GROUP BY user_id
+    ),
+    direct AS (
+        SELECT referrer_id AS id, count(*) AS n FROM users WHERE referrer_id IS NOT NULL GROUP BY referrer_id
+    ),
+    chain(id, ancestor) AS (
+        SELECT id, referrer_id FROM users WHERE referrer_id IS NOT NULL
+        UNION ALL
+        SELECT chain.id, u.referrer_id FROM chain JOIN users u ON u.id = chain.ancestor
+        WHERE u.referrer_id IS NOT NULL
+    ),
+    downline AS (
+        SELECT ancestor AS id, count(*) AS n FROM chain GROUP BY ancestor
+    ),
+    expected AS (
+        SELECT u.id,
+               coalesce(earned.total, 0) AS total_earned,
+               coalesce(withdrawn.paid, 0) AS total_withdrawn,
+               coalesce(withdrawn.pending, 0) AS pending_withdrawals,
+               coalesce(direct.n, 0) AS direct_referral_count,
+               coalesce(downline.n, 0) AS downline_count
+        FROM users u
+        LEFT JOIN earned ON earned.user_id = u.id
+        LEFT JOIN withdrawn ON withdrawn.user_id = u.id
+        LEFT JOIN direct ON direct.id = u.id
+        LEFT JOIN downline ON downline.id = u.id
+    )
+    UPDATE users SET
+        total_earned = expected.total_earned,
+        total_withdrawn = expected.total_withdrawn,
+        pending_withdrawals = expected.pending_withdrawals,
+        direct_referral_count = expected.direct_referral_count,
+        downline_count = expected.downline_count
+    FROM expected
+    WHERE users.id = expected.id AND
+        (users.total_earned, users.total_withdrawn, users.pending_withdrawals,
+         users.direct_referral_count, users.downline_count)
+        IS DISTINCT FROM
+        (expected.total_earned, expected.total_withdrawn, expected.pending_withdrawals,
+         expected.direct_referral_count, expected.downline_count)
+"""
+
+
+def upgrade() -> None:
+    for name in MONEY_COLUMNS:
+        op.add_column("users", sa.Column(name, sa.Numeric(12, 2), nullable=False, server_default="0"))
+    for name in COUNT_COLUMNS:
+        op.add_column("users", sa.Column(name, sa.Integer, nullable=False, server_default="0"))
+
+    op.execute("LOCK TABLE users IN SHARE ROW EXCLUSIVE MODE")
+    op.execute(FILL_COUNTERS)
+
+
+def downgrade() -> None:
+    for name in MONEY_COLUMNS + COUNT_COLUMNS:
+        op.drop_column("users", name)
@@ -0,0 +1,48 @@
+"""Daily rollup tables, plus the time indexes the incremental job scans
+
+Revision ID: 0004_daily_rollups
+Revises: 0003_user_counters
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004_daily_rollups"
+down_revision = "0003_user_counters"
+branch_labels = None
+depends_on = None
+
+# transactions already has a BRIN index on created_at (0002)
+SOURCE_INDEXES = {
+    "ix_users_created_at": "users (created_at)",
+    "ix_withdrawal_requests_created_at": "withdrawal_requests (created_at)",
+    "ix_withdrawal_requests_updated_at": "withdrawal_requests (updated_at)",
+}
+
+
+def upgrade() -> None:
+    op.create_table(
+        "daily_rollups",
+        sa.Column("day", sa.Date, primary_key=True),
+        sa.Column("metric", sa.String, primary_key=True),
+        sa.Column("dimension", sa.String, primary_key=True),
+        sa.Column("count", sa.BigInteger, nullable=False, server_default="0"),
+        sa.Column("amount", sa.Numeric(14, 2), nullable=False, server_default="0"),
+    )
+    op.create_table(
+        "rollup_watermarks",
+        sa.Column("name", sa.String, primary_key=True),
+        sa.Column("watermark", sa.DateTime(timezone=True), nullable=False),
+    )
+
+    with op.get_context().autocommit_block():
+        for name, target in SOURCE_INDEXES.items():
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {target}")
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name in SOURCE_INDEXES:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+    op.drop_table("rollup_watermarks")
+    op.drop_table("daily_rollups")
@@ -0,0 +1,44 @@
+"""Event id sequence and NOTIFY for new KYC requests
+
+Application code publishes its events with pg_notify (app/core/events.py). KYC
+requests are inserted outside this API, so a trigger publishes `kyc.created`
+in the same payload format.
+
+Revision ID: 0005_event_notifications
+Revises: 0004_daily_rollups
+Create Date: 2026-10-19
+"""
+from alembic import op
+
+revision = "0005_event_notifications"
+down_revision = "0004_daily_rollups"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE SEQUENCE IF NOT EXISTS app_event_ids")
+    op.execute("""
+        CREATE OR REPLACE FUNCTION notify_kyc_request_created() RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify('app_events', json_build_object(
+                'id', nextval('app_event_ids'),
+                'type', 'kyc.created',
+                'user_id', NEW.user_id::text,
+                'data', json_build_object('kyc_request_id', NEW.id::text, 'status', NEW.status)
+            )::text);
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER kyc_requests_notify_created
+        AFTER INSERT ON kyc_requests
+        FOR EACH ROW EXECUTE FUNCTION notify_kyc_request_created()
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS kyc_requests_notify_created ON kyc_requests")
+    op.execute("DROP FUNCTION IF EXISTS notify_kyc_request_created()")
+    op.execute("DROP SEQUENCE IF EXISTS app_event_ids")
@@ -0,0 +1,35 @@
+"""KYC review queue: claim lease columns and a partial index on pending requests
+
+Revision ID: 0006_kyc_claims
+Revises: 0005_event_notifications
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+revision = "0006_kyc_claims"
+down_revision = "0005_event_notifications"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "kyc_requests",
+        sa.Column("claimed_by", UUID(as_uuid=True), sa.ForeignKey("users.id", ondelete="SET NULL"), nullable=True),
+    )
+    op.add_column("kyc_requests", sa.Column("claim_expires_at", sa.DateTime(timezone=True), nullable=True))
+
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_kyc_requests_pending_created_at "
+            "ON kyc_requests (created_at) WHERE status = 'pending'"
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_kyc_requests_pending_created_at")
+    op.drop_column("kyc_requests", "claim_expires_at")
+    op.drop_column("kyc_requests", "claimed_by")
@@ -0,0 +1,74 @@
+"""Saved payout destinations; withdrawal requests reference one instead of inline bank details
+
+Existing withdrawal rows keep their inline details; new requests leave those
+columns empty. A plaintext account number is only kept on rows still in
+'pending_payout', which the recovery job may yet pay out from; every other row
+is masked to its last four digits, and the app masks the pending ones as they
+settle. Masking is not undone by the downgrade.
+
+Revision ID: 0007_payout_destinations
+Revises: 0006_kyc_claims
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+revision = "0007_payout_destinations"
+down_revision = "0006_kyc_claims"
+branch_labels = None
+depends_on = None
+
+INLINE_BANK_COLUMNS = ("bank_name", "account_number", "account_name")
+
+MASK_SETTLED_ACCOUNT_NUMBERS = """
+    UPDATE withdrawal_requests
+    SET account_number = '****' || right(account_number, 4)
+    WHERE status <> 'pending_payout'
+      AND account_number IS NOT NULL
+      AND account_number NOT LIKE '****%'
+"""
+
+
+def upgrade() -> None:
+    op.create_table(
+        "payout_destinations",
+        sa.Column("id", UUID(as_uuid=True), primary_key=True, nullable=False),
+        sa.Column("user_id", UUID(as_uuid=True), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("bank_name", sa.String, nullable=False),
+        sa.Column("account_name", sa.String, nullable=False),
+        sa.Column("account_last4", sa.String(4), nullable=False),
+        sa.Column("account_number_encrypted", sa.String, nullable=False),
+        sa.Column("fingerprint", sa.String(64), nullable=False),
+        sa.Column("stripe_bank_account_id", sa.String, nullable=False),
+        sa.Column("is_active", sa.Boolean, nullable=False, server_default=sa.true()),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.UniqueConstraint("user_id", "fingerprint", name="uq_payout_destinations_user_fingerprint"),
+    )
+    op.create_index("ix_payout_destinations_id", "payout_destinations", ["id"], unique=True)
+    op.create_index("ix_payout_destinations_user_id", "payout_destinations", ["user_id"])
+
+    op.add_column(
+        "withdrawal_requests",
+        sa.Column(
+            "payout_destination_id", UUID(as_uuid=True),
+            sa.ForeignKey("payout_destinations.id", ondelete="RESTRICT"), nullable=True
+        ),
+    )
+    for column in INLINE_BANK_COLUMNS:
+        op.alter_column("withdrawal_requests", column, nullable=True)
+    op.execute(MASK_SETTLED_ACCOUNT_NUMBERS)
+
+
+def downgrade() -> None:
+    op.execute(
+        "UPDATE withdrawal_requests w "
+        "SET bank_name = d.bank_name, account_name = d.account_name, account_number = '****' || d.account_last4 "
+        "FROM payout_destinations d "
+        "WHERE w.payout_destination_id = d.id AND w.account_number IS NULL"
+    )
+    for column in INLINE_BANK_COLUMNS:
+        op.alter_column("withdrawal_requests", column, nullable=False)
+    op.drop_column("withdrawal_requests", "payout_destination_id")
+    op.drop_table("payout_destinations")
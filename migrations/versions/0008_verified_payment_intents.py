@@ -0,0 +1,28 @@
+"""Registration payments recorded from the payment_intent.succeeded webhook
+
+Revision ID: 0008_verified_payment_intents
+Revises: 0007_payout_destinations
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0008_verified_payment_intents"
+down_revision = "0007_payout_destinations"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "verified_payment_intents",
+        sa.Column("id", sa.String, primary_key=True),
+        sa.Column("amount", sa.Integer, nullable=False),
+        sa.Column("currency", sa.String(3), nullable=False),
+        sa.Column("verified_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("consumed_at", sa.DateTime(timezone=True), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("verified_payment_intents")
@@ -0,0 +1,90 @@
+"""Composite and partial indexes for the hot list/lookup queries; drop redundant ones
+
+Adds (user_id, created_at) and (status, created_at) indexes for the per-user
+and admin lists, which filter on the first column and page by the second, and
+drops the single-column indexes they make redundant, plus the ix_<table>_id
+unique indexes that duplicated each primary key. Everything is built and dropped
+CONCURRENTLY, except on the partitioned transactions table, where each
+partition's index is built concurrently and then attached to the parent.
+`python -m app.commands.check_query_plans` checks the queries use them.
+
+Revision ID: 0010_query_indexes
+Revises: 0009_refresh_tokens
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0010_query_indexes"
+down_revision = "0009_refresh_tokens"
+branch_labels = None
+depends_on = None
+
+NEW_INDEXES = {
+    "ix_withdrawal_requests_user_id_created_at": "withdrawal_requests (user_id, created_at)",
+    "ix_withdrawal_requests_status_created_at": "withdrawal_requests (status, created_at)",
+    "ix_kyc_requests_status_created_at": "kyc_requests (status, created_at)",
+    "ix_kyc_requests_created_at": "kyc_requests (created_at)",
+    # Direct referrals, and the ON DELETE SET NULL check when a user is deleted
+    "ix_users_referrer_id": "users (referrer_id) WHERE referrer_id IS NOT NULL",
+    "ix_refresh_tokens_expires_at": "refresh_tokens (expires_at)",
+}
+
+# Redundant: duplicates of a primary key, or a prefix of a composite index above
+DROPPED_INDEXES = {
+    "ix_users_id": "users (id)",
+    "ix_kyc_requests_id": "kyc_requests (id)",
+    "ix_withdrawal_requests_id": "withdrawal_requests (id)",
+    "ix_payout_destinations_id": "payout_destinations (id)",
+    "ix_refresh_tokens_id": "refresh_tokens (id)",
+    "ix_withdrawal_requests_user_id": "withdrawal_requests (user_id)",
+    "ix_withdrawal_requests_status": "withdrawal_requests (status)",
+    # uq_payout_destinations_user_fingerprint leads with user_id
+    "ix_payout_destinations_user_id": "payout_destinations (user_id)",
+}
+UNIQUE_DROPPED = {"ix_users_id", "ix_kyc_requests_id", "ix_withdrawal_requests_id",
+                  "ix_payout_destinations_id", "ix_refresh_tokens_id"}
+
+TRANSACTIONS_INDEX = "ix_transactions_user_id_created_at"
+
+
+def _transaction_partitions(bind) -> list:
+    return bind.execute(sa.text(
+        "SELECT inhrelid::regclass::text FROM pg_inherits WHERE inhparent = 'transactions'::regclass"
+    )).scalars().all()
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    partitions = _transaction_partitions(bind)
+    # Created invalid on the parent only; it becomes valid once every partition's index is attached.
+    # Partitions created later (app/db/partitions.py) get the index automatically.
+    op.execute(f"CREATE INDEX IF NOT EXISTS {TRANSACTIONS_INDEX} ON ONLY transactions (user_id, created_at)")
+
+    with op.get_context().autocommit_block():
+        for partition in partitions:
+            name = f"{partition}_user_id_created_at_idx"
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {partition} (user_id, created_at)")
+            op.execute(f"ALTER INDEX {TRANSACTIONS_INDEX} ATTACH PARTITION {name}")
+
+        for name, target in NEW_INDEXES.items():
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {target}")
+        for name in DROPPED_INDEXES:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+
+        # Partitioned indexes cannot be dropped concurrently; this one only needs a brief lock
+        op.execute("SET lock_timeout = '5s'")
+        op.execute("DROP INDEX IF EXISTS ix_transactions_user_id")
+        op.execute("RESET lock_timeout")
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, target in DROPPED_INDEXES.items():
+            unique = "UNIQUE " if name in UNIQUE_DROPPED else ""
+            op.execute(f"CREATE {unique}INDEX CONCURRENTLY IF NOT EXISTS {name} ON {target}")
+        for name in NEW_INDEXES:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+
+    op.execute("CREATE INDEX IF NOT EXISTS ix_transactions_user_id ON transactions (user_id)")
+    op.execute(f"DROP INDEX IF EXISTS {TRANSACTIONS_INDEX}")
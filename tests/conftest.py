@@ -0,0 +1,72 @@
+# tests/conftest.py
+# Settings for the test run. Placeholder values stand in for the required
+# secrets so no .env is needed; nothing here talks to Stripe or Supabase.
+# Tests marked `postgres` run against TEST_DATABASE_URL (a disposable database
+# that is emptied by the tests) and are skipped when it is not set. Read routing
+# tests also need TEST_REPLICA_DATABASE_URL, a second disposable database that
+# stands in for a replica.
+import os
+
+import pytest
+
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+TEST_REPLICA_DATABASE_URL = os.environ.get("TEST_REPLICA_DATABASE_URL")
+
+os.environ["DATABASE_URL"] = TEST_DATABASE_URL or "postgresql+asyncpg://test@localhost/optivus_test"
+os.environ.setdefault("SUPABASE_URL", "http://storage.local")
+os.environ.setdefault("SUPABASE_KEY", "test")
+os.environ.setdefault("JWT_SECRET_KEY", "test-secret")
+os.environ.setdefault("STRIPE_SECRET_KEY", "sk_test")
+os.environ.setdefault("STRIPE_PUBLIC_KEY", "pk_test")
+os.environ.setdefault("STRIPE_WEBHOOK_SECRET", "whsec_test")
+os.environ.setdefault("PAYOUT_ENCRYPTION_KEY", "hbQ5C8fzyKX2MNZ0B5bq2pJhJmT8uNLcUJj8E4tqz6o=")
+os.environ.setdefault("PAYOUT_FINGERPRINT_KEY", "test-fingerprint-key-0123456789abcdef")
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "postgres: needs TEST_DATABASE_URL")
+    config.addinivalue_line("markers", "replica: needs TEST_DATABASE_URL and TEST_REPLICA_DATABASE_URL")
+
+
+def pytest_collection_modifyitems(config, items):
+    for item in items:
+        if "postgres" in item.keywords and not TEST_DATABASE_URL:
+            item.add_marker(pytest.mark.skip(reason="TEST_DATABASE_URL is not set"))
+        elif "replica" in item.keywords and not TEST_REPLICA_DATABASE_URL:
+            item.add_marker(pytest.mark.skip(reason="TEST_REPLICA_DATABASE_URL is not set"))
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+def fake_stripe(monkeypatch):
+    """The in-process Stripe stand-in, behind a fresh circuit on the app's stripe_provider."""
+    from app.core import stripe_client
+    from app.core.config import settings
+    from app.core.resilience import CircuitBreaker, stripe_provider
+    from benchmarks.fakes import FakeStripe
+
+    fake = FakeStripe()
+    monkeypatch.setattr(stripe_client, "_stripe", fake)
+    monkeypatch.setattr(settings, "PROVIDER_RETRY_BASE_SECONDS", 0.0)
+    monkeypatch.setattr(stripe_provider, "breaker", CircuitBreaker(
+        "stripe", settings.CIRCUIT_FAILURE_THRESHOLD, settings.CIRCUIT_RESET_SECONDS
+    ))
+    return fake
+
+
+@pytest.fixture
+async def database():
+    """The app engine on an empty schema; its connections are dropped after the test."""
+    from benchmarks.harness import reset_schema
+    from app.api.totals import _cached_totals
+    from app.db.session import engine
+
+    await reset_schema()
+    # Totals cached from an earlier test's rows
+    _cached_totals.clear()
+    yield engine
+    await engine.dispose()
@@ -0,0 +1,110 @@
+# tests/test_admin_lists.py
+# Conditional GETs and X-Total-Count on the admin lists against Postgres: the
+# list ETag must follow the requested page, and neither it nor an estimated
+# total may count the whole table.
+import uuid
+from typing import List
+
+import httpx
+import pytest
+from sqlalchemy import insert, select, update
+
+from app.core.config import settings
+from app.core.security import create_access_token
+from app.db.models.user import User
+from app.db.query_stats import QueryStats, capture_queries
+
+pytestmark = [pytest.mark.anyio, pytest.mark.postgres]
+
+PAGE = "/api/admin/users/?limit=5"
+
+
+@pytest.fixture
+async def client(database):
+    from app.main import app
+
+    async with database.begin() as conn:
+        await conn.execute(insert(User).values([
+            {
+                "id": uuid.uuid4(), "email": f"user{i}@example.com", "username": f"user{i}",
+                "password_hash": "!", "referral_code": f"CODE{i:04d}",
+                "role": "admin" if i == 0 else "user",
+            }
+            for i in range(20)
+        ]))
+    headers = {"Authorization": f"Bearer {create_access_token(subject='user0')}"}
+    async with httpx.AsyncClient(app=app, base_url="http://test", headers=headers) as client:
+        yield client
+
+
+def statements(stats: QueryStats, containing: str) -> List[str]:
+    """The statement shapes seen that contain `containing`, lowercased on one line."""
+    shapes = (" ".join(shape.lower().split()) for shape in stats.shapes)
+    return [shape for shape in shapes if containing in shape]
+
+
+async def revalidate(client, etag: str) -> httpx.Response:
+    return await client.get(PAGE, headers={"If-None-Match": etag})
+
+
+async def page_ids(database) -> List[uuid.UUID]:
+    async with database.connect() as conn:
+        return list((await conn.execute(
+            select(User.id).order_by(User.created_at.desc()).limit(5)
+        )).scalars())
+
+
+async def test_list_etag_follows_the_requested_page(client, database):
+    first = await client.get(PAGE)
+    etag = first.headers["ETag"]
+    assert (await revalidate(client, etag)).status_code == 304
+
+    on_page = await page_ids(database)
+    async with database.begin() as conn:
+        # Rows after the page do not change it
+        await conn.execute(
+            update(User).where(User.id.not_in(on_page), User.role == "user").values(first_name="Elsewhere")
+        )
+    assert (await revalidate(client, etag)).status_code == 304
+
+    async with database.begin() as conn:
+        await conn.execute(update(User).where(User.id == on_page[-1]).values(first_name="Changed"))
+    changed = await revalidate(client, etag)
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+
+
+async def test_list_etag_does_not_aggregate_the_table(client, database):
+    with capture_queries() as stats:
+        await client.get(PAGE)
+
+    assert stats.count > 0
+    assert not statements(stats, "count(") and not statements(stats, "sum(")
+
+
+async def test_estimated_total_runs_no_count(client, database):
+    with capture_queries() as stats:
+        response = await client.get(PAGE + "&count=estimated")
+
+    assert response.headers["X-Total-Count-Estimated"] == "true"
+    assert int(response.headers["X-Total-Count"]) >= 0
+    assert not statements(stats, "count(")
+
+
+async def test_exact_total_is_exact_below_the_limit(client, database):
+    response = await client.get(PAGE + "&count=exact")
+
+    assert response.headers["X-Total-Count"] == "20"
+    assert response.headers["X-Total-Count-Estimated"] == "false"
+
+
+async def test_exact_total_is_bounded(client, database, monkeypatch):
+    monkeypatch.setattr(settings, "ADMIN_COUNT_EXACT_LIMIT", 10)
+
+    with capture_queries() as stats:
+        response = await client.get(PAGE + "&count=exact")
+
+    assert response.headers["X-Total-Count-Estimated"] == "true"
+    assert int(response.headers["X-Total-Count"]) >= 11
+    counts = statements(stats, "count(")
+    assert counts and all("limit 11)" in statement for statement in counts)
@@ -0,0 +1,118 @@
+# tests/test_auth.py
+# Refresh token rotation against Postgres (spending, reuse detection, frozen
+# users, expiry) and the verified access token LRU.
+import time
+import uuid
+from datetime import timedelta
+
+import httpx
+import pytest
+from jose import JWTError
+from sqlalchemy import insert, update
+
+from app.core import security
+from app.core.security import create_access_token, decode_access_token
+from app.db.models.refresh_token import RefreshToken
+from app.db.models.user import User
+from app.db.session import AsyncSessionLocal
+from app.services.auth_service import AuthService
+
+REFRESH = "/api/users/token/refresh/"
+
+
+@pytest.fixture
+async def user_id(database):
+    user_id = uuid.uuid4()
+    async with database.begin() as conn:
+        await conn.execute(insert(User).values(
+            id=user_id, email="ada@example.com", username="ada", password_hash="!", referral_code="ADA00001"
+        ))
+    return user_id
+
+
+@pytest.fixture
+async def refresh_token(user_id):
+    async with AsyncSessionLocal() as db:
+        token = await AuthService.issue_refresh_token(db, user_id)
+        await db.commit()
+    return token
+
+
+@pytest.fixture
+async def client(database):
+    from app.main import app
+
+    async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+        yield client
+
+
+async def refresh(client, token: str) -> httpx.Response:
+    return await client.post(REFRESH, json={"refresh_token": token})
+
+
+@pytest.mark.anyio
+@pytest.mark.postgres
+async def test_refresh_spends_the_presented_token(client, refresh_token):
+    response = await refresh(client, refresh_token)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["username"] == "ada"
+    assert decode_access_token(body["access_token"])["sub"] == "ada"
+    assert body["refresh_token"] != refresh_token
+    assert (await refresh(client, body["refresh_token"])).status_code == 200
+
+
+@pytest.mark.anyio
+@pytest.mark.postgres
+async def test_reused_token_revokes_the_family(client, refresh_token, user_id):
+    newest = (await refresh(client, refresh_token)).json()["refresh_token"]
+    async with AsyncSessionLocal() as db:
+        # Another login of the same user is not affected
+        other_login = await AuthService.issue_refresh_token(db, user_id)
+        await db.commit()
+
+    replayed = await refresh(client, refresh_token)
+
+    assert replayed.status_code == 401
+    assert (await refresh(client, newest)).status_code == 401
+    assert (await refresh(client, other_login)).status_code == 200
+
+
+@pytest.mark.anyio
+@pytest.mark.postgres
+async def test_frozen_user_cannot_refresh(client, refresh_token, user_id, database):
+    async with database.begin() as conn:
+        await conn.execute(update(User).where(User.id == user_id).values(status="frozen"))
+
+    assert (await refresh(client, refresh_token)).status_code == 401
+
+
+@pytest.mark.anyio
+@pytest.mark.postgres
+async def test_expired_refresh_token_is_rejected(client, refresh_token, database):
+    async with database.begin() as conn:
+        await conn.execute(update(RefreshToken).values(expires_at=RefreshToken.expires_at - timedelta(days=365)))
+
+    assert (await refresh(client, refresh_token)).status_code == 401
+
+
+def test_decoded_payload_is_a_copy():
+    token = create_access_token("ada")
+
+    decode_access_token(token)["sub"] = "mallory"
+
+    assert decode_access_token(token)["sub"] == "ada"
+
+
+def test_expired_entry_is_evicted_not_served():
+    token = create_access_token("ada", expires_delta=timedelta(seconds=1))
+    expires = decode_access_token(token)["exp"]
+    assert token in security._verified_tokens
+
+    # jwt.decode counts whole seconds, so wait until the token is past its exp
+    time.sleep(max(0.0, expires + 1 - time.time()))
+
+    with pytest.raises(JWTError):
+        decode_access_token(token)
+    assert token not in security._verified_tokens
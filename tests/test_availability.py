@@ -0,0 +1,64 @@
+# tests/test_availability.py
+# The availability filter's top-up against Postgres: rows committed by other
+# connections must reach the filter however long their transaction ran.
+import asyncio
+import uuid
+
+import pytest
+from sqlalchemy import insert
+
+from app.core.config import settings
+from app.db.models.user import User
+from app.services import availability_service
+from app.services.availability_service import refresh_availability_filter
+
+pytestmark = [pytest.mark.anyio, pytest.mark.postgres]
+
+
+def user_row(name: str) -> dict:
+    return {
+        "id": uuid.uuid4(), "email": f"{name}@example.com", "username": name,
+        "password_hash": "!", "referral_code": uuid.uuid4().hex[:12].upper(),
+    }
+
+
+def in_filter(name: str) -> bool:
+    return availability_service._key("u", name) in availability_service._filter
+
+
+@pytest.fixture
+def no_lookback(monkeypatch):
+    # Without the margin, only the open-transaction horizon protects late commits
+    monkeypatch.setattr(settings, "AVAILABILITY_FILTER_LOOKBACK_SECONDS", 0)
+    monkeypatch.setattr(availability_service, "_filter", None)
+
+
+async def test_top_up_reads_rows_of_other_connections(database, no_lookback):
+    await refresh_availability_filter()
+    async with database.begin() as conn:
+        await conn.execute(insert(User).values(user_row("committed_later")))
+
+    await refresh_availability_filter()
+
+    assert in_filter("committed_later")
+
+
+async def test_long_transaction_does_not_fall_below_watermark(database, no_lookback):
+    await refresh_availability_filter()
+
+    async with database.connect() as importer:
+        transaction = await importer.begin()
+        # created_at = now() is this transaction's start time
+        await importer.execute(insert(User).values(user_row("slow_import")))
+        await asyncio.sleep(0.2)
+        # Passes while the import is open see nothing, but must not move past its start
+        await refresh_availability_filter()
+        async with database.begin() as conn:
+            await conn.execute(insert(User).values(user_row("quick_signup")))
+        await refresh_availability_filter()
+        assert in_filter("quick_signup")
+        await transaction.commit()
+
+    await refresh_availability_filter()
+
+    assert in_filter("slow_import")
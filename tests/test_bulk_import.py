@@ -0,0 +1,41 @@
+# tests/test_bulk_import.py
+# Parsing of bulk-import files: every malformed row is reported as a 400, never a 500.
+import pytest
+from fastapi import HTTPException
+
+from app.services.bulk_import_service import BulkImportService
+
+VALID = b'{"email": "alice@example.com", "username": "alice", "password_hash": "$2b$12$abc"}'
+
+
+def parse_errors(content: bytes, fmt: str = "ndjson") -> list:
+    with pytest.raises(HTTPException) as raised:
+        BulkImportService.parse(content, fmt)
+    assert raised.value.status_code == 400
+    return raised.value.detail["errors"]
+
+
+def test_valid_ndjson_rows_parse():
+    rows = BulkImportService.parse(VALID + b"\n\n" + VALID.replace(b"alice", b"bob"), "ndjson")
+
+    assert [row.username for row in rows] == ["alice", "bob"]
+
+
+def test_ndjson_lines_that_are_not_objects_are_row_errors():
+    errors = parse_errors(b'[1, 2]\n"x"\n' + VALID + b"\n{broken\n")
+
+    assert errors == [
+        "row 1: expected a JSON object",
+        "row 2: expected a JSON object",
+        "row 4: invalid JSON: Expecting property name enclosed in double quotes (column 2)",
+    ]
+
+
+@pytest.mark.parametrize("fmt, content", [
+    ("ndjson", b'{"email": "\xff"}'),
+    ("csv", b"email,username,password_hash\n\xe9,alice,x\n"),
+])
+def test_non_utf8_input_is_rejected(fmt, content):
+    errors = parse_errors(content, fmt)
+
+    assert errors[0].startswith("unreadable input: not UTF-8")
@@ -0,0 +1,99 @@
+# tests/test_kyc_claims.py
+# The KYC review queue against Postgres: concurrent reviewers receive disjoint
+# requests, reloading the queue renews a reviewer's own leases and a lapsed
+# lease returns its request to the queue.
+import asyncio
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import insert, select, update
+
+from app.db.models.kyc_request import KycRequest
+from app.db.models.user import User
+from app.db.session import AsyncSessionLocal
+from app.services.kyc_review_service import KycReviewService
+from app.utils import supabase_storage
+from benchmarks.fakes import FakeSupabase
+
+pytestmark = [pytest.mark.anyio, pytest.mark.postgres]
+
+PENDING = 4
+DOCUMENTS = "http://storage.local/storage/v1/object/public/kyc-documents"
+
+
+@pytest.fixture
+async def reviewers(database, monkeypatch):
+    """Two reviewer ids, with PENDING requests waiting in the queue."""
+    monkeypatch.setattr(supabase_storage, "_supabase", FakeSupabase())
+    reviewer_ids = [uuid.uuid4(), uuid.uuid4()]
+    applicant_ids = [uuid.uuid4() for _ in range(PENDING)]
+    created = datetime.now(timezone.utc) - timedelta(hours=1)
+    async with database.begin() as conn:
+        await conn.execute(insert(User).values([
+            {
+                "id": user_id, "email": f"user{i}@example.com", "username": f"user{i}",
+                "password_hash": "!", "referral_code": f"CODE{i:04d}",
+                "role": "admin" if user_id in reviewer_ids else "user",
+            }
+            for i, user_id in enumerate(reviewer_ids + applicant_ids)
+        ]))
+        await conn.execute(insert(KycRequest).values([
+            {
+                "user_id": user_id, "created_at": created + timedelta(minutes=i),
+                "document_front_url": f"{DOCUMENTS}/{user_id}/front.jpg",
+                "selfie_url": f"{DOCUMENTS}/{user_id}/selfie.jpg",
+            }
+            for i, user_id in enumerate(applicant_ids)
+        ]))
+    return reviewer_ids
+
+
+async def claim(reviewer_id: uuid.UUID, limit: int):
+    async with AsyncSessionLocal() as db:
+        return await KycReviewService.claim(db, reviewer_id, limit)
+
+
+async def leases(reviewer_id: uuid.UUID) -> dict:
+    async with AsyncSessionLocal() as db:
+        return dict((await db.execute(
+            select(KycRequest.id, KycRequest.claim_expires_at).where(KycRequest.claimed_by == reviewer_id)
+        )).all())
+
+
+async def test_concurrent_claims_are_disjoint(reviewers):
+    first, second = await asyncio.gather(claim(reviewers[0], 3), claim(reviewers[1], 3))
+
+    first_ids = {request.id for request in first}
+    second_ids = {request.id for request in second}
+    assert not first_ids & second_ids
+    assert len(first_ids | second_ids) == PENDING
+    assert set(await leases(reviewers[0])) == first_ids
+    assert all(request.document_front_signed_url and request.selfie_signed_url for request in first + second)
+
+
+async def test_repeat_claim_renews_own_lease(reviewers):
+    claimed = await claim(reviewers[0], 2)
+    before = await leases(reviewers[0])
+
+    reclaimed = await claim(reviewers[0], 2)
+
+    # The oldest requests are the reviewer's own, so the same ones come back
+    assert [request.id for request in reclaimed] == [request.id for request in claimed]
+    after = await leases(reviewers[0])
+    assert all(after[request_id] > before[request_id] for request_id in before)
+
+
+async def test_expired_claim_returns_to_the_queue(reviewers, database):
+    claimed = {request.id for request in await claim(reviewers[0], PENDING)}
+    assert await claim(reviewers[1], PENDING) == []
+
+    async with database.begin() as conn:
+        await conn.execute(
+            update(KycRequest)
+            .where(KycRequest.claimed_by == reviewers[0])
+            .values(claim_expires_at=datetime.now(timezone.utc) - timedelta(minutes=1))
+        )
+
+    assert {request.id for request in await claim(reviewers[1], PENDING)} == claimed
+    assert await leases(reviewers[0]) == {}
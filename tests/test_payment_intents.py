@@ -0,0 +1,113 @@
+# tests/test_payment_intents.py
+# Claiming registration payments against Postgres: an intent pays for one
+# account only, whether the webhook recorded it or Stripe was asked on a miss,
+# and a registration that fails leaves it available.
+import asyncio
+import threading
+import uuid
+
+import httpx
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import insert, select
+
+from app.db.models.user import User
+from app.db.models.verified_payment_intent import VerifiedPaymentIntent
+from app.db.session import AsyncSessionLocal
+from app.services.payment_intent_service import PaymentIntentService
+
+pytestmark = [pytest.mark.anyio, pytest.mark.postgres]
+
+AMOUNT = 5000
+INTENT = "pi_registration"
+
+
+async def record(amount: int = AMOUNT, currency: str = "gbp") -> None:
+    """What the payment_intent.succeeded webhook does."""
+    async with AsyncSessionLocal() as db:
+        await PaymentIntentService.record_succeeded(db, INTENT, amount, currency)
+
+
+async def claim() -> None:
+    """consume() committed, as a registration that went through."""
+    async with AsyncSessionLocal() as db:
+        await PaymentIntentService.consume(db, INTENT, expected_amount=AMOUNT)
+        await db.commit()
+
+
+async def consumed_at():
+    async with AsyncSessionLocal() as db:
+        return (await db.execute(
+            select(VerifiedPaymentIntent.consumed_at).where(VerifiedPaymentIntent.id == INTENT)
+        )).scalar_one()
+
+
+async def test_webhook_recorded_intent_is_consumed_once(database, fake_stripe):
+    await record()
+
+    await claim()
+    assert await consumed_at() is not None
+
+    with pytest.raises(HTTPException) as raised:
+        await claim()
+    assert (raised.value.status_code, raised.value.detail) == (400, "Payment already used")
+    # Both answered from the table
+    assert "PaymentIntent.retrieve" not in fake_stripe.calls
+
+
+@pytest.mark.parametrize("amount, currency", [(AMOUNT - 1, "gbp"), (AMOUNT, "usd")])
+async def test_mismatched_payment_is_rejected(database, amount, currency):
+    await record(amount, currency)
+
+    with pytest.raises(HTTPException) as raised:
+        await claim()
+
+    assert (raised.value.status_code, raised.value.detail) == (400, "Invalid or unsuccessful payment")
+    assert await consumed_at() is None
+
+
+async def test_stripe_fallback_and_webhook_race_has_one_winner(database, fake_stripe):
+    asked = []
+    answer = threading.Event()
+    retrieve = fake_stripe.PaymentIntent.retrieve
+
+    def slow_retrieve(payment_intent_id, **kwargs):
+        asked.append(payment_intent_id)
+        answer.wait(5)
+        return retrieve(payment_intent_id, **kwargs)
+    fake_stripe.PaymentIntent.retrieve = slow_retrieve
+
+    # Two confirms miss the table and ask Stripe...
+    claims = asyncio.gather(claim(), claim(), return_exceptions=True)
+    while len(asked) < 2:
+        await asyncio.sleep(0.01)
+    # ...and the webhook records the intent before Stripe answers them
+    await record()
+    answer.set()
+    results = await claims
+
+    rejected = [result for result in results if isinstance(result, HTTPException)]
+    assert len(rejected) == 1
+    assert rejected[0].detail == "Payment already used"
+    assert await consumed_at() is not None
+
+
+async def test_failed_registration_leaves_the_payment_unconsumed(database):
+    from app.main import app
+
+    async with database.begin() as conn:
+        await conn.execute(insert(User).values(
+            id=uuid.uuid4(), email="taken@example.com", username="taken", password_hash="!",
+            referral_code="TAKEN001"
+        ))
+    await record()
+    registration = {"username": "newcomer", "password": "correct horse", "payment_intent_id": INTENT}
+
+    async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+        failed = await client.post("/api/users/register/confirm/", json={**registration, "email": "taken@example.com"})
+        assert failed.status_code == 400
+        assert await consumed_at() is None
+
+        retried = await client.post("/api/users/register/confirm/", json={**registration, "email": "new@example.com"})
+    assert retried.status_code == 201
+    assert await consumed_at() is not None
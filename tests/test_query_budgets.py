@@ -0,0 +1,88 @@
+# tests/test_query_budgets.py
+# Query budgets for the hot paths: the endpoints report their statement count
+# in X-DB-Query-Count (SQL_STATS_HEADERS) and service calls are counted with
+# assert_max_queries, so a change that adds queries per request fails here.
+import uuid
+
+import httpx
+import pytest
+from sqlalchemy import create_engine, insert, text
+
+from app.core.config import settings
+from app.core.security import create_access_token
+from app.db.models.user import User
+from app.db.query_stats import assert_max_queries, assert_query_budget, capture_queries, install_query_hooks
+from app.db.session import AsyncSessionLocal
+from app.services.commission_service import CommissionService
+
+LEVELS = len(CommissionService.COMMISSION_RATES)
+
+
+@pytest.fixture
+async def upline(database):
+    """A referral chain one longer than the commission levels. Returns ids from the newest user up."""
+    ids = [uuid.uuid4() for _ in range(LEVELS + 2)]
+    async with database.begin() as conn:
+        # Inserted from the top of the chain down so every referrer exists first
+        for i in reversed(range(len(ids))):
+            await conn.execute(insert(User).values(
+                id=ids[i], email=f"user{i}@example.com", username=f"user{i}", password_hash="!",
+                referral_code=f"CODE{i:04d}", role="admin" if i == 0 else "user",
+                referrer_id=ids[i + 1] if i + 1 < len(ids) else None
+            ))
+    return ids
+
+
+@pytest.fixture
+async def client(upline, monkeypatch):
+    from app.main import app
+
+    monkeypatch.setattr(settings, "SQL_STATS_HEADERS", True)
+    headers = {"Authorization": f"Bearer {create_access_token(subject='user0')}"}
+    async with httpx.AsyncClient(app=app, base_url="http://test", headers=headers) as client:
+        yield client
+
+
+def test_repeated_reports_n_plus_one_shape():
+    engine = create_engine("sqlite://")
+    install_query_hooks(engine)
+
+    with engine.connect() as conn, capture_queries() as stats:
+        for user_id in range(6):
+            conn.execute(text("SELECT :id"), {"id": user_id})
+        conn.execute(text("SELECT 1"))
+
+    assert stats.count == 7
+    assert stats.repeated(5) == [("SELECT ?", 6)]
+    assert stats.repeated(7) == []
+
+
+@pytest.mark.anyio
+@pytest.mark.postgres
+@pytest.mark.parametrize("method, path, body, budget", [
+    # get_current_user finds a username in one lookup
+    ("GET", "/api/users/me/", None, 1),
+    # The user, the row to update, the UPDATE and its refresh
+    ("PUT", "/api/users/me/", {"first_name": "Ada"}, 4),
+    # The user, the page ETag and the page; an exact total adds one bounded count
+    ("GET", "/api/admin/users/?limit=5", None, 3),
+    ("GET", "/api/admin/users/?limit=5&count=exact", None, 4),
+    ("GET", "/api/withdrawals/", None, 3),
+])
+async def test_endpoint_query_budget(client, method, path, body, budget):
+    response = await client.request(method, path, json=body)
+
+    assert response.status_code == 200, response.text
+    assert_query_budget(response, budget)
+
+
+@pytest.mark.anyio
+@pytest.mark.postgres
+async def test_registration_commission_query_budget(upline):
+    async with AsyncSessionLocal() as db:
+        # The new user, then per level: the referrer, its counters, the commission row and its refresh
+        with assert_max_queries(1 + 4 * LEVELS) as stats:
+            await CommissionService.distribute_registration_commission(db, upline[0])
+
+    # Stops at the last paid level although the chain goes on
+    assert stats.count == 1 + 4 * LEVELS
@@ -0,0 +1,38 @@
+# tests/test_query_plans.py
+# app/commands/check_query_plans.py against the schema the models create: every
+# hot statement must be served by the index meant for it.
+import pytest
+from sqlalchemy import text
+
+from app.commands.check_query_plans import HOT_QUERIES, check_plans
+from app.db.models.withdrawal_request import WithdrawalRequest
+from app.db.session import AsyncSessionLocal
+
+pytestmark = [pytest.mark.anyio, pytest.mark.postgres]
+
+
+async def test_hot_queries_use_their_indexes(database):
+    async with AsyncSessionLocal() as session:
+        report = await check_plans(session)
+
+    assert set(report) == set(HOT_QUERIES)
+    assert {name: result["problems"] for name, result in report.items() if not result["ok"]} == {}
+
+
+async def test_missing_index_is_reported(database):
+    index = next(
+        index for index in WithdrawalRequest.__table__.indexes
+        if index.name == "ix_withdrawal_requests_user_id_created_at"
+    )
+    async with database.begin() as conn:
+        await conn.execute(text(f"DROP INDEX {index.name}"))
+    try:
+        async with AsyncSessionLocal() as session:
+            report = await check_plans(session)
+    finally:
+        # create_all (see reset_schema) does not add indexes to an existing table
+        async with database.begin() as conn:
+            await conn.run_sync(index.create)
+
+    assert not report["user_withdrawals"]["ok"]
+    assert report["login_by_username"]["ok"]
@@ -0,0 +1,116 @@
+# tests/test_read_routing.py
+# Read-your-writes routing against two Postgres databases, the second standing
+# in for a replica: the write marker must travel with the client, so any worker
+# (or a fresh process) keeps that client's reads on the primary.
+import time
+import uuid
+
+import httpx
+import pytest
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core.config import settings
+from app.core.security import create_access_token
+from app.db.models.user import User
+from app.db.routing import READ_YOUR_WRITES_COOKIE
+from tests.conftest import TEST_REPLICA_DATABASE_URL
+
+pytestmark = [pytest.mark.anyio, pytest.mark.postgres, pytest.mark.replica]
+
+ADMIN_ID = uuid.uuid4()
+MEMBER_ID = uuid.uuid4()
+
+
+def seed_users(first_name: str):
+    return insert(User).values([
+        {
+            "id": ADMIN_ID, "email": "admin@example.com", "username": "admin",
+            "password_hash": "!", "referral_code": "ADMIN001", "role": "admin", "first_name": first_name,
+        },
+        {
+            "id": MEMBER_ID, "email": "member@example.com", "username": "member",
+            "password_hash": "!", "referral_code": "MEMBER01", "role": "user", "first_name": first_name,
+        },
+    ])
+
+
+@pytest.fixture
+async def replica(database, monkeypatch):
+    from benchmarks.harness import reset_schema
+    from app.api import deps
+    from app.db import routing
+
+    replica_engine = create_async_engine(TEST_REPLICA_DATABASE_URL)
+    await reset_schema(replica_engine)
+    async with database.begin() as conn:
+        await conn.execute(seed_users("Primary"))
+    async with replica_engine.begin() as conn:
+        await conn.execute(seed_users("Replica"))
+
+    monkeypatch.setattr(routing, "replica_engine", replica_engine)
+    monkeypatch.setattr(routing, "_lag_checked_at", 0.0)
+    monkeypatch.setattr(deps, "ReplicaSessionLocal", async_sessionmaker(
+        bind=replica_engine, class_=AsyncSession, expire_on_commit=False, autoflush=False
+    ))
+    yield replica_engine
+    await replica_engine.dispose()
+
+
+def new_client() -> httpx.AsyncClient:
+    # Wrapped the way app/main.py does when DATABASE_REPLICA_URL is set
+    from app.api.middleware import ReadYourWritesMiddleware
+    from app.main import app
+
+    headers = {"Authorization": f"Bearer {create_access_token(subject='admin')}"}
+    return httpx.AsyncClient(app=ReadYourWritesMiddleware(app), base_url="http://test", headers=headers)
+
+
+async def served_by(client: httpx.AsyncClient, **kwargs) -> str:
+    response = await client.get("/api/admin/users/", **kwargs)
+    assert response.status_code == 200
+    member = next(user for user in response.json() if user["username"] == "member")
+    return member["first_name"].lower()
+
+
+async def freeze_member(client: httpx.AsyncClient) -> httpx.Response:
+    response = await client.patch(f"/api/admin/users/{MEMBER_ID}/status", json={"status": "frozen"})
+    assert response.status_code == 200
+    return response
+
+
+async def test_reads_use_the_replica_without_a_recent_write(replica):
+    async with new_client() as client:
+        assert await served_by(client) == "replica"
+        # Reads do not set the marker
+        assert READ_YOUR_WRITES_COOKIE not in client.cookies
+
+
+async def test_write_pins_the_clients_reads_to_the_primary(replica):
+    async with new_client() as client:
+        response = await freeze_member(client)
+        assert READ_YOUR_WRITES_COOKIE in response.cookies
+
+        assert await served_by(client) == "primary"
+
+
+async def test_write_marker_travels_with_the_client(replica):
+    async with new_client() as writer:
+        marker = (await freeze_member(writer)).cookies[READ_YOUR_WRITES_COOKIE]
+
+    # Nothing is remembered server side: another client still reads the replica,
+    # and any client presenting the marker reads the primary
+    async with new_client() as other:
+        assert await served_by(other) == "replica"
+    async with new_client() as same:
+        assert await served_by(same, cookies={READ_YOUR_WRITES_COOKIE: marker}) == "primary"
+
+
+@pytest.mark.parametrize("marker", [
+    lambda: f"{time.time() - settings.READ_YOUR_WRITES_SECONDS - 1:.3f}",
+    lambda: f"{time.time() + 3600:.3f}",
+    lambda: "not-a-time",
+])
+async def test_expired_or_forged_markers_are_ignored(replica, marker):
+    async with new_client() as client:
+        assert await served_by(client, cookies={READ_YOUR_WRITES_COOKIE: marker()}) == "replica"
@@ -0,0 +1,214 @@
+# tests/test_resilience.py
+# The provider guards in app/core/resilience.py, driven through the in-process
+# Stripe and Supabase stand-ins with injected latency and errors.
+import asyncio
+
+import httpx
+import pytest
+from storage3.utils import StorageException
+
+from app.core.config import settings
+from app.core.resilience import (
+    Provider, ProviderTimeout, ProviderUnavailable, _storage_transient, _stripe_transient
+)
+from benchmarks.fakes import FakeStripe, FakeSupabase, FaultConfig
+
+pytestmark = pytest.mark.anyio
+
+THRESHOLD = 3
+RESET_SECONDS = 30.0
+
+
+@pytest.fixture(autouse=True)
+def fast_retries(monkeypatch):
+    monkeypatch.setattr(settings, "PROVIDER_RETRY_BASE_SECONDS", 0.0)
+    monkeypatch.setattr(settings, "PROVIDER_BULKHEAD_WAIT_SECONDS", 0.05)
+    monkeypatch.setattr(settings, "CIRCUIT_FAILURE_THRESHOLD", THRESHOLD)
+    monkeypatch.setattr(settings, "CIRCUIT_RESET_SECONDS", RESET_SECONDS)
+
+
+@pytest.fixture
+def provider(fake_stripe):
+    return Provider("stripe", max_concurrent=2, timeout=0.5, is_transient=_stripe_transient)
+
+
+async def fail_until_open(provider: Provider, fake_stripe: FakeStripe) -> None:
+    fake_stripe.faults = FaultConfig(error_rate=1.0)
+    for _ in range(THRESHOLD):
+        with pytest.raises(fake_stripe.error.APIConnectionError):
+            await provider.call(fake_stripe.PaymentIntent.create, amount=5000, currency="gbp")
+    assert provider.breaker.state == "open"
+
+
+def expire_open_window(provider: Provider) -> None:
+    provider.breaker.opened_at -= RESET_SECONDS
+
+
+async def test_open_circuit_fails_fast_with_retry_after(provider, fake_stripe):
+    await fail_until_open(provider, fake_stripe)
+    calls = dict(fake_stripe.calls)
+
+    with pytest.raises(ProviderUnavailable) as raised:
+        await provider.call(fake_stripe.PaymentIntent.create, amount=5000, currency="gbp")
+
+    assert raised.value.status_code == 503
+    assert 1 <= int(raised.value.headers["Retry-After"]) <= RESET_SECONDS
+    assert fake_stripe.calls == calls
+    assert provider.counters["rejected_open"] == 1
+
+
+async def test_trial_call_closes_circuit(provider, fake_stripe):
+    await fail_until_open(provider, fake_stripe)
+    expire_open_window(provider)
+    fake_stripe.faults = FaultConfig()
+    states = []
+
+    def trial():
+        states.append(provider.breaker.state)
+        return fake_stripe.PaymentIntent.retrieve("pi_trial")
+
+    await provider.call(trial)
+
+    assert states == ["half_open"]
+    assert provider.breaker.state == "closed"
+    assert provider.breaker.consecutive_failures == 0
+
+
+async def test_failed_trial_call_reopens_circuit(provider, fake_stripe):
+    await fail_until_open(provider, fake_stripe)
+    expire_open_window(provider)
+
+    with pytest.raises(fake_stripe.error.APIConnectionError):
+        await provider.call(fake_stripe.PaymentIntent.retrieve, "pi_trial")
+
+    assert provider.breaker.state == "open"
+    assert provider.breaker.retry_after() > RESET_SECONDS - 1
+
+
+async def test_half_open_admits_a_single_trial_call(provider, fake_stripe):
+    await fail_until_open(provider, fake_stripe)
+    expire_open_window(provider)
+    fake_stripe.faults = FaultConfig(latency_ms=100)
+
+    results = await asyncio.gather(
+        provider.call(fake_stripe.PaymentIntent.retrieve, "pi_a"),
+        provider.call(fake_stripe.PaymentIntent.retrieve, "pi_b"),
+        return_exceptions=True
+    )
+
+    assert sum(isinstance(result, ProviderUnavailable) for result in results) == 1
+    assert provider.breaker.state == "closed"
+
+
+async def test_late_failures_do_not_extend_open_window(provider, fake_stripe):
+    await fail_until_open(provider, fake_stripe)
+    opened_at = provider.breaker.opened_at
+
+    # Calls that were already in flight when the circuit opened
+    for _ in range(5):
+        provider.breaker.record_failure()
+
+    assert provider.breaker.state == "open"
+    assert provider.breaker.opened_at == opened_at
+
+
+async def test_full_bulkhead_rejects_with_503(fake_stripe):
+    provider = Provider("stripe", max_concurrent=1, timeout=1.0, is_transient=_stripe_transient)
+    fake_stripe.faults = FaultConfig(latency_ms=300)
+
+    slow = asyncio.create_task(provider.call(fake_stripe.PaymentIntent.retrieve, "pi_slow"))
+    await asyncio.sleep(0.01)
+    with pytest.raises(ProviderUnavailable) as raised:
+        await provider.call(fake_stripe.PaymentIntent.retrieve, "pi_rejected")
+    await slow
+
+    assert raised.value.status_code == 503
+    assert raised.value.reason == "too many concurrent calls"
+    assert "Retry-After" in raised.value.headers
+    assert provider.counters["rejected_bulkhead"] == 1
+    assert fake_stripe.calls["PaymentIntent.retrieve"] == 1
+    # A full bulkhead is not a provider failure
+    assert provider.breaker.consecutive_failures == 0
+
+
+async def test_slow_call_times_out_with_504(provider, fake_stripe):
+    fake_stripe.faults = FaultConfig(latency_ms=300)
+
+    with pytest.raises(ProviderTimeout) as raised:
+        await provider.call(fake_stripe.PaymentIntent.create, amount=5000, currency="gbp", timeout=0.05)
+
+    assert raised.value.status_code == 504
+    assert provider.counters["timeouts"] == 1
+    assert provider.breaker.consecutive_failures == 1
+
+
+async def test_non_idempotent_calls_are_never_retried(provider, fake_stripe):
+    fake_stripe.faults = FaultConfig(error_rate=1.0)
+
+    with pytest.raises(fake_stripe.error.APIConnectionError):
+        await provider.call(fake_stripe.PaymentIntent.create, amount=5000, currency="gbp")
+    fake_stripe.faults = FaultConfig(latency_ms=200)
+    with pytest.raises(ProviderTimeout):
+        await provider.call(fake_stripe.PaymentIntent.create, amount=5000, currency="gbp", timeout=0.05)
+
+    assert fake_stripe.calls["PaymentIntent.create"] == 2
+    assert provider.counters["retries"] == 0
+
+
+async def test_idempotent_calls_are_retried(provider, fake_stripe):
+    fake_stripe.faults = FaultConfig(error_rate=1.0)
+
+    with pytest.raises(fake_stripe.error.APIConnectionError):
+        await provider.call(fake_stripe.PaymentIntent.retrieve, "pi_retried", idempotent=True)
+
+    assert fake_stripe.calls["PaymentIntent.retrieve"] == 1 + settings.PROVIDER_MAX_RETRIES
+    assert provider.counters["retries"] == settings.PROVIDER_MAX_RETRIES
+
+
+async def test_provider_answers_do_not_count_as_failures(provider, fake_stripe):
+    def declined():
+        raise fake_stripe.error.CardError("Your card was declined", param=None, code="card_declined")
+
+    for _ in range(THRESHOLD + 1):
+        with pytest.raises(fake_stripe.error.CardError):
+            await provider.call(declined, idempotent=True)
+
+    assert provider.breaker.state == "closed"
+    assert provider.counters["retries"] == 0
+
+
+def test_storage_errors_are_classified_by_status():
+    assert _storage_transient(httpx.ConnectError("connection refused"))
+    assert _storage_transient(httpx.ReadTimeout("timed out"))
+    assert _storage_transient(StorageException({"statusCode": 503, "error": "Service Unavailable"}))
+    assert not _storage_transient(StorageException({"statusCode": 404, "error": "not_found"}))
+    assert not _storage_transient(StorageException({"statusCode": 409, "error": "Duplicate"}))
+    assert not _storage_transient(StorageException("No token sent by the API"))
+
+
+async def test_missing_objects_do_not_open_storage_circuit():
+    storage = FakeSupabase()
+    provider = Provider("storage", max_concurrent=2, timeout=0.5, is_transient=_storage_transient)
+
+    def remove_missing(paths):
+        storage._call("remove")
+        raise StorageException({"statusCode": 404, "error": "not_found", "message": "Object not found"})
+
+    for _ in range(THRESHOLD * 2):
+        with pytest.raises(StorageException):
+            await provider.call(remove_missing, ["gone.png"], idempotent=True)
+
+    assert provider.breaker.state == "closed"
+    # Not retried either: a 404 will not change on a second attempt
+    assert storage.calls["remove"] == THRESHOLD * 2
+
+
+async def test_storage_outage_opens_storage_circuit():
+    storage = FakeSupabase(FaultConfig(error_rate=1.0))
+    provider = Provider("storage", max_concurrent=2, timeout=0.5, is_transient=_storage_transient)
+
+    for _ in range(THRESHOLD):
+        with pytest.raises(httpx.ConnectError):
+            await provider.call(storage.from_("kyc-documents").upload, path="a.png", file=b"x")
+
+    assert provider.breaker.state == "open"
@@ -0,0 +1,48 @@
+# tests/test_security.py
+# Saved bank details: Fernet key rotation, the separately keyed fingerprint and
+# the startup check on the configured keys.
+import pytest
+from cryptography.fernet import Fernet
+from pydantic import ValidationError
+
+from app.core.config import Settings, settings
+from app.core.security import bank_account_fingerprint, decrypt_bank_detail, encrypt_bank_detail
+
+
+def test_rotated_encryption_key_keeps_fingerprints_and_old_ciphertext(monkeypatch):
+    old_key = settings.PAYOUT_ENCRYPTION_KEY
+    token = encrypt_bank_detail("12345678")
+    fingerprint = bank_account_fingerprint("12345678", "Ada Lovelace")
+
+    new_key = Fernet.generate_key().decode()
+    monkeypatch.setattr(settings, "PAYOUT_ENCRYPTION_KEY", f"{new_key},{old_key}")
+
+    assert decrypt_bank_detail(token) == "12345678"
+    assert Fernet(new_key).decrypt(encrypt_bank_detail("87654321").encode()) == b"87654321"
+    assert bank_account_fingerprint(" 12345678 ", "ada lovelace") == fingerprint
+
+
+def test_fingerprint_depends_on_fingerprint_key(monkeypatch):
+    fingerprint = bank_account_fingerprint("12345678", "Ada Lovelace")
+    monkeypatch.setattr(settings, "PAYOUT_FINGERPRINT_KEY", "another-fingerprint-key-0123456789abcdef")
+
+    assert bank_account_fingerprint("12345678", "Ada Lovelace") != fingerprint
+
+
+@pytest.mark.parametrize("name, value", [
+    ("PAYOUT_ENCRYPTION_KEY", "not-a-fernet-key"),
+    ("PAYOUT_ENCRYPTION_KEY", f"{Fernet.generate_key().decode()},not-a-fernet-key"),
+    ("PAYOUT_FINGERPRINT_KEY", "short"),
+])
+def test_invalid_payout_keys_fail_at_startup(monkeypatch, name, value):
+    monkeypatch.setenv(name, value)
+
+    with pytest.raises(ValidationError):
+        Settings(_env_file=None)
+
+
+def test_payout_keys_are_required(monkeypatch):
+    monkeypatch.delenv("PAYOUT_FINGERPRINT_KEY")
+
+    with pytest.raises(ValidationError):
+        Settings(_env_file=None)
@@ -0,0 +1,207 @@
+# tests/test_withdrawals.py
+# The withdrawal payout flow against Postgres and the Stripe stand-in: reserve,
+# pay out, then finalize or compensate, and the recovery job for requests whose
+# payout was never confirmed.
+import asyncio
+import time
+import uuid
+from decimal import Decimal
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import insert, select, text
+
+from app.core.config import settings
+from app.core.resilience import stripe_provider
+from app.core.security import get_password_hash
+from app.db.models.transaction import Transaction
+from app.db.models.user import User
+from app.db.models.withdrawal_request import WithdrawalRequest
+from app.db.session import AsyncSessionLocal
+from app.schemas.withdrawal_request import WithdrawalRequestCreate
+from app.services.withdrawal_service import WithdrawalService
+
+pytestmark = [pytest.mark.anyio, pytest.mark.postgres]
+
+PIN = "4321"
+
+
+@pytest.fixture
+async def user_id(database):
+    user_id = uuid.uuid4()
+    async with database.begin() as conn:
+        await conn.execute(insert(User).values(
+            id=user_id, email="payee@example.com", username="payee", password_hash="!",
+            referral_code="PAYEE001", role="user", status="active", withdrawal_status="active",
+            is_kyc_verified=True, pin_hash=get_password_hash(PIN), balance=Decimal("100.00")
+        ))
+    return user_id
+
+
+async def withdraw(user_id: uuid.UUID, amount: str = "40.00") -> WithdrawalRequest:
+    async with AsyncSessionLocal() as db:
+        return await WithdrawalService.create_withdrawal(db, WithdrawalRequestCreate(
+            user_id=user_id, amount=amount, pin=PIN,
+            bank_name="Bank", account_number="12345678", account_name="Ada Payee"
+        ), user_id)
+
+
+async def state(user_id: uuid.UUID, withdrawal_id: uuid.UUID):
+    """(withdrawal status, balance, pending_withdrawals, total_withdrawn, transaction status)"""
+    async with AsyncSessionLocal() as db:
+        withdrawal = await db.get(WithdrawalRequest, withdrawal_id)
+        user = await db.get(User, user_id)
+        tx_status = (await db.execute(
+            select(Transaction.status).where(Transaction.id == withdrawal.transaction_id)
+        )).scalar_one()
+        return withdrawal.status, user.balance, user.pending_withdrawals, user.total_withdrawn, tx_status
+
+
+async def make_stuck(*withdrawal_ids: uuid.UUID, created_hours_ago: float = 0) -> None:
+    """Age requests past WITHDRAWAL_RECOVERY_AGE_SECONDS, as if their worker had died."""
+    async with AsyncSessionLocal() as db:
+        await db.execute(
+            text("""
+                UPDATE withdrawal_requests
+                SET updated_at = now() - make_interval(secs => :age),
+                    created_at = now() - make_interval(hours => :hours)
+                WHERE id = ANY(:ids)
+            """),
+            {"age": settings.WITHDRAWAL_RECOVERY_AGE_SECONDS + 60, "hours": created_hours_ago, "ids": list(withdrawal_ids)}
+        )
+        await db.commit()
+
+
+def fail_payouts(fake_stripe, error: Exception):
+    """Make every payout raise `error`. Returns the working Payout.create."""
+    working = fake_stripe.Payout.create
+
+    def create(**kwargs):
+        fake_stripe.calls["Payout.create"] = fake_stripe.calls.get("Payout.create", 0) + 1
+        raise error
+    fake_stripe.Payout.create = create
+    return working
+
+
+async def test_payout_moves_balance_to_pending_once(user_id, fake_stripe):
+    withdrawal = await withdraw(user_id)
+
+    assert await state(user_id, withdrawal.id) == (
+        "processing", Decimal("60.00"), Decimal("40.00"), Decimal("0.00"), "processing"
+    )
+    assert fake_stripe.calls["Payout.create"] == 1
+    async with AsyncSessionLocal() as db:
+        stored = await db.get(WithdrawalRequest, withdrawal.id)
+    assert stored.stripe_payout_id.startswith("po_")
+    assert stored.payout_destination_id is not None
+
+
+async def test_stripe_rejection_compensates_once(user_id, fake_stripe):
+    fail_payouts(fake_stripe, fake_stripe.error.InvalidRequestError("No such destination", param="destination"))
+
+    with pytest.raises(HTTPException) as raised:
+        await withdraw(user_id)
+    assert raised.value.status_code == 502
+
+    async with AsyncSessionLocal() as db:
+        withdrawal_id = (await db.execute(select(WithdrawalRequest.id))).scalar_one()
+        # A second compensation (e.g. a racing recovery) finds nothing left to refund
+        await WithdrawalService._compensate(db, withdrawal_id)
+
+    assert await state(user_id, withdrawal_id) == (
+        "failed", Decimal("100.00"), Decimal("0.00"), Decimal("0.00"), "failed"
+    )
+    # Rejections are answers, not outages: never retried
+    assert fake_stripe.calls["Payout.create"] == 1
+
+
+@pytest.mark.parametrize("outcome", ["connection_error", "timeout"])
+async def test_unconfirmed_payout_stays_reserved(user_id, fake_stripe, monkeypatch, outcome):
+    if outcome == "connection_error":
+        fail_payouts(fake_stripe, fake_stripe.error.APIConnectionError("connection reset"))
+    else:
+        monkeypatch.setattr(stripe_provider, "timeout", 0.05)
+        create = fake_stripe.Payout.create
+
+        def slow_create(**kwargs):
+            time.sleep(0.2)
+            return create(**kwargs)
+        fake_stripe.Payout.create = slow_create
+
+    withdrawal = await withdraw(user_id)
+
+    assert withdrawal.status == "pending_payout"
+    assert await state(user_id, withdrawal.id) == (
+        "pending_payout", Decimal("60.00"), Decimal("40.00"), Decimal("0.00"), "processing"
+    )
+
+
+async def test_recovery_workers_never_lease_the_same_request(user_id, fake_stripe, monkeypatch):
+    # Setting up four stuck requests would otherwise open the circuit
+    monkeypatch.setattr(stripe_provider.breaker, "failure_threshold", 100)
+    working = fail_payouts(fake_stripe, fake_stripe.error.APIConnectionError("connection reset"))
+    withdrawals = [await withdraw(user_id, "10.00") for _ in range(4)]
+    await make_stuck(*(withdrawal.id for withdrawal in withdrawals))
+
+    paid = []
+
+    def create(**kwargs):
+        paid.append(kwargs["metadata"]["withdrawal_id"])
+        return working(**kwargs)
+    fake_stripe.Payout.create = create
+    monkeypatch.setattr(settings, "WITHDRAWAL_RECOVERY_BATCH", 2)
+
+    async def worker() -> int:
+        async with AsyncSessionLocal() as db:
+            return await WithdrawalService.recover_pending_payouts(db)
+
+    assert await asyncio.gather(worker(), worker()) == [2, 2]
+    assert sorted(paid) == sorted(str(withdrawal.id) for withdrawal in withdrawals)
+    for withdrawal in withdrawals:
+        assert (await state(user_id, withdrawal.id))[0] == "processing"
+
+
+async def test_recovery_stops_at_the_idempotency_window(user_id, fake_stripe):
+    fail_payouts(fake_stripe, fake_stripe.error.APIConnectionError("connection reset"))
+    withdrawal = await withdraw(user_id)
+    await make_stuck(withdrawal.id, created_hours_ago=24)
+    attempts = fake_stripe.calls["Payout.create"]
+
+    async with AsyncSessionLocal() as db:
+        assert await WithdrawalService.recover_pending_payouts(db) == 1
+
+    # Left reserved for a person to reconcile with Stripe, not retried or refunded
+    assert await state(user_id, withdrawal.id) == (
+        "requires_action", Decimal("60.00"), Decimal("40.00"), Decimal("0.00"), "processing"
+    )
+    assert fake_stripe.calls["Payout.create"] == attempts
+
+
+async def test_webhook_before_finalize_is_not_overwritten(user_id, fake_stripe):
+    fail_payouts(fake_stripe, fake_stripe.error.APIConnectionError("connection reset"))
+    withdrawal = await withdraw(user_id)
+
+    # payout.paid arrives carrying only the withdrawal id from the payout metadata
+    async with AsyncSessionLocal() as db:
+        await WithdrawalService.handle_successful_payout(db, "po_early", str(withdrawal.id))
+    async with AsyncSessionLocal() as db:
+        await WithdrawalService._finalize(db, withdrawal.id, "po_early")
+
+    assert await state(user_id, withdrawal.id) == (
+        "paid", Decimal("60.00"), Decimal("0.00"), Decimal("40.00"), "completed"
+    )
+
+
+async def test_failed_payout_webhook_refunds_once(user_id, fake_stripe):
+    withdrawal = await withdraw(user_id)
+    async with AsyncSessionLocal() as db:
+        payout_id = (await db.get(WithdrawalRequest, withdrawal.id)).stripe_payout_id
+
+    # Stripe redelivers webhooks
+    for _ in range(2):
+        async with AsyncSessionLocal() as db:
+            await WithdrawalService.handle_failed_payout(db, payout_id, str(withdrawal.id))
+
+    assert await state(user_id, withdrawal.id) == (
+        "failed", Decimal("100.00"), Decimal("0.00"), Decimal("0.00"), "failed"
+    )